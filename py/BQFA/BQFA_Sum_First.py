@@ -1,11 +1,3 @@
-from qiskit import QuantumRegister, ClassicalRegister
-from qiskit import QuantumCircuit
-from qiskit.providers.aer import QasmSimulator
-from qiskit import transpile
-import sys
-sys.path.append("..")
-from Basic_Gates.init_state import bit2state
-
 def BQFA_Sum_first_left(circ, q_A, q_B, q_C):
     '''
     This circuit is left part of QBFA_Sum_first_4q.
@@ -75,6 +67,11 @@ def Sum_First_BQFA(circ, q_A, q_B, q_C, q_D, c_Carry=None, c_Sum=None):
     return circ
 
 if __name__ == "__main__":
+    from qiskit import QuantumRegister, ClassicalRegister
+    from qiskit import QuantumCircuit
+    from qiskit.providers.aer import QasmSimulator
+    from qiskit import transpile
+    from Basic_Gates.init_state import bit2gate
     # initiate 4 qubits
     q = QuantumRegister(4,'q')
     # initiate 2 traditional bits
@@ -85,10 +82,8 @@ if __name__ == "__main__":
     data_A = 1
     data_B = 1
     Carry = 1
-    # transform custom bit to quantum state vector
-    initial_state = bit2state(str(data_A)+str(data_B)+str(Carry)+'0')
-    # initial input qubit state
-    circ.set_statevector(initial_state)
+    # prepare custom bit on the qubits with X gates
+    circ = bit2gate(circ, q, str(data_A)+str(data_B)+str(Carry)+'0')
     # build the quantum circuit
     circ = Sum_First_BQFA(circ, q[0], q[1], q[2], q[3])
     circ.measure(q[3],c[0])
@@ -1,11 +1,4 @@
-from qiskit import QuantumRegister, ClassicalRegister
-from qiskit import QuantumCircuit
-from qiskit.providers.aer import QasmSimulator
-from qiskit import transpile
-import sys
-sys.path.append("..")
-from Basic_Gates.init_state import bit2state
-from Basic_Gates.sqrt_root_CNOT_Hermitian_gate import *
+from Basic_Gates.sqrt_root_CNOT_Hermitian_gate import sqrt_root_CNOT_Hermitian
 
 def BQFA_in_Biswas(circ, q_A, q_B, q_C, q_0):
     '''
@@ -53,6 +46,11 @@ def BQFA_in_Biswas(circ, q_A, q_B, q_C, q_0):
     return circ
 
 if __name__ == "__main__":
+    from qiskit import QuantumRegister, ClassicalRegister
+    from qiskit import QuantumCircuit
+    from qiskit.providers.aer import QasmSimulator
+    from qiskit import transpile
+    from Basic_Gates.init_state import bit2gate
     # initiate 3 qubits
     q = QuantumRegister(4,'q')
     # initiate 2 traditional bits
@@ -63,10 +61,8 @@ if __name__ == "__main__":
     data_A = 1
     data_B = 1
     Carry = 1
-    # transform custom bit to quantum state vector
-    initial_state = bit2state(str(data_A)+str(data_B)+str(Carry)+'0')
-    # initial input qubit state
-    circ.set_statevector(initial_state)
+    # prepare custom bit on the qubits with X gates
+    circ = bit2gate(circ, q, str(data_A)+str(data_B)+str(Carry)+'0')
     # build the quantum circuit
     circ = BQFA_in_Biswas(circ, q[0], q[1], q[2], q[3])
     circ.measure(q[2],c[0])
@@ -1,11 +1,6 @@
-from qiskit import QuantumRegister, ClassicalRegister
-from qiskit import QuantumCircuit
-from qiskit.providers.aer import QasmSimulator
-from qiskit import transpile
-import sys
-sys.path.append("..")
-from Basic_Gates.init_state import bit2state
+from Basic_Gates.composite_gate import composite_gate
 
+@composite_gate(3)
 def MAG(circ,q_0,q_1,q_2):
     '''
     This gate is proposed in (Cuccaro, et al. 2004).
@@ -36,6 +31,7 @@ def MAG(circ,q_0,q_1,q_2):
     circ.ccx(q_0,q_1,q_2)
     return circ
 
+@composite_gate(3)
 def UMA_1(circ,q_0,q_1,q_2):
     '''
     This gate is proposed in (Cuccaro, et al. 2004).
@@ -66,6 +62,7 @@ def UMA_1(circ,q_0,q_1,q_2):
     circ.cx(q_0,q_1)
     return circ
 
+@composite_gate(3)
 def UMA_2(circ,q_0,q_1,q_2):
     '''
     This gate is proposed in (Cuccaro, et al. 2004).
@@ -143,6 +140,11 @@ def BQFA_in_Cuccaro(circ, q_A, q_B, q_C, q_0):
     return circ
 
 if __name__ == "__main__":
+    from qiskit import QuantumRegister, ClassicalRegister
+    from qiskit import QuantumCircuit
+    from qiskit.providers.aer import QasmSimulator
+    from qiskit import transpile
+    from Basic_Gates.init_state import bit2gate
     # initiate 3 qubits
     q = QuantumRegister(4,'q')
     # initiate 2 traditional bits
@@ -153,10 +155,8 @@ if __name__ == "__main__":
     data_A = 1
     data_B = 1
     Carry = 1
-    # transform custom bit to quantum state vector
-    initial_state = bit2state(str(data_A)+str(data_B)+str(Carry)+'0')
-    # initial input qubit state
-    circ.set_statevector(initial_state)
+    # prepare custom bit on the qubits with X gates
+    circ = bit2gate(circ, q, str(data_A)+str(data_B)+str(Carry)+'0')
     # build the quantum circuit
     circ = BQFA_in_Cuccaro(circ, q[0], q[1], q[2], q[3])
     circ.measure(q[1],c[0])
@@ -1,13 +1,7 @@
-from qiskit import QuantumRegister, ClassicalRegister
-from qiskit import QuantumCircuit
-from qiskit.providers.aer import QasmSimulator
-from qiskit import transpile
-import sys
-sys.path.append("..")
-from Basic_Gates.init_state import bit2state
-from Basic_Gates.Temperary_logical_AND import *
-from Basic_Gates.sqrt_root_CNOT_Hermitian_gate import *
+from Basic_Gates.composite_gate import composite_gate
+from Basic_Gates.Temperary_logical_AND import Temperary_logical_AND
 
+@composite_gate(4)
 def BQFA_in_Google(circ, q_A, q_B, q_C, q_0):
     '''
     This circuit is binary quantum full adder proposed in (Gidney, et al. 2018). 
@@ -46,6 +40,11 @@ def BQFA_in_Google(circ, q_A, q_B, q_C, q_0):
     return circ
 
 if __name__ == "__main__":
+    from qiskit import QuantumRegister, ClassicalRegister
+    from qiskit import QuantumCircuit
+    from qiskit.providers.aer import QasmSimulator
+    from qiskit import transpile
+    from Basic_Gates.init_state import bit2gate
     # initiate 3 qubits
     q = QuantumRegister(4,'q')
     # initiate 2 traditional bits
@@ -56,10 +55,8 @@ if __name__ == "__main__":
     data_A = 1
     data_B = 1
     Carry = 0
-    # transform custom bit to quantum state vector
-    initial_state = bit2state(str(data_A)+str(data_B)+str(Carry)+'0')
-    # initial input qubit state
-    circ.set_statevector(initial_state)
+    # prepare custom bit on the qubits with X gates
+    circ = bit2gate(circ, q, str(data_A)+str(data_B)+str(Carry)+'0')
     # build the quantum circuit
     circ = BQFA_in_Google(circ, q[0], q[1], q[2], q[3])
     circ.measure(q[1],c[0])
@@ -1,11 +1,4 @@
-from qiskit import QuantumRegister, ClassicalRegister
-from qiskit import QuantumCircuit
-from qiskit.providers.aer import QasmSimulator
-from qiskit import transpile
-import sys
-sys.path.append("..")
-from Basic_Gates.init_state import bit2state
-from Basic_Gates.NG_gate import *
+from Basic_Gates.NG_gate import NG_gate
 
 def BQFA_in_Mazumder(circ, q_A, q_1_1, q_B, q_C, q_0_1, q_0_2, q_1_2):
     '''
@@ -60,6 +53,11 @@ def BQFA_in_Mazumder(circ, q_A, q_1_1, q_B, q_C, q_0_1, q_0_2, q_1_2):
     return circ
 
 if __name__ == "__main__":
+    from qiskit import QuantumRegister, ClassicalRegister
+    from qiskit import QuantumCircuit
+    from qiskit.providers.aer import QasmSimulator
+    from qiskit import transpile
+    from Basic_Gates.init_state import bit2gate
     # initiate 7 qubits
     q = QuantumRegister(7,'q')
     # initiate 2 traditional bits
@@ -70,10 +68,8 @@ if __name__ == "__main__":
     data_A = 1
     data_B = 0
     Carry = 1
-    # transform custom bit to quantum state vector
-    initial_state = bit2state(str(data_A)+'1'+str(data_B)+str(Carry)+'001')
-    # initial input qubit state
-    circ.set_statevector(initial_state)
+    # prepare custom bit on the qubits with X gates
+    circ = bit2gate(circ, q, str(data_A)+'1'+str(data_B)+str(Carry)+'001')
     # build the quantum circuit
     circ = BQFA_in_Mazumder(circ, q[0], q[1], q[2], q[3], q[4], q[5], q[6])
     circ.measure(q[1],c[0])
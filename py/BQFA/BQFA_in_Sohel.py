@@ -1,11 +1,3 @@
-from qiskit import QuantumRegister, ClassicalRegister
-from qiskit import QuantumCircuit
-from qiskit.providers.aer import QasmSimulator
-from qiskit import transpile
-import sys
-sys.path.append("..")
-from Basic_Gates.init_state import bit2state
-
 def BQFA_in_Sohel(circ, q_A, q_B, q_C, q_0_1, q_0_2):
     '''
     This circuit is binary quantum full adder proposed in (Sohel, et al. 2020). 
@@ -40,9 +32,9 @@ def BQFA_in_Sohel(circ, q_A, q_B, q_C, q_0_1, q_0_2):
                       │             │      │    ┌─┴─┐    │    ┌─┴─┐   
           q_C    ─────■──────■──────├──────│────┤ X ├────■────┤ X ├──  garbage
                     ┌─┴─┐    │      │      │    └───┘  ┌─┴─┐  └───┘
-          q_0_1  ───┤ X ├────│──────│──────│───────────┤ X ├─────────  |Carry>
+          q_0_2  ───┤ X ├────│──────│──────│───────────┤ X ├─────────  |Carry>
                     └───┘  ┌─┴─┐  ┌─┴─┐  ┌─┴─┐         └───┘       
-          q_0_2  ──────────┤ X ├──┤ X ├──┤ X ├───────────────────────  |Sum>
+          q_0_1  ──────────┤ X ├──┤ X ├──┤ X ├───────────────────────  |Sum>
                            └───┘  └───┘  └───┘
     '''
     circ.ccx(q_A,q_B,q_0_2)
@@ -55,6 +47,11 @@ def BQFA_in_Sohel(circ, q_A, q_B, q_C, q_0_1, q_0_2):
     return circ
 
 if __name__ == "__main__":
+    from qiskit import QuantumRegister, ClassicalRegister
+    from qiskit import QuantumCircuit
+    from qiskit.providers.aer import QasmSimulator
+    from qiskit import transpile
+    from Basic_Gates.init_state import bit2gate
     # initiate 5 qubits
     q = QuantumRegister(5,'q')
     # initiate 2 traditional bits
@@ -65,10 +62,8 @@ if __name__ == "__main__":
     data_A = 1
     data_B = 0
     Carry = 0
-    # transform custom bit to quantum state vector
-    initial_state = bit2state(str(data_A)+str(data_B)+str(Carry)+'00')
-    # initial input qubit state
-    circ.set_statevector(initial_state)
+    # prepare custom bit on the qubits with X gates
+    circ = bit2gate(circ, q, str(data_A)+str(data_B)+str(Carry)+'00')
     # build the quantum circuit
     circ = BQFA_in_Sohel(circ, q[0],q[1],q[2], q[3], q[4])
     circ.measure(q[3],c[0])
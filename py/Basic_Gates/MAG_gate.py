@@ -1,9 +1,3 @@
-from qiskit import QuantumRegister, ClassicalRegister
-from qiskit import QuantumCircuit
-from qiskit.providers.aer import QasmSimulator
-from qiskit import transpile
-from init_state import bit2state
-
 def MAG (circ, A, B, C):
     
     '''
@@ -47,6 +41,11 @@ def MAG (circ, A, B, C):
     return circ
 
 if __name__ == "__main__":
+    from qiskit import QuantumRegister, ClassicalRegister
+    from qiskit import QuantumCircuit
+    from qiskit.providers.aer import QasmSimulator
+    from qiskit import transpile
+    from Basic_Gates.init_state import bit2gate
     # initiate 4 qubits
     q = QuantumRegister(3,'q')
     # initiate 2 traditional bits
@@ -56,10 +55,8 @@ if __name__ == "__main__":
     # input
     data_A = 1
     data_B = 1
-    # transform custom bit to quantum state vector
-    initial_state = bit2state(str(data_A)+str(data_B)+'0')
-    # initial input qubit state
-    circ.set_statevector(initial_state)
+    # prepare custom bit on the qubits with X gates
+    circ = bit2gate(circ, q, str(data_A)+str(data_B)+'0')
     # build the quantum circuit
     circ = MAG(circ, q[0], q[1], q[2])
     circ.measure(q[0], c[0])
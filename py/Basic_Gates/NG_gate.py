@@ -1,9 +1,6 @@
-from qiskit import QuantumRegister, ClassicalRegister
-from qiskit import QuantumCircuit
-from qiskit.providers.aer import QasmSimulator
-from qiskit import transpile
-from Basic_Gates.init_state import bit2state
+from Basic_Gates.composite_gate import composite_gate
 
+@composite_gate(4)
 def NG_gate(circ, A, B, C, D):
     '''
     This circuit is NG gate. If user wants to add a NG_gate in their circuits,
@@ -25,11 +22,11 @@ def NG_gate(circ, A, B, C, D):
                                           ┌───┐         ┌───┐
           A  ──────────■──────────────────┤ X ├────■────┤ X ├─  P
               ┌───┐    │                  └───┘    │    └───┘
-          D  ─┤ X ├────│───────────────────────────■──────────  G
+          B  ─┤ X ├────│───────────────────────────■──────────  G
               └─┬─┘    │    ┌───┐                  │
-          B  ───│──────■────┤ X ├────x─────────────│──────────  Q
+          C  ───│──────■────┤ X ├────x─────────────│──────────  Q
                 │    ┌─┴─┐  └───┘    │           ┌─┴─┐
-          C  ───■────┤ X ├───────────x───────────┤ X ├────────  R
+          D  ───■────┤ X ├───────────x───────────┤ X ├────────  R
                      └───┘                       └───┘
 
     **Math:**
@@ -37,9 +34,9 @@ def NG_gate(circ, A, B, C, D):
     .. math::
 
         P = A
-        G = C\oplus D
-        Q = AB\oplus C
-        R = A'(C\oplus D)\oplus B'
+        G = B\oplus D
+        Q = AC\oplus D
+        R = A'(B\oplus D)\oplus C'
 
     '''
     circ.cx(D,B)
@@ -52,6 +49,11 @@ def NG_gate(circ, A, B, C, D):
     return circ
 
 if __name__ == "__main__":
+    from qiskit import QuantumRegister, ClassicalRegister
+    from qiskit import QuantumCircuit
+    from qiskit.providers.aer import QasmSimulator
+    from qiskit import transpile
+    from Basic_Gates.init_state import bit2gate
     # initiate 4 qubits
     q = QuantumRegister(4,'q')
     # initiate 4 traditional bits
@@ -63,10 +65,8 @@ if __name__ == "__main__":
     B = 1
     C = 1
     D = 0
-    # transform custom bit to quantum state vector
-    initial_state = bit2state(str(A)+str(B)+str(C)+str(D))
-    # initial input qubit state
-    circ.set_statevector(initial_state)
+    # prepare custom bit on the qubits with X gates
+    circ = bit2gate(circ, q, str(A)+str(B)+str(C)+str(D))
     # build the quantum circuit
     circ = NG_gate(circ, q[0], q[1], q[2], q[3])
     circ.measure(q[0],c[0])
@@ -1,9 +1,4 @@
-from sqrt_root_CNOT_Hermitian_gate import *
-from qiskit import QuantumRegister, ClassicalRegister
-from qiskit import QuantumCircuit
-from qiskit.providers.aer import QasmSimulator
-from qiskit import transpile
-from init_state import bit2state
+from Basic_Gates.sqrt_root_CNOT_Hermitian_gate import sqrt_root_CNOT_Hermitian
 
 def Peres_gate(circ, q_c, q_t1, q_t2):
     '''
@@ -61,6 +56,11 @@ def Peres_gate(circ, q_c, q_t1, q_t2):
     return circ
 
 if __name__ == "__main__":
+    from qiskit import QuantumRegister, ClassicalRegister
+    from qiskit import QuantumCircuit
+    from qiskit.providers.aer import QasmSimulator
+    from qiskit import transpile
+    from Basic_Gates.init_state import bit2gate
     # initiate 3 qubits
     q = QuantumRegister(3,'q')
     # initiate 3 traditional bits
@@ -71,10 +71,8 @@ if __name__ == "__main__":
     A = 1
     B = 1
     C = 1
-    # transform custom bit to quantum state vector
-    initial_state = bit2state(str(A)+str(B)+str(C))
-    # initial input qubit state
-    circ.set_statevector(initial_state)
+    # prepare custom bit on the qubits with X gates
+    circ = bit2gate(circ, q, str(A)+str(B)+str(C))
     # build the quantum circuit
     circ = Peres_gate(circ, q[0], q[1], q[2])
     circ.measure(q[0],c[0])
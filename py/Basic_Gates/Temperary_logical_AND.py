@@ -1,9 +1,6 @@
-from qiskit import QuantumRegister, ClassicalRegister
-from qiskit import QuantumCircuit
-from qiskit.providers.aer import QasmSimulator
-from qiskit import transpile
-from Basic_Gates.init_state import bit2state
+from Basic_Gates.composite_gate import composite_gate
 
+@composite_gate(3)
 def Temperary_logical_AND(circ, q_A, q_B, q_C):
     '''
     This circuit is hermitian of sqrt root CNOT gate. If user wants 
@@ -52,7 +49,89 @@ def Temperary_logical_AND(circ, q_A, q_B, q_C):
     circ.s(q_C)
     return circ
 
+@composite_gate(3)
+def Temperary_logical_AND_dagger(circ, q_A, q_B, q_C):
+    '''
+    This circuit is the inverse of Temperary_logical_AND. It uncomputes the
+        logical AND, i.e., q_C is returned to |0> when it holds AB.
+    input:
+        circ    :   circuit
+        q_A     :   input A
+        q_B     :   input B
+        q_C     :   qubit which holds AB
+    output:
+        circ    :   circuit
+
+    **Example:**
+
+    circ = Temperary_logical_AND_dagger(circ, q[0], q[1], q[2])
+
+    q[2] is returned to |0> if it holds the AND of q[0] and q[1].
+    '''
+    circ.sdg(q_C)
+    circ.h(q_C)
+    circ.cx(q_C,q_A)
+    circ.cx(q_C,q_B)
+    circ.tdg(q_C)
+    circ.t(q_B)
+    circ.t(q_A)
+    circ.cx(q_C,q_A)
+    circ.cx(q_C,q_B)
+    circ.cx(q_B,q_C)
+    circ.cx(q_A,q_C)
+    circ.tdg(q_C)
+    circ.h(q_C)
+    return circ
+
+def Temperary_logical_AND_uncompute(circ, q_A, q_B, q_C, c_m):
+    '''
+    This circuit is the measurement-based uncomputation of the logical AND
+        proposed in (Gidney 2018), which uses no T gate. q_C is measured in
+        the X basis, which leaves the phase (-1)^(mAB) on the state for the
+        outcome m, and the phase is removed by a CZ gate conditioned on m.
+        Then q_C is returned to |0> by an X gate conditioned on m. It cannot
+        be a composite gate because of the mid-circuit measurement.
+    input:
+        circ    :   circuit
+        q_A     :   input A
+        q_B     :   input B
+        q_C     :   qubit which holds AB
+        c_m     :   classical bit for the outcome of the measurement
+    output:
+        circ    :   circuit
+
+    **Example:**
+
+    circ = Temperary_logical_AND_uncompute(circ, q[0], q[1], q[2], c[0])
+
+    q[2] is returned to |0> if it holds the AND of q[0] and q[1], and c[0]
+        holds a random bit.
+
+    **Circuit symbol:**
+
+    .. parsed-literal::
+
+        q_A: ───────────────■────────── A
+                            │
+        q_B: ───────────────■────────── B
+             ┌───┐┌─┐       ║   ┌───┐
+        q_C: ┤ H ├┤M├───────╫───┤ X ├── |0>
+             └───┘└╥┘       ║   └─╥─┘
+        c_m: ══════╩════════■═════■════ m
+
+    '''
+    circ.h(q_C)
+    circ.measure(q_C, c_m)
+    circ.cz(q_A, q_B).c_if(c_m, 1)
+    circ.x(q_C).c_if(c_m, 1)
+    return circ
+
 if __name__ == "__main__":
+    from qiskit import QuantumRegister, ClassicalRegister
+    from qiskit import QuantumCircuit
+    from qiskit.providers.aer import QasmSimulator
+    from qiskit import transpile
+    from Basic_Gates.init_state import bit2gate
     # initiate 4 qubits
     q = QuantumRegister(3,'q')
     # initiate 2 traditional bits
@@ -62,10 +141,8 @@ if __name__ == "__main__":
     # input
     data_A = 1
     data_B = 1
-    # transform custom bit to quantum state vector
-    initial_state = bit2state(str(data_A)+str(data_B)+'0')
-    # initial input qubit state
-    circ.set_statevector(initial_state)
+    # prepare custom bit on the qubits with X gates
+    circ = bit2gate(circ, q, str(data_A)+str(data_B)+'0')
     # build the quantum circuit
     circ = Temperary_logical_AND(circ, q[0], q[1], q[2])
     circ.measure(q[0], c[0])
@@ -0,0 +1,219 @@
+def Toffoli_layer(circ, gates, q_ancillas):
+    '''
+    This circuit is a layer of Toffoli gates with T-depth 1 (Selinger 2013).
+        The Toffoli gates must act on disjoint qubits, and each of them uses
+        4 ancillas whose initial state is |0>, which are returned as |0>.
+        The T gates of all Toffoli gates are applied in one shared layer.
+    input:
+        circ        :       circuit
+        gates       :       list of (q_c1, q_c2, q_t)
+        q_ancillas  :       at least 4*len(gates) ancillas whose initial
+                                state is |0>
+    output:
+        circ        :       circuit
+
+    **Example:**
+
+    circ = Toffoli_layer(circ, [(q[0], q[1], q[2]), (q[3], q[4], q[5])], q[6:14])
+
+    Two Toffoli gates are added to the circuit with a single layer of T
+        gates, and q[6]-q[13] are used as ancillas.
+
+    **Circuit symbol:**
+
+    .. parsed-literal::
+
+        q_c1 ───────■──■────────────────────── T ───■──■──────────────── A
+        q_c2 ───────┼──┼──■──■──────────────── T ───┼──┼──■──■────────── B
+        q_t  ──H────┼──┼──┼──┼──■──■──■─────── T ───┼──┼──┼──┼── ... H── AB⊕C
+        |0>  ───────X──┼──X──┼──┼──┼──┼──■──── T† ──  uncompute  ─────── |0>
+        |0>  ──────────X──┼──┼──X──┼──┼──┼──── T† ──                ─── |0>
+        |0>  ─────────────X──┼─────X──┼──┼──── T† ──                ─── |0>
+        |0>  ────────────────┼────────X──X──── T  ──                ─── |0>
+
+    **Math:**
+
+    .. math::
+
+        4ABC = A + B + C - A\oplus B - A\oplus C - B\oplus C + A\oplus B\oplus C
+
+        i.e., CCZ is T on A, B, C and A\oplus B\oplus C and T^\dagger on
+        A\oplus B, A\oplus C and B\oplus C, and the Toffoli gate is CCZ
+        conjugated by H on the target.
+
+    '''
+    if len(q_ancillas) < 4*len(gates):
+        raise ValueError("A layer of %d Toffoli gates needs %d ancillas, %d are given"
+                         % (len(gates), 4*len(gates), len(q_ancillas)))
+    parities = []
+    for k, (q_a, q_b, q_c) in enumerate(gates):
+        q_ab, q_ac, q_bc, q_abc = q_ancillas[4*k:4*k+4]
+        parities.append(((q_a, q_b, q_ab), (q_a, q_c, q_ac), (q_b, q_c, q_bc)))
+    for q_a, q_b, q_c in gates:
+        circ.h(q_c)
+    # compute the parities on the ancillas
+    for k, (q_a, q_b, q_c) in enumerate(gates):
+        for q_0, q_1, q_p in parities[k]:
+            circ.cx(q_0, q_p)
+            circ.cx(q_1, q_p)
+        circ.cx(parities[k][0][2], q_ancillas[4*k+3])
+        circ.cx(q_c, q_ancillas[4*k+3])
+    # the shared layer of T gates
+    for k, (q_a, q_b, q_c) in enumerate(gates):
+        for q_t in (q_a, q_b, q_c, q_ancillas[4*k+3]):
+            circ.t(q_t)
+        for q_t in q_ancillas[4*k:4*k+3]:
+            circ.tdg(q_t)
+    # uncompute the parities
+    for k, (q_a, q_b, q_c) in enumerate(gates):
+        circ.cx(q_c, q_ancillas[4*k+3])
+        circ.cx(parities[k][0][2], q_ancillas[4*k+3])
+        for q_0, q_1, q_p in reversed(parities[k]):
+            circ.cx(q_1, q_p)
+            circ.cx(q_0, q_p)
+    for q_a, q_b, q_c in gates:
+        circ.h(q_c)
+    return circ
+
+def Toffoli_Tdepth1(circ, q_c1, q_c2, q_t, q_ancillas):
+    '''
+    This circuit is a Toffoli gate with T-depth 1, which uses 4 ancillas
+        whose initial state is |0>, see Toffoli_layer.
+    input:
+        circ        :       circuit
+        q_c1, q_c2  :       control qubits
+        q_t         :       target qubit
+        q_ancillas  :       4 ancillas whose initial state is |0>
+    output:
+        circ        :       circuit
+    '''
+    return Toffoli_layer(circ, [(q_c1, q_c2, q_t)], q_ancillas)
+
+def _bits(args):
+    # the arguments of a gate with the registers and the lists of qubits,
+    # e.g., measure(q, c), expanded to their bits
+    for arg in args:
+        if isinstance(arg, str):
+            continue
+        if hasattr(arg, '__iter__'):
+            yield from _bits(arg)
+        else:
+            yield arg
+
+class Tdepth1_circuit:
+    '''
+    This is used to build any adder with T-depth-1 Toffoli gates. It wraps a
+        circuit and has the same gate methods, thus it can be passed to the
+        circuit builders in place of "circ". Every ccx is held back, and the
+        held Toffoli gates are added as one Toffoli_layer when a later gate
+        touches one of their qubits, when the ancillas run out, or when
+        finish is called. Thus the independent Toffoli gates of a stage,
+        e.g., the MAG layer at the start of QMDA_Carry_First, share one
+        layer of T gates. Gates on other qubits commute with the held
+        Toffoli gates and are added at once.
+
+    If fewer than 4 ancillas are given, ccx is added unchanged.
+
+    input:
+        circ        :       circuit, or any object with its gate methods
+        q_ancillas  :       ancillas whose initial state is |0>, 4 for
+                                each Toffoli gate of the largest layer
+
+    **Example:**
+
+    wrapped = Tdepth1_circuit(circ, q[5*n+2:9*n+2])
+    wrapped = QMDA_Carry_First(wrapped, q, c, n)
+    circ = wrapped.finish()
+
+    The n Toffoli gates of the MAG layer of QMDA_Carry_First are added with
+        T-depth 1 in total.
+    '''
+
+    def __init__(self, circ, q_ancillas):
+        self.circ = circ
+        self.q_ancillas = list(q_ancillas)
+        self._held = []
+        self._held_qubits = set()
+
+    def _flush(self):
+        if self._held:
+            Toffoli_layer(self.circ, self._held, self.q_ancillas)
+            self._held = []
+            self._held_qubits = set()
+
+    def __getattr__(self, name):
+        gate = getattr(self.circ, name)
+        # attributes which are not gates, e.g., num_qubits, are returned as
+        # they are
+        if not callable(gate):
+            return gate
+        def wrapper(*args):
+            # classical bits and angles are compared too, which can only
+            # add the held gates earlier than needed
+            if any(bit in self._held_qubits for bit in _bits(args)):
+                self._flush()
+            # the result is returned, so that c_if can be used
+            return gate(*args)
+        return wrapper
+
+    def ccx(self, q_c1, q_c2, q_t):
+        if len(self.q_ancillas) < 4:
+            self.circ.ccx(q_c1, q_c2, q_t)
+            return self
+        qubits = (q_c1, q_c2, q_t)
+        if any(qubit in self._held_qubits for qubit in qubits) \
+                or 4*(len(self._held)+1) > len(self.q_ancillas):
+            self._flush()
+        self._held.append(qubits)
+        self._held_qubits.update(qubits)
+        return self
+
+    def finish(self):
+        '''
+        This is used to add the held Toffoli gates and get the circuit.
+        '''
+        self._flush()
+        return self.circ
+
+if __name__ == "__main__":
+    from qiskit import QuantumRegister, ClassicalRegister
+    from qiskit import QuantumCircuit
+    from qiskit.providers.aer import QasmSimulator
+    from qiskit import transpile
+    from Basic_Gates.init_state import bit2gate
+    # initiate 7 qubits, 3 for the Toffoli gate and 4 ancillas
+    q = QuantumRegister(7,'q')
+    # initiate 3 traditional bits
+    c = ClassicalRegister(3,'c')
+    # initiate quantum circuit
+    circ = QuantumCircuit(q,c)
+    # input
+    A = 1
+    B = 1
+    C = 0
+    # prepare custom bit on the qubits with X gates
+    circ = bit2gate(circ, q, str(A)+str(B)+str(C))
+    # build the quantum circuit
+    circ = Toffoli_Tdepth1(circ, q[0], q[1], q[2], q[3:7])
+    circ.measure(q[0],c[0])
+    circ.measure(q[1],c[1])
+    circ.measure(q[2],c[2])
+    print(circ.draw())
+
+    # Build a simulator to exert the quantum circuit
+    backend = QasmSimulator()
+
+    # First we have to transpile the quantum circuit
+    # to the low-level QASM instructions used by the
+    # backend
+    circ_compiled = transpile(circ, backend)
+
+    # Execute the circuit on the qasm simulator.
+    # We've set the number of repeats of the circuit
+    # to be 1024
+    job_sim = backend.run(circ_compiled, shots=1024)
+
+    # Grab the results from the job.
+    result_sim = job_sim.result()
+    counts = result_sim.get_counts(circ_compiled)
+    print(counts)
@@ -1,9 +1,3 @@
-from qiskit import QuantumRegister, ClassicalRegister
-from qiskit import QuantumCircuit
-from qiskit.providers.aer import QasmSimulator
-from qiskit import transpile
-from init_state import bit2state
-
 def doubly_controlled_NOT_gate(circ, q, c):
     circ.h(q[6])
     circ.cx(q[1],q[5])
@@ -64,7 +58,55 @@ def Toffoli(circ, q_A, q_B, q_C, c_A, c_B, c_C):
     circ.measure(q_C, c_C)
     return circ
 
+def Toffoli_Tdepth4(circ, q_c1, q_c2, q_t):
+    '''
+    This circuit is a Toffoli gate with 7 T gates, 6 CNOT gates and T-depth 4
+        (Nielsen and Chuang 2010), which needs no ancilla and leaves every
+        qubit unmeasured, unlike Toffoli. It is the decomposition of ccx used
+        by qiskit.
+    input:
+        circ        :       circuit
+        q_c1, q_c2  :       control qubits
+        q_t         :       target qubit
+    output:
+        circ        :       circuit
+
+    **Example:**
+
+    circ = Toffoli_Tdepth4(circ, q[0], q[1], q[2])
+
+    **Math:**
+
+    .. math::
+
+        P = A
+        Q = B
+        R = AB\oplus C
+
+    '''
+    circ.h(q_t)
+    circ.cx(q_c2,q_t)
+    circ.tdg(q_t)
+    circ.cx(q_c1,q_t)
+    circ.t(q_t)
+    circ.cx(q_c2,q_t)
+    circ.tdg(q_t)
+    circ.cx(q_c1,q_t)
+    circ.t(q_c2)
+    circ.t(q_t)
+    circ.h(q_t)
+    circ.cx(q_c1,q_c2)
+    circ.t(q_c1)
+    circ.tdg(q_c2)
+    circ.cx(q_c1,q_c2)
+    return circ
+
 if __name__ == "__main__":
+    from qiskit import QuantumRegister, ClassicalRegister
+    from qiskit import QuantumCircuit
+    from qiskit.providers.aer import QasmSimulator
+    from qiskit import transpile
+    from Basic_Gates.init_state import bit2gate
     # initiate 4 qubits
     q = QuantumRegister(7,'q')
     # initiate 2 traditional bits
@@ -75,10 +117,8 @@ if __name__ == "__main__":
     data_A = 1
     data_B = 1
     data_C = 0
-    # transform custom bit to quantum state vector
-    initial_state = bit2state(str(data_A)+str(data_B)+str(data_C)+'000'+str(data_C))
-    # initial input qubit state
-    circ.set_statevector(initial_state)
+    # prepare custom bit on the qubits with X gates
+    circ = bit2gate(circ, q, str(data_A)+str(data_B)+str(data_C)+'000'+str(data_C))
     # build the quantum circuit
     # circ = Toffoli(circ, q[0], q[1], q[2], c[0], c[1], c[2])
     circ = doubly_controlled_NOT_gate(circ, q, c)
@@ -1,4 +1,4 @@
-from sqrt_root_CNOT_Hermitian_gate import *
+from Basic_Gates.sqrt_root_CNOT_Hermitian_gate import sqrt_root_CNOT_Hermitian
 
 def Toffoli_gate(circ, q_c1, q_c2, q_t):
     '''
@@ -56,6 +56,11 @@ def Toffoli_gate(circ, q_c1, q_c2, q_t):
     return circ
 
 if __name__ == "__main__":
+    from qiskit import QuantumRegister, ClassicalRegister
+    from qiskit import QuantumCircuit
+    from qiskit.providers.aer import QasmSimulator
+    from qiskit import transpile
+    from Basic_Gates.init_state import bit2gate
     # initiate 3 qubits
     q = QuantumRegister(3,'q')
     # initiate 3 traditional bits
@@ -66,10 +71,8 @@ if __name__ == "__main__":
     A = 1
     B = 1
     C = 0
-    # transform custom bit to quantum state vector
-    initial_state = bit2state(str(A)+str(B)+str(C))
-    # initial input qubit state
-    circ.set_statevector(initial_state)
+    # prepare custom bit on the qubits with X gates
+    circ = bit2gate(circ, q, str(A)+str(B)+str(C))
     # build the quantum circuit
     circ = Toffoli_gate(circ, q[0], q[1], q[2])
     circ.measure(q[0],c[0])
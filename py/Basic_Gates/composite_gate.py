@@ -0,0 +1,121 @@
+'''
+Cached composite gates of the templates. A template decorated with
+    composite_gate, e.g., MAG or BQFA_in_Google, is built once on its own
+    circuit and converted to a qiskit Gate, and every later call appends that
+    Gate in one call instead of appending its primitive gates one by one.
+
+The composite gates are off by default. When they are on, they are only used
+    for a QuantumCircuit, so the simulators and the Resource_counter, which
+    are passed in place of "circ", still see the primitive gates.
+
+**Example:**
+
+use_composite_gates(True)
+circ = QMDA_in_Google(circ, q, c, n)
+circ = flatten(circ)
+
+circ holds the same primitive gates as a circuit built without composite
+    gates, and the transpiler also unrolls the composite gates by itself.
+'''
+import functools
+
+_enabled = False
+# template : Gate
+_gates = {}
+# names of the composite gates, which are flattened
+_names = set()
+
+def use_composite_gates(enabled=True):
+    '''
+    This is used to switch the composite gates on or off.
+    '''
+    global _enabled
+    _enabled = enabled
+
+def composite_gate(num_qubits):
+    '''
+    This is used to decorate a template whose signature is
+        (circ, q_0, ..., q_num_qubits-1), so that it appends a cached Gate
+        when the composite gates are on and "circ" is a QuantumCircuit.
+    '''
+    def decorator(template):
+        @functools.wraps(template)
+        def wrapper(circ, *qubits):
+            if not _enabled:
+                return template(circ, *qubits)
+            # qiskit is only imported once the composite gates are on
+            from qiskit import QuantumCircuit
+            if not isinstance(circ, QuantumCircuit):
+                return template(circ, *qubits)
+            gate = _gates.get(template)
+            if gate is None:
+                # the definition is built with the composite gates on, so the
+                # templates used inside are nested composite gates
+                definition = QuantumCircuit(num_qubits, name=template.__name__)
+                template(definition, *definition.qubits)
+                gate = definition.to_gate()
+                _gates[template] = gate
+                _names.add(gate.name)
+            circ.append(gate, qubits)
+            return circ
+        return wrapper
+    return decorator
+
+def _flatten_into(flat, operation, qubits, clbits):
+    if operation.name in _names:
+        definition = operation.definition
+        for inst in definition.data:
+            inner = [qubits[definition.find_bit(qubit).index] for qubit in inst.qubits]
+            _flatten_into(flat, inst.operation, inner, [])
+    else:
+        flat._append(operation, qubits, clbits)
+
+def flatten(circ):
+    '''
+    This is used to replace the composite gates of a circuit, including the
+        nested ones, by their primitive gates.
+    input:
+        circ        :       circuit
+    output:
+        flat        :       new circuit with the same registers
+    '''
+    flat = circ.copy_empty_like()
+    for inst in circ.data:
+        _flatten_into(flat, inst.operation, list(inst.qubits), list(inst.clbits))
+    return flat
+
+if __name__ == "__main__":
+    import time
+    import tracemalloc
+    from qiskit import QuantumRegister, ClassicalRegister
+    from qiskit import QuantumCircuit
+    from QMDA.QMDA_in_Google import QMDA_in_Google
+    from QCRA.CRA_in_Google import CRA_in_Google
+    # the templates check the switch of the imported module, not of __main__
+    from Basic_Gates.composite_gate import use_composite_gates, flatten
+
+    def build(builder, num_qubits, num_clbits, n):
+        q = QuantumRegister(num_qubits,'q')
+        c = ClassicalRegister(num_clbits,'c')
+        circ = QuantumCircuit(q,c)
+        return builder(circ, q, c, n)
+
+    n = 10**4
+    for builder, num_qubits, num_clbits in ((QMDA_in_Google, 6*n+2, 2*n+2), (CRA_in_Google, 3*n+1, n+1)):
+        for enabled in (False, True):
+            use_composite_gates(enabled)
+            start = time.perf_counter()
+            circ = build(builder, num_qubits, num_clbits, n)
+            elapsed = time.perf_counter() - start
+            # the memory is traced in a second build, which tracemalloc slows down
+            del circ
+            tracemalloc.start()
+            circ = build(builder, num_qubits, num_clbits, n)
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            print("%s n=%d composite=%s: %d instructions, built in %.2f s, %.1f MB"
+                  % (builder.__name__, n, enabled, len(circ.data), elapsed, memory/2**20))
+        start = time.perf_counter()
+        flat = flatten(circ)
+        print("%s n=%d flattened to %d instructions in %.2f s"
+              % (builder.__name__, n, len(flat.data), time.perf_counter() - start))
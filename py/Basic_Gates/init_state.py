@@ -1,29 +1,53 @@
-import qiskit.quantum_info as qi
+def bit2index(input_bit):
+    '''
+    This is used to transform classical bit to the index of the computational
+        basis state it represents. The i-th character of the string is the
+        state of qubit i, which is the same bit ordering as bit2state.
+    input:
+        input_bit   :       string of '0' and '1'
+    output:
+        index       :       integer index of the basis state
+
+    **Example:**
+
+    index = bit2index('110')
+
+    index is 3, i.e., q[0] and q[1] are |1> and q[2] is |0>.
+    '''
+    return int(input_bit[::-1], 2)
+
+def bit2gate(circ, q, input_bit):
+    '''
+    This is used to prepare classical bit on qubits whose initial state is |0>
+        with a layer of X gates. The cost is O(n) in both time and memory,
+        rather than the O(2^n) state vector built by bit2state. The i-th
+        character of the string is prepared on q[i], which is the same bit
+        ordering as bit2state.
+    input:
+        circ        :       circuit
+        q           :       qubits
+        input_bit   :       string of '0' and '1'
+    output:
+        circ        :       circuit
+
+    **Example:**
+
+    circ = bit2gate(circ, q, '110')
+
+    X gates are added on q[0] and q[1], while q[2] is left as |0>.
+    '''
+    for i in range(len(input_bit)):
+        if input_bit[i]=='1':
+            circ.x(q[i])
+    return circ
 
 def bit2state(input_bit):
     '''
     This is used to transfore classical bit to quantum state of qubit.
+        The whole state vector of 2^n amplitudes is built, so bit2gate or
+        bit2index should be used for wide circuits.
     '''
-    input_bit = input_bit[::-1]
-    # transform custom bit to quantum state vector
-    if input_bit[0]=='1':
-        state_vector_temp = [0,1]
-    else:
-        state_vector_temp = [1,0]
-    for i in input_bit[1:]:
-        state_vector = []
-        for j in state_vector_temp:
-            if j==0:
-                state_vector.append(0)
-                state_vector.append(0)
-            else:
-                if i=='0':
-                    state_vector.append(1)
-                    state_vector.append(0)
-                else:
-                    state_vector.append(0)
-                    state_vector.append(1)
-        state_vector_temp = state_vector
-    # transform numpy list to state_vector
-    psi = qi.Statevector(state_vector)
-    return psi
\ No newline at end of file
+    import qiskit.quantum_info as qi
+    # the basis state has a single non-zero amplitude
+    psi = qi.Statevector.from_int(bit2index(input_bit), 2**len(input_bit))
+    return psi
@@ -1,9 +1,4 @@
 from math import pi
-from qiskit import QuantumRegister, ClassicalRegister
-from qiskit import QuantumCircuit
-from qiskit.providers.aer import QasmSimulator
-from qiskit import transpile
-from Basic_Gates.init_state import bit2state
 
 def sqrt_root_CNOT_Hermitian(circ, q_c, q_t):
     '''
@@ -53,6 +48,11 @@ def sqrt_root_CNOT_Hermitian(circ, q_c, q_t):
     return circ
 
 if __name__ == "__main__":
+    from qiskit import QuantumRegister, ClassicalRegister
+    from qiskit import QuantumCircuit
+    from qiskit.providers.aer import QasmSimulator
+    from qiskit import transpile
+    from Basic_Gates.init_state import bit2gate
     # initiate 2 qubits
     q = QuantumRegister(2,'q')
     # initiate 2 traditional bits
@@ -62,10 +62,8 @@ if __name__ == "__main__":
     # input
     A = 0
     B = 1
-    # transform custom bit to quantum state vector
-    initial_state = bit2state(str(A)+str(B))
-    # initial input qubit state
-    circ.set_statevector(initial_state)
+    # prepare custom bit on the qubits with X gates
+    circ = bit2gate(circ, q, str(A)+str(B))
     # build the quantum circuit
     circ = sqrt_root_CNOT_Hermitian(circ, q[0], q[1])
     circ.measure(q[0],c[0])
@@ -1,11 +1,4 @@
-from qiskit import QuantumRegister, ClassicalRegister
-from qiskit import QuantumCircuit
-from qiskit.providers.aer import QasmSimulator
-from qiskit import transpile
-import sys
-sys.path.append("..")
-from Basic_Gates.init_state import bit2state
-from BQFA.BQFA_in_Cuccaro import *
+from BQFA.BQFA_in_Cuccaro import BQFA_in_Cuccaro
 
 def CRA_in_Cuccaro_2cnotversion(circ, q, c, n):
     '''
@@ -34,6 +27,11 @@ def CRA_in_Cuccaro_2cnotversion(circ, q, c, n):
     return circ
 
 if __name__ == "__main__":
+    from qiskit import QuantumRegister, ClassicalRegister
+    from qiskit import QuantumCircuit
+    from qiskit.providers.aer import QasmSimulator
+    from qiskit import transpile
+    from Basic_Gates.init_state import bit2gate
     data_A = "11"
     data_B = "11"
     data_A = data_A[::-1]
@@ -54,9 +52,8 @@ if __name__ == "__main__":
         data_string += data_B[i]
         data_string += '0'
     # data_string = data_string[::-1]
-    initial_state = bit2state(data_string)
-    # initial input qubit state
-    circ.set_statevector(initial_state)
+    # prepare custom bit on the qubits with X gates
+    circ = bit2gate(circ, q, data_string)
     # build the quantum circuit
     circ = CRA_in_Cuccaro_2cnotversion(circ, q, c, n)
     print(circ.draw())
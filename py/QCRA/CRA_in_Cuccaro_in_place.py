@@ -0,0 +1,120 @@
+from BQFA.BQFA_in_Cuccaro import MAG, UMA_1
+
+def CRA_in_Cuccaro_in_place(circ, q, c, n, uma=UMA_1):
+    '''
+    This circuit is the in-place quantum carry-ripple adder proposed in
+        (Cuccaro, et al. 2004), which computes B <- A+B with 2n+2 qubits
+        rather than the 3n+1 qubits of CRA_in_Cuccaro_2cnotversion. The MAG
+        gates ripple the carries through the qubits of A, the carry out is
+        copied to the last qubit, and the UMA gates uncompute the carries,
+        restore A and the input carry, and leave the sum on B. If user wants
+        to add it in their circuits, they need to pass their circuit,
+        qubits, classical registers and length of input data that will be
+        used in this circuit.
+
+    The input carry is q[0], A_i is q[2i+1], B_i is q[2i+2] and q[2n+1] is
+        |0>. The sum bit i is left on q[2i+2] and the carry out on q[2n+1].
+
+    input:
+        circ        :       circuit
+        q           :       input qubit
+        c           :       classical register
+        n           :       length of input data
+        uma         :       UMA gate, UMA_1 (2 CNOTs) or UMA_2 (3 CNOTs,
+                                which allows more parallelism)
+    output:
+        circ        :       circuit
+
+    **Example:**
+
+    circ = CRA_in_Cuccaro_in_place(circ, q, c, n)
+
+    **Circuit symbol:**
+
+    .. parsed-literal::
+
+                 ┌─────┐                          ┌─────┐
+        c_0  ────┤  M  ├──────────────────────────┤  U  ├────  c_0
+                 │  A  │                          │  M  │
+        B_0  ────┤  G  ├──────────────────────────┤  A  ├────  S_0
+                 │     │┌─────┐          ┌─────┐  │     │
+        A_0  ────┤     ├┤  M  ├──────────┤  U  ├──┤     ├────  A_0
+                 └─────┘│  A  │          │  M  │  └─────┘
+        B_1  ───────────┤  G  ├──────────┤  A  ├─────────────  S_1
+                        │     │          │     │
+        A_1  ───────────┤     ├────■─────┤     ├─────────────  A_1
+                        └─────┘  ┌─┴─┐   └─────┘
+        z    ────────────────────┤ X ├───────────────────────  c_2
+                                 └───┘
+
+    **Math:**
+
+    .. math::
+
+        Carry_{i+1} = A_iB_i\oplus A_iCarry_i\oplus B_iCarry_i
+        Sum_i = A_i\oplus B_i\oplus Carry_i
+
+    '''
+    # the carries
+    circ = MAG(circ, q[0], q[2], q[1])
+    for i in range(1, n):
+        circ = MAG(circ, q[2*i-1], q[2*i+2], q[2*i+1])
+    circ.cx(q[2*n-1], q[2*n+1])
+    # uncompute the carries, and the sums
+    for i in range(n-1, 0, -1):
+        circ = uma(circ, q[2*i-1], q[2*i+2], q[2*i+1])
+    circ = uma(circ, q[0], q[2], q[1])
+    for i in range(n):
+        circ.measure(q[2*i+2], c[i])
+    circ.measure(q[2*n+1], c[n])
+    return circ
+
+if __name__ == "__main__":
+    from qiskit import QuantumRegister, ClassicalRegister
+    from qiskit import QuantumCircuit
+    from qiskit.providers.aer import QasmSimulator
+    from qiskit import transpile
+    from Basic_Gates.init_state import bit2gate
+    data_A = "11"
+    data_B = "10"
+    Carry_in = '1'
+    data_A = data_A[::-1]
+    data_B = data_B[::-1]
+    n = len(data_A)
+    # initiate 2n+2 qubits
+    q = QuantumRegister(2*n+2,'q')
+    # initiate n+1 traditional bits
+    c = ClassicalRegister(n+1,'c')
+    #initiate quantum circuit
+    circ = QuantumCircuit(q,c)
+    # transform custom bit to quantum state vector
+    data_string = ''
+    data_string += Carry_in
+    for i in range(n):
+        data_string += data_A[i]
+        data_string += data_B[i]
+    data_string += '0'
+    # prepare custom bit on the qubits with X gates
+    circ = bit2gate(circ, q, data_string)
+    # build the quantum circuit
+    circ = CRA_in_Cuccaro_in_place(circ, q, c, n)
+    print(circ.draw())
+
+    # Build a simulator to exert the quantum circuit
+    backend = QasmSimulator()
+
+    # First we have to transpile the quantum circuit
+    # to the low-level QASM instructions used by the
+    # backend
+    circ_compiled = transpile(circ, backend)
+
+    # Execute the circuit on the qasm simulator.
+    # We've set the number of repeats of the circuit
+    # to be 1, because each state of each qubit is |0> or |1>
+    # rather than superposition state.
+    job_sim = backend.run(circ_compiled, shots=1)
+
+    # Grab the results from the job.
+    result_sim = job_sim.result()
+    counts = result_sim.get_counts(circ_compiled)
+    print(counts)
@@ -1,11 +1,4 @@
-from qiskit import QuantumRegister, ClassicalRegister
-from qiskit import QuantumCircuit
-from qiskit.providers.aer import QasmSimulator
-from qiskit import transpile
-import sys
-sys.path.append("..")
-from Basic_Gates.init_state import bit2state
-from BQFA.BQFA_in_Google import *
+from BQFA.BQFA_in_Google import BQFA_in_Google
 
 def CRA_in_Google(circ, q, c, n):
     '''
@@ -29,11 +22,16 @@ def CRA_in_Google(circ, q, c, n):
     '''
     for i in range(n):
         circ = BQFA_in_Google(circ, q[3*i],q[3*i+1],q[3*i+2],q[3*i+3]) 
-        circ.measure(q[3*i+1],c[2*i])
+        circ.measure(q[3*i+1],c[i])
     circ.measure(q[3*n],c[n])
     return circ
 
 if __name__ == "__main__":
+    from qiskit import QuantumRegister, ClassicalRegister
+    from qiskit import QuantumCircuit
+    from qiskit.providers.aer import QasmSimulator
+    from qiskit import transpile
+    from Basic_Gates.init_state import bit2gate
     data_A = "11"
     data_B = "10"     
     Carry_in = '0'
@@ -54,9 +52,8 @@ if __name__ == "__main__":
         data_string += data_B[i]
         data_string += '0'
     # data_string = data_string[::-1]
-    initial_state = bit2state(data_string)
-    # initial input qubit state
-    circ.set_statevector(initial_state)
+    # prepare custom bit on the qubits with X gates
+    circ = bit2gate(circ, q, data_string)
     # build the quantum circuit
     circ = CRA_in_Google(circ, q, c, n)
     print(circ.draw())
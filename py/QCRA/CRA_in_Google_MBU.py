@@ -0,0 +1,105 @@
+from Basic_Gates.Temperary_logical_AND import Temperary_logical_AND, Temperary_logical_AND_uncompute
+
+def CRA_in_Google_MBU(circ, q, c, n):
+    '''
+    This circuit is the in-place quantum carry-ripple adder proposed in
+        (Gidney 2018), in which the carries computed with
+        Temperary_logical_AND are uncomputed with measurements by
+        Temperary_logical_AND_uncompute. Thus an n-bit addition costs 4n T
+        gates, and the carries are returned to |0> rather than left as
+        garbage. If user wants to add it in their circuits, they need to
+        pass their circuit, qubits, classical registers and length of input
+        data that will be used in this circuit.
+
+    The layout is the same as CRA_in_Google, i.e., q[0] is the input carry,
+        A_i is q[3i+1], B_i is q[3i+2] and q[3i+3] is |0>. A is left
+        unchanged, the sum bit i is left on q[3i+2] and the carry out on
+        q[3n]. The outcome of the measurement of carry i+1 is written to
+        c[i+1] before the sum bit i+1 is measured to it.
+
+    input:
+        circ        :       circuit
+        q           :       input qubit
+        c           :       classical register
+        n           :       length of input data
+    output:
+        circ        :       circuit
+
+    **Example:**
+
+    circ = CRA_in_Google_MBU(circ, q, c, n)
+
+    **Math:**
+
+    .. math::
+
+        Carry_{i+1} = (A_i\oplus Carry_i)(B_i\oplus Carry_i)\oplus Carry_i
+        Sum_i = A_i\oplus B_i\oplus Carry_i
+
+    '''
+    # the carries
+    for i in range(n):
+        circ.cx(q[3*i],q[3*i+1])
+        circ.cx(q[3*i],q[3*i+2])
+        circ = Temperary_logical_AND(circ, q[3*i+1], q[3*i+2], q[3*i+3])
+        circ.cx(q[3*i],q[3*i+3])
+    # uncompute the carries except the carry out, and the sums
+    for i in range(n-1, -1, -1):
+        if i < n-1:
+            circ.cx(q[3*i],q[3*i+3])
+            circ = Temperary_logical_AND_uncompute(circ, q[3*i+1], q[3*i+2], q[3*i+3], c[i+1])
+        circ.cx(q[3*i],q[3*i+1])
+        circ.cx(q[3*i+1],q[3*i+2])
+    for i in range(n):
+        circ.measure(q[3*i+2],c[i])
+    circ.measure(q[3*n],c[n])
+    return circ
+
+if __name__ == "__main__":
+    from qiskit import QuantumRegister, ClassicalRegister
+    from qiskit import QuantumCircuit
+    from qiskit.providers.aer import QasmSimulator
+    from qiskit import transpile
+    from Basic_Gates.init_state import bit2gate
+    data_A = "11"
+    data_B = "10"
+    Carry_in = '1'
+    data_A = data_A[::-1]
+    data_B = data_B[::-1]
+    n = len(data_A)
+    # initiate 3n+1 qubits
+    q = QuantumRegister(3*n+1,'q')
+    # initiate n+1 traditional bits
+    c = ClassicalRegister(n+1,'c')
+    #initiate quantum circuit
+    circ = QuantumCircuit(q,c)
+    # transform custom bit to quantum state vector
+    data_string = ''
+    data_string += Carry_in
+    for i in range(n):
+        data_string += data_A[i]
+        data_string += data_B[i]
+        data_string += '0'
+    # prepare custom bit on the qubits with X gates
+    circ = bit2gate(circ, q, data_string)
+    # build the quantum circuit
+    circ = CRA_in_Google_MBU(circ, q, c, n)
+    print(circ.draw())
+
+    # Build a simulator to exert the quantum circuit
+    backend = QasmSimulator()
+
+    # First we have to transpile the quantum circuit
+    # to the low-level QASM instructions used by the
+    # backend
+    circ_compiled = transpile(circ, backend)
+
+    # Execute the circuit on the qasm simulator.
+    # The outcomes of the measurements of the carries are random, but the
+    # sum must be the same in all shots.
+    job_sim = backend.run(circ_compiled, shots=1024)
+
+    # Grab the results from the job.
+    result_sim = job_sim.result()
+    counts = result_sim.get_counts(circ_compiled)
+    print(counts)
@@ -0,0 +1,107 @@
+def CRA_in_Takahashi(circ, q, c, n):
+    '''
+    This circuit is the in-place quantum carry-ripple adder without ancilla
+        proposed in (Takahashi, et al. 2010), which computes B <- A+B with
+        2n+1 qubits. As in (Cuccaro, et al. 2004) the carries ripple through
+        the qubits of A, but the qubit of the input carry is saved by
+        XORing each A_i into A_i+1 first, so A_i holds A_i xor Carry_i once
+        the Toffoli gate of the previous bit has been applied. It uses 2n-1
+        Toffoli gates. If user wants to add it in their circuits, they need
+        to pass their circuit, qubits, classical registers and length of
+        input data that will be used in this circuit.
+
+    There is no input carry: A_i is q[2i], B_i is q[2i+1] and q[2n] is |0>.
+        The sum bit i is left on q[2i+1] and the carry out on q[2n].
+
+    input:
+        circ        :       circuit
+        q           :       input qubit
+        c           :       classical register
+        n           :       length of input data
+    output:
+        circ        :       circuit
+
+    **Example:**
+
+    circ = CRA_in_Takahashi(circ, q, c, n)
+
+    **Math:**
+
+    .. math::
+
+        Carry_{i+1} = A_iB_i\oplus A_iCarry_i\oplus B_iCarry_i
+        Sum_i = A_i\oplus B_i\oplus Carry_i
+
+    '''
+    # A_n is the qubit of the carry out
+    a = [q[2*i] for i in range(n)] + [q[2*n]]
+    b = [q[2*i+1] for i in range(n)]
+    for i in range(1, n):
+        circ.cx(a[i], b[i])
+    if n > 1:
+        circ.cx(a[n-1], a[n])
+    for i in range(n-2, 0, -1):
+        circ.cx(a[i], a[i+1])
+    # the carries
+    for i in range(n):
+        circ.ccx(a[i], b[i], a[i+1])
+    # uncompute the carries, and the sums
+    for i in range(n-1, 0, -1):
+        circ.cx(a[i], b[i])
+        circ.ccx(a[i-1], b[i-1], a[i])
+    for i in range(1, n-1):
+        circ.cx(a[i], a[i+1])
+    for i in range(n):
+        circ.cx(a[i], b[i])
+    for i in range(n):
+        circ.measure(b[i], c[i])
+    circ.measure(a[n], c[n])
+    return circ
+
+if __name__ == "__main__":
+    from qiskit import QuantumRegister, ClassicalRegister
+    from qiskit import QuantumCircuit
+    from qiskit.providers.aer import QasmSimulator
+    from qiskit import transpile
+    from Basic_Gates.init_state import bit2gate
+    data_A = "11"
+    data_B = "11"
+    data_A = data_A[::-1]
+    data_B = data_B[::-1]
+    n = len(data_A)
+    # initiate 2n+1 qubits
+    q = QuantumRegister(2*n+1,'q')
+    # initiate n+1 traditional bits
+    c = ClassicalRegister(n+1,'c')
+    #initiate quantum circuit
+    circ = QuantumCircuit(q,c)
+    # transform custom bit to quantum state vector
+    data_string = ''
+    for i in range(n):
+        data_string += data_A[i]
+        data_string += data_B[i]
+    data_string += '0'
+    # prepare custom bit on the qubits with X gates
+    circ = bit2gate(circ, q, data_string)
+    # build the quantum circuit
+    circ = CRA_in_Takahashi(circ, q, c, n)
+    print(circ.draw())
+
+    # Build a simulator to exert the quantum circuit
+    backend = QasmSimulator()
+
+    # First we have to transpile the quantum circuit
+    # to the low-level QASM instructions used by the
+    # backend
+    circ_compiled = transpile(circ, backend)
+
+    # Execute the circuit on the qasm simulator.
+    # We've set the number of repeats of the circuit
+    # to be 1, because each state of each qubit is |0> or |1>
+    # rather than superposition state.
+    job_sim = backend.run(circ_compiled, shots=1)
+
+    # Grab the results from the job.
+    result_sim = job_sim.result()
+    counts = result_sim.get_counts(circ_compiled)
+    print(counts)
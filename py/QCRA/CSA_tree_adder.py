@@ -0,0 +1,168 @@
+'''
+Multi-operand adder with a carry-save adder (CSA) tree. The bits of the k
+    operands are sorted into columns of the same weight, and every stage
+    of the tree replaces 3 bits of a column by their sum in the same column
+    and their carry in the next column with a BQFA, in the style of the
+    Wallace tree. The BQFAs of a stage act on disjoint qubits, and every
+    stage reduces the number of bits of a column by about 1/3, so after
+    O(log k) stages at most 2 bits are left in every column, which are
+    added by a final carry ripple adder.
+
+The operand r is laid out on q[r*n]-q[r*n+n-1] with bit 0 first, followed by
+    the ancillas given by CSA_tree_size whose initial state is |0>.
+'''
+from BQFA.BQFA_in_Google import BQFA_in_Google
+from BQFA.BQFA_in_Cuccaro import BQFA_in_Cuccaro
+from Tools.adder_layout import ADDERS, adder_builder, adder_size
+
+def _plan(n, k):
+    # the BQFAs of every stage as (q_A, q_B, q_C, q_0), and the columns
+    # left for the final adder, as indices of q
+    columns = [[r*n+j for r in range(k)] for j in range(n)]
+    num_qubits = k*n
+    stages = []
+    while any(len(column) > 2 for column in columns):
+        stage = []
+        new_columns = [[] for _ in range(len(columns)+1)]
+        for j, column in enumerate(columns):
+            num_bqfa = len(column)//3 if len(column) > 2 else 0
+            for f in range(num_bqfa):
+                q_A, q_B, q_C = column[3*f:3*f+3]
+                stage.append((q_A, q_B, q_C, num_qubits))
+                # the sum is left on q_B and the carry on q_0
+                new_columns[j].append(q_B)
+                new_columns[j+1].append(num_qubits)
+                num_qubits += 1
+            new_columns[j] += column[3*num_bqfa:]
+        while new_columns and not new_columns[-1]:
+            new_columns.pop()
+        columns = new_columns
+        stages.append(stage)
+    return stages, columns, num_qubits
+
+def _final_view(columns, num_qubits, final):
+    # the qubits of the final adder in the CRA layout, i.e., carry in, then
+    # A_i, B_i and |0> for every column, followed by its own ancillas
+    m = len(columns)
+    if ADDERS.get(final, (None, None))[1] not in ('CRA_3', 'CRA_prefix'):
+        raise ValueError("The final adder must have the CRA layout with 3 qubits per bit, not '%s'" % final)
+    extra = adder_size(final, m)[0] - (3*m+1)
+    view = [num_qubits]
+    num_qubits += 1
+    for column in columns:
+        bits = list(column)
+        while len(bits) < 2:
+            bits.append(num_qubits)
+            num_qubits += 1
+        view += bits + [num_qubits]
+        num_qubits += 1
+    view += range(num_qubits, num_qubits+extra)
+    return view, num_qubits+extra
+
+def CSA_tree_size(n, k, final='CRA_in_Google'):
+    '''
+    This is used to get the size of a multi-operand adder.
+    input:
+        n           :       length of input data
+        k           :       number of operands
+        final       :       name of the final adder
+    output:
+        num_qubits, num_clbits
+    '''
+    stages, columns, num_qubits = _plan(n, k)
+    view, num_qubits = _final_view(columns, num_qubits, final)
+    return num_qubits, len(columns)+1
+
+def CSA_tree_adder(circ, q, c, n, k, bqfa=BQFA_in_Google, final='CRA_in_Google'):
+    '''
+    This circuit is a multi-operand adder with a carry-save adder tree, which
+        sums k operands of n bits. If user wants to add it in their circuits,
+        they need to pass their circuit, qubits, classical registers, length
+        of input data and number of operands.
+
+    Every stage of the tree is a layer of BQFAs on disjoint qubits, and the
+        columns of at most 2 bits are added by the final adder, which is
+        passed the qubits of the columns as a list in the CRA layout. Thus
+        the depth is O(log k) stages plus the depth of the final adder on
+        about n + log2(k) bits, rather than O(kn) for k-1 ripple adders.
+        The inputs of the BQFAs which do not hold the sum are left as
+        garbage, as in the QMDAs.
+
+    input:
+        circ        :       circuit
+        q           :       input qubit, see CSA_tree_size
+        c           :       classical register, see CSA_tree_size
+        n           :       length of input data
+        k           :       number of operands
+        bqfa        :       BQFA of the tree, BQFA_in_Google or BQFA_in_Cuccaro
+        final       :       name of the final adder in Tools.adder_layout
+                                with the CRA layout, e.g., 'CRA_in_Google'
+                                or 'Draper_adder'
+    output:
+        circ        :       circuit
+
+    **Example:**
+
+    circ = CSA_tree_adder(circ, q, c, 4, 5)
+
+    c holds the sum of the five 4-bit operands on q[0]-q[19].
+
+    **Math:**
+
+    .. math::
+
+        A + B + C = (A\oplus B\oplus C) + 2 MAJ(A, B, C)
+
+    '''
+    stages, columns, num_qubits = _plan(n, k)
+    view, num_qubits = _final_view(columns, num_qubits, final)
+    for stage in stages:
+        for q_A, q_B, q_C, q_0 in stage:
+            circ = bqfa(circ, q[q_A], q[q_B], q[q_C], q[q_0])
+    circ = adder_builder(final)(circ, [q[i] for i in view], c, len(columns))
+    return circ
+
+if __name__ == "__main__":
+    from qiskit import QuantumRegister, ClassicalRegister
+    from qiskit import QuantumCircuit
+    from qiskit.providers.aer import QasmSimulator
+    from qiskit import transpile
+    from Basic_Gates.init_state import bit2gate
+    data = ["1011", "0111", "1101", "1111", "0110"]
+    data = [data_i[::-1] for data_i in data]
+    n = len(data[0])
+    k = len(data)
+    num_qubits, num_clbits = CSA_tree_size(n, k)
+    # initiate the qubits of the operands and the ancillas
+    q = QuantumRegister(num_qubits,'q')
+    # initiate the traditional bits of the sum
+    c = ClassicalRegister(num_clbits,'c')
+    #initiate quantum circuit
+    circ = QuantumCircuit(q,c)
+    # transform custom bit to quantum state vector
+    data_string = ''.join(data)
+    # prepare custom bit on the qubits with X gates
+    circ = bit2gate(circ, q, data_string)
+    # build the quantum circuit
+    circ = CSA_tree_adder(circ, q, c, n, k)
+    print(circ.draw())
+
+    # Build a simulator to exert the quantum circuit
+    backend = QasmSimulator()
+
+    # First we have to transpile the quantum circuit
+    # to the low-level QASM instructions used by the
+    # backend
+    circ_compiled = transpile(circ, backend)
+
+    # Execute the circuit on the qasm simulator.
+    # We've set the number of repeats of the circuit
+    # to be 1, because each state of each qubit is |0> or |1>
+    # rather than superposition state. The tree has too many qubits for
+    # the state vector, so the matrix product state is used.
+    job_sim = backend.run(circ_compiled, shots=1, method='matrix_product_state')
+
+    # Grab the results from the job.
+    result_sim = job_sim.result()
+    counts = result_sim.get_counts(circ_compiled)
+    print(counts)
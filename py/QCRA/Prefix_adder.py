@@ -0,0 +1,400 @@
+'''
+Parallel-prefix adders. The carries of an adder are the prefixes of the
+    generate and propagate bits g_i = A_i B_i and p_i = A_i xor B_i under the
+    associative operator
+
+        (G, P) o (G', P') = (G' xor P' G, P P')
+
+    so any prefix network computes them in O(log n) levels. A network is a
+    function of n which returns a list of levels, and each level is a list of
+    pairs (i, k): the block of bits ending at bit i absorbs the block ending
+    at bit k, which must be the block right below it.
+
+The qubits are laid out as in the CRA, i.e., q[0] is the input carry, A_i is
+    q[3i+1], B_i is q[3i+2] and q[3i+3] is |0>, followed by the ancillas
+    given by prefix_ancillas. The sum bit i is left on q[3i+2] and measured to
+    c[i], the carry out is left on q[3n] and measured to c[n], and all
+    ancillas are returned to |0>.
+'''
+from Basic_Gates.Temperary_logical_AND import Temperary_logical_AND, Temperary_logical_AND_dagger
+
+def Brent_Kung_network(n):
+    '''
+    The Brent-Kung network: an up-sweep and a down-sweep of a binary tree,
+        2 log n levels and fan-out 2.
+    '''
+    levels = []
+    d = 1
+    while 2*d <= n:
+        levels.append([(i, i-d) for i in range(2*d-1, n, 2*d)])
+        d *= 2
+    d //= 2
+    while d >= 1:
+        level = [(i, i-d) for i in range(3*d-1, n, 2*d)]
+        if level:
+            levels.append(level)
+        d //= 2
+    return levels
+
+def Kogge_Stone_network(n):
+    '''
+    The Kogge-Stone network: log n levels, in which every block absorbs the
+        block 2^t bits below it.
+    '''
+    levels = []
+    d = 1
+    while d < n:
+        levels.append([(i, i-d) for i in range(d, n)])
+        d *= 2
+    return levels
+
+def Sklansky_network(n):
+    '''
+    The Sklansky network: log n levels, in which every block of 2^t bits
+        is absorbed by all bits of the next block.
+    '''
+    levels = []
+    t = 0
+    while (1<<t) < n:
+        levels.append([(i, ((i>>t)<<t)-1) for i in range(n) if (i>>t)&1])
+        t += 1
+    return levels
+
+def _plan(network, n, in_place):
+    # Trace the blocks through the network. The qubits are named ('z', i)
+    # for q[3i+3], ('b', i) for q[3i+2], and ('g', i), ('G', m), ('P', m)
+    # for ancillas which hold g_i, the G of a block and the P of a block.
+    start = list(range(n))
+    G = [('z', i) if in_place or i==0 else ('g', i) for i in range(n)]
+    P = [('b', i) for i in range(n)]
+    levels = []
+    num_G = num_P = 0
+    for level in network(n):
+        written = [i for i, k in level]
+        if len(set(written))!=len(written):
+            raise ValueError("A block is absorbed twice in one level")
+        if in_place and set(written) & set(k for i, k in level):
+            raise ValueError("The in-place network reads a block written in the same level")
+        ops = []
+        for i, k in level:
+            if not 0 <= k < i < n or start[i]!=k+1:
+                raise ValueError("Block %d cannot absorb block %d" % (i, k))
+            op = {'P_i': P[i], 'P_k': P[k], 'G_i': G[i], 'G_k': G[k], 'final': start[k]==0, 'P_new': None}
+            if in_place or op['final']:
+                op['target'] = ('z', i)
+            else:
+                op['target'] = ('G', num_G)
+                num_G += 1
+            if not op['final']:
+                op['P_new'] = ('P', num_P)
+                num_P += 1
+            ops.append((i, k, op))
+        old_start = list(start)
+        for i, k, op in ops:
+            start[i] = old_start[k]
+            G[i] = op['target']
+            if op['P_new'] is not None:
+                P[i] = op['P_new']
+        levels.append([op for i, k, op in ops])
+    if any(start):
+        raise ValueError("The network does not compute all carries for n=%d" % n)
+    # the P of a block is only computed if a later level reads it
+    live = set()
+    for level in reversed(levels):
+        for op in reversed(level):
+            if op['P_new'] not in live:
+                op['P_new'] = None
+            else:
+                live.add(op['P_k'])
+            live.add(op['P_i'])
+    return levels
+
+def _fan_out(levels_reads):
+    # number of copies needed so that every qubit is read by one op only
+    counts = {}
+    for qubit in levels_reads:
+        counts[qubit] = counts.get(qubit, 0) + 1
+    return sum(count-1 for count in counts.values())
+
+def _op_reads(op, in_place):
+    reads = [op['P_i'], op['G_k']]
+    if op['P_new'] is not None:
+        reads.append(op['P_k'])
+    if not in_place:
+        reads.append(op['G_i'])
+    return reads
+
+def _ancillas(levels, n, in_place):
+    # index of every ancilla after q[3n], and the number of copies
+    names = []
+    if not in_place:
+        names += [('g', i) for i in range(1, n)]
+    for level in levels:
+        for op in level:
+            if op['target'][0]=='G':
+                names.append(op['target'])
+            if op['P_new'] is not None:
+                names.append(op['P_new'])
+    index = {name: k for k, name in enumerate(names)}
+    num_copies = 0
+    if not in_place:
+        for level in levels:
+            reads = [qubit for op in level for qubit in _op_reads(op, in_place)]
+            num_copies = max(num_copies, _fan_out(reads))
+    return index, num_copies
+
+def prefix_ancillas(network, n, in_place=False):
+    '''
+    This is used to get the number of ancillas of a prefix adder.
+    input:
+        network     :       prefix network, e.g., Brent_Kung_network
+        n           :       length of input data
+        in_place    :       whether the G of the blocks are updated in place
+    output:
+        num_ancillas
+    '''
+    index, num_copies = _ancillas(_plan(network, n, in_place), n, in_place)
+    return len(index) + num_copies
+
+def _copies(circ, qubit, copies):
+    # fan out a qubit to the copies with a tree of CNOT gates
+    holders = [qubit]
+    copies = list(copies)
+    while copies:
+        new = []
+        for holder in holders:
+            if copies:
+                target = copies.pop(0)
+                circ.cx(holder, target)
+                new.append(target)
+        holders += new
+    return holders
+
+def _level(circ, level, name, copy_pool, inverse):
+    # one level of the out-of-place network with its reads fanned out
+    readers = {}
+    for op in level:
+        for qubit in _op_reads(op, False):
+            readers.setdefault(name(qubit), []).append(op)
+    sources = {}
+    trees = []
+    pool = list(copy_pool)
+    for qubit, ops in readers.items():
+        copies = [pool.pop() for _ in range(len(ops)-1)]
+        holders = _copies(circ, qubit, copies)
+        trees.append((qubit, copies))
+        for op, holder in zip(ops, holders):
+            sources[(id(op), qubit)] = holder
+    for op in (reversed(level) if inverse else level):
+        read = lambda qubit: sources[(id(op), name(qubit))]
+        target = name(op['target'])
+        if inverse and op['P_new'] is not None:
+            Temperary_logical_AND_dagger(circ, read(op['P_i']), read(op['P_k']), name(op['P_new']))
+        if inverse:
+            circ.ccx(read(op['P_i']), read(op['G_k']), target)
+            circ.cx(read(op['G_i']), target)
+        else:
+            circ.cx(read(op['G_i']), target)
+            circ.ccx(read(op['P_i']), read(op['G_k']), target)
+        if not inverse and op['P_new'] is not None:
+            Temperary_logical_AND(circ, read(op['P_i']), read(op['P_k']), name(op['P_new']))
+    # the copies are returned to |0>
+    for qubit, copies in reversed(trees):
+        _uncopy(circ, qubit, copies)
+
+def _uncopy(circ, qubit, copies):
+    # the CNOT tree of _copies in reverse order
+    gates = []
+    holders = [qubit]
+    copies = list(copies)
+    while copies:
+        new = []
+        for holder in holders:
+            if copies:
+                target = copies.pop(0)
+                gates.append((holder, target))
+                new.append(target)
+        holders += new
+    for holder, target in reversed(gates):
+        circ.cx(holder, target)
+
+def Prefix_adder(circ, q, c, n, network, in_place=False):
+    '''
+    This circuit is a parallel-prefix adder with a pluggable prefix network.
+        If user wants to add it in their circuits, they need to pass their
+        circuit, qubits, classical registers, length of input data and the
+        prefix network.
+
+    The generate bits are computed with Temperary_logical_AND and the carry
+        in is absorbed into bit 0. Then every pair (i, k) of the network
+        absorbs block k into block i:
+
+            G_i' = G_i xor P_i G_k,     P_i' = P_i P_k
+
+        where G_i' is computed with a CNOT and a Toffoli gate, and P_i' with
+        Temperary_logical_AND. By default every level writes new ancillas
+        and reads the previous level, and a qubit read by several pairs of a
+        level is first fanned out to copies, so each level has a constant
+        depth plus the depth of the fan-out. The G of a block which reaches
+        bit 0 is the carry, which is written to q[3i+3]. After the carries,
+        the levels are run in reverse to return the ancillas to |0>.
+
+        With in_place=True, the G of the blocks are updated in place on
+        q[3i+3], as in (Draper, et al. 2004): all P are computed first, then
+        the G, and then the P are uncomputed. This needs far fewer
+        ancillas, but a level must not read a block that it writes.
+
+    input:
+        circ        :       circuit
+        q           :       input qubit, 3n+1 qubits and the ancillas
+                                given by prefix_ancillas
+        c           :       classical register
+        n           :       length of input data
+        network     :       prefix network, e.g., Brent_Kung_network
+        in_place    :       whether the G of the blocks are updated in place
+    output:
+        circ        :       circuit
+
+    **Example:**
+
+    circ = Prefix_adder(circ, q, c, n, Kogge_Stone_network)
+
+    **Math:**
+
+    .. math::
+
+        Sum_i = A_i\oplus B_i\oplus Carry_i
+        Carry_{i+1} = G_{[0,i]}
+
+    '''
+    levels = _plan(network, n, in_place)
+    index, num_copies = _ancillas(levels, n, in_place)
+    def name(qubit):
+        kind, i = qubit
+        if kind=='z':
+            return q[3*i+3]
+        if kind=='b':
+            return q[3*i+2]
+        return q[3*n+1+index[qubit]]
+    copy_pool = [q[3*n+1+len(index)+k] for k in range(num_copies)]
+    # generate and propagate bits, and the carry in
+    for i in range(n):
+        circ = Temperary_logical_AND(circ, q[3*i+1], q[3*i+2], q[3] if i==0 else name(('z', i) if in_place else ('g', i)))
+    for i in range(n):
+        circ.cx(q[3*i+1], q[3*i+2])
+    circ.ccx(q[2], q[0], q[3])
+    if in_place:
+        ops = [op for level in levels for op in level]
+        for op in ops:
+            if op['P_new'] is not None:
+                circ = Temperary_logical_AND(circ, name(op['P_i']), name(op['P_k']), name(op['P_new']))
+        for level in levels:
+            for op in level:
+                circ.ccx(name(op['P_i']), name(op['G_k']), name(op['target']))
+        for op in reversed(ops):
+            if op['P_new'] is not None:
+                circ = Temperary_logical_AND_dagger(circ, name(op['P_i']), name(op['P_k']), name(op['P_new']))
+    else:
+        for level in levels:
+            _level(circ, level, name, copy_pool, False)
+        for level in reversed(levels):
+            _level(circ, [op for op in level if not op['final']], name, copy_pool, True)
+        # the generate bits are uncomputed with the original B
+        for i in range(1, n):
+            circ.cx(q[3*i+1], q[3*i+2])
+            circ = Temperary_logical_AND_dagger(circ, q[3*i+1], q[3*i+2], name(('g', i)))
+            circ.cx(q[3*i+1], q[3*i+2])
+    # sum bits
+    for i in range(n):
+        circ.cx(q[3*i], q[3*i+2])
+        circ.measure(q[3*i+2], c[i])
+    circ.measure(q[3*n], c[n])
+    return circ
+
+def Brent_Kung_adder(circ, q, c, n):
+    '''
+    This circuit is a parallel-prefix adder with the Brent-Kung network,
+        see Prefix_adder.
+    '''
+    return Prefix_adder(circ, q, c, n, Brent_Kung_network)
+
+def Kogge_Stone_adder(circ, q, c, n):
+    '''
+    This circuit is a parallel-prefix adder with the Kogge-Stone network,
+        see Prefix_adder.
+    '''
+    return Prefix_adder(circ, q, c, n, Kogge_Stone_network)
+
+def Sklansky_adder(circ, q, c, n):
+    '''
+    This circuit is a parallel-prefix adder with the Sklansky network,
+        see Prefix_adder.
+    '''
+    return Prefix_adder(circ, q, c, n, Sklansky_network)
+
+def Draper_adder(circ, q, c, n):
+    '''
+    This circuit is the out-of-place carry-lookahead adder proposed in
+        (Draper, et al. 2004), i.e., the Brent-Kung network with the G of
+        the blocks updated in place, see Prefix_adder.
+    '''
+    return Prefix_adder(circ, q, c, n, Brent_Kung_network, in_place=True)
+
+# network and in_place of each adder
+PREFIX_ADDERS = {
+    'Brent_Kung_adder'  : (Brent_Kung_network, False),
+    'Kogge_Stone_adder' : (Kogge_Stone_network, False),
+    'Sklansky_adder'    : (Sklansky_network, False),
+    'Draper_adder'      : (Brent_Kung_network, True),
+}
+
+if __name__ == "__main__":
+    from qiskit import QuantumRegister, ClassicalRegister
+    from qiskit import QuantumCircuit
+    from qiskit.providers.aer import QasmSimulator
+    from qiskit import transpile
+    from Basic_Gates.init_state import bit2gate
+    data_A = "1011"
+    data_B = "0111"
+    Carry_in = '1'
+    data_A = data_A[::-1]
+    data_B = data_B[::-1]
+    n = len(data_A)
+    network, in_place = PREFIX_ADDERS['Draper_adder']
+    # initiate 3n+1 qubits and the ancillas
+    q = QuantumRegister(3*n+1+prefix_ancillas(network, n, in_place),'q')
+    # initiate n+1 traditional bits
+    c = ClassicalRegister(n+1,'c')
+    #initiate quantum circuit
+    circ = QuantumCircuit(q,c)
+    # transform custom bit to quantum state vector
+    data_string = ''
+    data_string += Carry_in
+    for i in range(n):
+        data_string += data_A[i]
+        data_string += data_B[i]
+        data_string += '0'
+    # prepare custom bit on the qubits with X gates
+    circ = bit2gate(circ, q, data_string)
+    # build the quantum circuit
+    circ = Draper_adder(circ, q, c, n)
+    print(circ.draw())
+
+    # Build a simulator to exert the quantum circuit
+    backend = QasmSimulator()
+
+    # First we have to transpile the quantum circuit
+    # to the low-level QASM instructions used by the
+    # backend
+    circ_compiled = transpile(circ, backend)
+
+    # Execute the circuit on the qasm simulator.
+    # We've set the number of repeats of the circuit
+    # to be 1, because each state of each qubit is |0> or |1>
+    # rather than superposition state.
+    job_sim = backend.run(circ_compiled, shots=1)
+
+    # Grab the results from the job.
+    result_sim = job_sim.result()
+    counts = result_sim.get_counts(circ_compiled)
+    print(counts)
@@ -1,11 +1,4 @@
-from qiskit import QuantumRegister, ClassicalRegister
-from qiskit import QuantumCircuit
-from qiskit.providers.aer import QasmSimulator
-from qiskit import transpile
-import sys
-sys.path.append("..")
-from Basic_Gates.init_state import bit2state
-from BQFA.BQFA_in_Cuccaro import *
+from BQFA.BQFA_in_Cuccaro import BQFA_in_Cuccaro
 
 def QMDA_in_Cuccaro(circ, q, c, n):
     '''
@@ -47,8 +40,13 @@ def QMDA_in_Cuccaro(circ, q, c, n):
     return circ
 
 if __name__ == "__main__":
+    from qiskit import QuantumRegister, ClassicalRegister
+    from qiskit import QuantumCircuit
+    from qiskit.providers.aer import QasmSimulator
+    from qiskit import transpile
+    from Basic_Gates.init_state import bit2gate
     data_A = "1111"
-    data_B = "1112"
+    data_B = "1111"
     Carry = "11"        
     n = len(data_A)//2
     # initiate 3 qubits
@@ -66,9 +64,8 @@ if __name__ == "__main__":
         data_string += data_B[2*i+1]
         data_string += '0'
     data_string += Carry
-    initial_state = bit2state(data_string)
-    # initial input qubit state
-    circ.set_statevector(initial_state)
+    # prepare custom bit on the qubits with X gates
+    circ = bit2gate(circ, q, data_string)
     # build the quantum circuit
     circ = QMDA_in_Cuccaro(circ, q, c, n)
     print(circ.draw())
@@ -1,11 +1,4 @@
-from qiskit import QuantumRegister, ClassicalRegister
-from qiskit import QuantumCircuit
-from qiskit.providers.aer import QasmSimulator
-from qiskit import transpile
-import sys
-sys.path.append("..")
-from Basic_Gates.init_state import bit2state
-from BQFA.BQFA_in_Mazumder import *
+from BQFA.BQFA_in_Mazumder import BQFA_in_Mazumder
 
 def QMDA_in_Mazumder(circ, q, c, n):
     '''
@@ -34,8 +27,8 @@ def QMDA_in_Mazumder(circ, q, c, n):
     for i in range(n-1):
         circ.x(q[12*i+8])
         circ = BQFA_in_Mazumder(circ, q[12*i+4],q[12*i+7],q[12*i+8],q[12*i+13],q[12*i+9],q[12*i+10],q[12*i+11])
-        circ.x(q[12*i+8])
-        circ.measure(q[12*i+8],c[2*i+1])
+        circ.x(q[12*i+7])
+        circ.measure(q[12*i+7],c[2*i+1])
         circ.measure(q[12*i+9],c[2*i+2])
     circ.x(q[12*n-4])
     circ = BQFA_in_Mazumder(circ, q[12*n-8],q[12*n-5],q[12*n-4],q[12*n],q[12*n-3],q[12*n-2],q[12*n-1])
@@ -46,6 +39,11 @@ def QMDA_in_Mazumder(circ, q, c, n):
     return circ
 
 if __name__ == "__main__":
+    from qiskit import QuantumRegister, ClassicalRegister
+    from qiskit import QuantumCircuit
+    from qiskit.providers.aer import QasmSimulator
+    from qiskit import transpile
+    from Basic_Gates.init_state import bit2gate
     data_A = "1111"
     data_B = "0010"
     Carry = "10"     
@@ -67,9 +65,8 @@ if __name__ == "__main__":
         data_string += data_B[2*i+1]
         data_string += '001'
     data_string += Carry
-    initial_state = bit2state(data_string)
-    # initial input qubit state
-    circ.set_statevector(initial_state)
+    # prepare custom bit on the qubits with X gates
+    circ = bit2gate(circ, q, data_string)
     # build the quantum circuit
     circ = QMDA_in_Mazumder(circ, q, c, n)
     print(circ.draw())
@@ -1,13 +1,6 @@
-from qiskit import QuantumRegister, ClassicalRegister
-from qiskit import QuantumCircuit
-from qiskit.providers.aer import QasmSimulator
-from qiskit import transpile
-import sys
-sys.path.append("..")
-from Basic_Gates.init_state import bit2state
-from BQFA.BQFA_Sum_First import *
-from BQFA.BQFA_in_Cuccaro import *
-from BQFA.BQFA_in_Google import *
+from BQFA.BQFA_Sum_First import BQFA_Sum_first_left, BQFA_Sum_first_right
+from BQFA.BQFA_in_Cuccaro import MAG, UMA_1
+from BQFA.BQFA_in_Google import BQFA_in_Google
 
 def QMDA_mixed(circ, q, c, n):
     '''
@@ -52,6 +45,11 @@ def QMDA_mixed(circ, q, c, n):
     return circ
 
 if __name__ == "__main__":
+    from qiskit import QuantumRegister, ClassicalRegister
+    from qiskit import QuantumCircuit
+    from qiskit.providers.aer import QasmSimulator
+    from qiskit import transpile
+    from Basic_Gates.init_state import bit2gate
     data_A = "1111"
     data_B = "1111"
     Carry = "11"        
@@ -69,9 +67,8 @@ if __name__ == "__main__":
         data_string += data_B[2*i:2*i+2]
         data_string += '0'
     data_string += Carry
-    initial_state = bit2state(data_string)
-    # initial input qubit state
-    circ.set_statevector(initial_state)
+    # prepare custom bit on the qubits with X gates
+    circ = bit2gate(circ, q, data_string)
     # build the quantum circuit
     circ = QMDA_mixed(circ, q, c, n)
     print(circ.draw())
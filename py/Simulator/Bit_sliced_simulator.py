@@ -0,0 +1,143 @@
+import numpy as np
+from Tools.adder_layout import adder_builder, adder_layout
+
+class Bit_sliced_simulator:
+    '''
+    This is a bit-sliced simulator of reversible circuits whose gates are X,
+        CNOT, Toffoli and SWAP. Many basis-state inputs are simulated at
+        once: the state of a qubit in all inputs is stored in a bit-plane of
+        uint64 words, one bit per input, so each word covers 64 inputs. The
+        gates are vectorised XOR and AND over the bit-planes.
+
+    The simulator has the same gate methods as a qiskit circuit, thus it
+        can be passed to the circuit builders in place of "circ". Qubits
+        and classical bits are integer indices, which are provided by the
+        "q" and "c" attributes.
+
+    input:
+        num_qubits  :       number of qubits, whose initial state is |0>
+        num_clbits  :       number of classical bits
+        num_inputs  :       number of inputs simulated at once
+
+    **Example:**
+
+    sim = Bit_sliced_simulator(3*n+1, n+1, len(bits))
+    sim.set_plane(sim.q[1], bits)
+    sim = CRA_in_Islam(sim, sim.q, sim.c, n)
+    bits = sim.get_clbit(sim.c[0])
+
+    bits is the least significant bit of the sum for every input.
+    '''
+
+    def __init__(self, num_qubits, num_clbits, num_inputs):
+        self.q = range(num_qubits)
+        self.c = range(num_clbits)
+        self.num_inputs = num_inputs
+        num_words = (num_inputs+63)//64
+        self.planes = np.zeros((num_qubits, num_words), dtype=np.uint64)
+        self.clbits = np.zeros((num_clbits, num_words), dtype=np.uint64)
+
+    def __getattr__(self, name):
+        # gates that are not a permutation of the basis states
+        raise AttributeError("Bit_sliced_simulator only supports X, CNOT, "
+                             "Toffoli and SWAP gates, '%s' is not supported" % name)
+
+    def x(self, q_t):
+        np.invert(self.planes[q_t], out=self.planes[q_t])
+
+    def cx(self, q_c, q_t):
+        self.planes[q_t] ^= self.planes[q_c]
+
+    def ccx(self, q_c1, q_c2, q_t):
+        self.planes[q_t] ^= self.planes[q_c1] & self.planes[q_c2]
+
+    def swap(self, q_0, q_1):
+        self.planes[[q_0, q_1]] = self.planes[[q_1, q_0]]
+
+    def measure(self, q, c):
+        self.clbits[c] = self.planes[q]
+
+    def barrier(self, *args):
+        pass
+
+    def set_plane(self, q, bits):
+        '''
+        This is used to prepare a qubit in all inputs.
+        input:
+            q       :       qubit
+            bits    :       array of 0 and 1, the state of the qubit in each input
+        '''
+        padded = np.zeros(self.planes.shape[1]*64, dtype=np.uint8)
+        padded[:self.num_inputs] = bits
+        self.planes[q] = np.packbits(padded, bitorder='little').view(np.uint64)
+
+    def get_plane(self, q):
+        '''
+        This is used to get the state of a qubit in all inputs.
+        '''
+        return self._unpack(self.planes[q])
+
+    def get_clbit(self, c):
+        '''
+        This is used to get the measured classical bit in all inputs.
+        '''
+        return self._unpack(self.clbits[c])
+
+    def _unpack(self, plane):
+        bits = np.unpackbits(plane.view(np.uint8), bitorder='little')
+        return bits[:self.num_inputs]
+
+def bit_sliced_add(name, n, A, B, carry):
+    '''
+    This is used to run an adder on arrays of inputs with the
+        Bit_sliced_simulator.
+    input:
+        name        :       name of the adder, e.g., 'CRA_in_Islam'. The adder
+                                must be built from X, CNOT, Toffoli and SWAP.
+        n           :       length of input data
+        A, B        :       arrays of input data
+        carry       :       array of input carry
+    output:
+        result      :       array of decoded sums, see Tools.adder_layout
+                                for the encoding of each adder
+
+    **Example:**
+
+    result = bit_sliced_add('CRA_in_Islam', 8, A, B, carry)
+
+    result[k] is A[k]+B[k]+carry[k].
+    '''
+    layout = adder_layout(name, n)
+    if max(abs(weight) for weight in layout['sum_weights']) >= 2**62:
+        raise ValueError("The sum of %s with n=%d does not fit in int64" % (name, n))
+    A = np.asarray(A, dtype=np.uint64)
+    B = np.asarray(B, dtype=np.uint64)
+    carry = np.asarray(carry, dtype=np.uint64)
+    sim = Bit_sliced_simulator(layout['num_qubits'], layout['num_clbits'], len(A))
+    for i in layout['ones']:
+        sim.x(sim.q[i])
+    for key, value in (('A', A), ('B', B), ('carry', carry)):
+        for j, i in enumerate(layout[key]):
+            sim.set_plane(sim.q[i], (value>>np.uint64(j)) & np.uint64(1))
+    sim = adder_builder(name)(sim, sim.q, sim.c, n)
+    result = np.zeros(len(A), dtype=np.int64)
+    for c, weight in enumerate(layout['sum_weights']):
+        if weight!=0:
+            result += weight * sim.get_clbit(sim.c[c]).astype(np.int64)
+    return result
+
+if __name__ == "__main__":
+    import time
+    # input
+    n = 16
+    num_inputs = 10**6
+    rng = np.random.default_rng()
+    A = rng.integers(0, 2**n, num_inputs, dtype=np.uint64)
+    B = rng.integers(0, 2**n, num_inputs, dtype=np.uint64)
+    Carry_in = rng.integers(0, 2, num_inputs, dtype=np.uint64)
+    for name in ('CRA_in_Islam', 'CRA_in_Cuccaro_2cnotversion', 'CRA_in_Sohel', 'CRA_in_Mazumder'):
+        start = time.perf_counter()
+        result = bit_sliced_add(name, n, A, B, Carry_in)
+        elapsed = time.perf_counter() - start
+        correct = np.array_equal(result, (A+B+Carry_in).astype(np.int64))
+        print("%s: %d inputs of %d bits, correct: %s, %.0f inputs/s" % (name, num_inputs, n, correct, num_inputs/elapsed))
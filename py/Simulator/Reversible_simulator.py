@@ -0,0 +1,129 @@
+from Basic_Gates.init_state import bit2gate
+
+class Reversible_simulator:
+    '''
+    This is a classical simulator of reversible circuits whose gates are
+        X, CNOT, Toffoli and SWAP, i.e., circuits that only permute the
+        computational basis states. The state of each qubit is stored as
+        a single bit, so a circuit with m gates on n qubits is simulated
+        in O(m) time and O(n) memory.
+
+    The simulator has the same gate methods as a qiskit circuit, thus it
+        can be passed to the circuit builders in place of "circ". Qubits
+        and classical bits are integer indices, which are provided by the
+        "q" and "c" attributes.
+
+    input:
+        num_qubits  :       number of qubits, whose initial state is |0>
+        num_clbits  :       number of classical bits
+
+    **Example:**
+
+    sim = Reversible_simulator(3*n+1, n+1)
+    sim = bit2gate(sim, sim.q, data_string)
+    sim = CRA_in_Islam(sim, sim.q, sim.c, n)
+    counts = sim.get_counts()
+
+    counts is the same as the counts returned by the qasm simulator with
+        shots=1, e.g., {'110': 1}.
+    '''
+
+    def __init__(self, num_qubits, num_clbits=0):
+        self.q = range(num_qubits)
+        self.c = range(num_clbits)
+        self.qubits = bytearray(num_qubits)
+        self.clbits = bytearray(num_clbits)
+
+    def __getattr__(self, name):
+        # gates that are not a permutation of the basis states
+        raise AttributeError("Reversible_simulator only supports X, CNOT, "
+                             "Toffoli and SWAP gates, '%s' is not supported" % name)
+
+    def x(self, q_t):
+        self.qubits[q_t] ^= 1
+
+    def cx(self, q_c, q_t):
+        self.qubits[q_t] ^= self.qubits[q_c]
+
+    def ccx(self, q_c1, q_c2, q_t):
+        self.qubits[q_t] ^= self.qubits[q_c1] & self.qubits[q_c2]
+
+    def swap(self, q_0, q_1):
+        qubits = self.qubits
+        qubits[q_0], qubits[q_1] = qubits[q_1], qubits[q_0]
+
+    def measure(self, q, c):
+        self.clbits[c] = self.qubits[q]
+
+    def barrier(self, *args):
+        pass
+
+    def get_bits(self):
+        '''
+        The states of all qubits. The i-th character is the state of q[i],
+            which is the same bit ordering as bit2gate.
+        '''
+        return ''.join('1' if bit else '0' for bit in self.qubits)
+
+    def get_counts(self):
+        '''
+        The measured classical bits in the same format as the counts of
+            qiskit, i.e., c[0] is the rightmost character.
+        '''
+        return {''.join('1' if bit else '0' for bit in reversed(self.clbits)): 1}
+
+def reversible_run(circ, input_bit):
+    '''
+    This is used to run a qiskit circuit, which has been built, on the
+        Reversible_simulator.
+    input:
+        circ        :       circuit
+        input_bit   :       input state of the qubits, the i-th character
+                                is the state of q[i]
+    output:
+        counts      :       measured classical bits, which is the same as
+                                the counts returned by the qasm simulator
+                                with shots=1
+    '''
+    sim = Reversible_simulator(circ.num_qubits, circ.num_clbits)
+    sim = bit2gate(sim, sim.q, input_bit)
+    for inst in circ.data:
+        qubits = [circ.find_bit(qubit).index for qubit in inst.qubits]
+        clbits = [circ.find_bit(clbit).index for clbit in inst.clbits]
+        name = inst.operation.name
+        if name=='measure':
+            sim.measure(qubits[0], clbits[0])
+        elif name in ('x', 'cx', 'ccx', 'swap', 'barrier'):
+            getattr(sim, name)(*qubits)
+        elif name!='id':
+            raise ValueError("Reversible_simulator does not support '%s' gate" % name)
+    return sim.get_counts()
+
+if __name__ == "__main__":
+    import random
+    import time
+    from QCRA.CAR_in_Islam import CRA_in_Islam
+    # input
+    n = 1000
+    data_A = random.getrandbits(n)
+    data_B = random.getrandbits(n)
+    Carry_in = random.getrandbits(1)
+    # the operands are stored from the least significant bit
+    bits_A = format(data_A, '0%db' % n)[::-1]
+    bits_B = format(data_B, '0%db' % n)[::-1]
+    data_string = str(Carry_in)
+    for i in range(n):
+        data_string += bits_A[i]
+        data_string += bits_B[i]
+        data_string += '0'
+    start = time.perf_counter()
+    # initiate the simulator with 3n+1 qubits and n+1 classical bits
+    sim = Reversible_simulator(3*n+1, n+1)
+    # prepare custom bit on the qubits with X gates
+    sim = bit2gate(sim, sim.q, data_string)
+    # build and execute the quantum circuit
+    sim = CRA_in_Islam(sim, sim.q, sim.c, n)
+    counts = sim.get_counts()
+    elapsed = time.perf_counter() - start
+    result = int(list(counts)[0], 2)
+    print("%d-bit CRA_in_Islam: %s in %.3f ms" % (n, result==data_A+data_B+Carry_in, elapsed*1e3))
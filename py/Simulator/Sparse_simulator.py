@@ -0,0 +1,324 @@
+import cmath
+import math
+import random
+from Basic_Gates.init_state import bit2gate
+from Tools.adder_layout import adder_builder, adder_layout, data_string, decode_counts
+
+class _Conditional:
+    # returned by the self-inverse gates, so that the gate can be
+    # conditioned on a classical bit with c_if as in qiskit: the gate has
+    # already been applied, and it is applied again to undo it if the
+    # classical bit does not hold the value
+    def __init__(self, sim, gate, args):
+        self._sim = sim
+        self._gate = gate
+        self._args = args
+
+    def c_if(self, c, value):
+        if self._sim.clbits[c]!=value:
+            self._gate(*self._args)
+        return self
+
+class Sparse_simulator:
+    '''
+    This is a sparse state-vector simulator for circuits built from
+        Clifford+T gates, CSX and controlled phase gates. Only the non-zero
+        amplitudes are stored, in a dictionary from the index of the basis
+        state to its complex amplitude, where bit i of the index is the
+        state of q[i]. Amplitudes whose magnitude drops below "tolerance"
+        are pruned after every branching gate.
+
+    On a basis-state input, the H branches of the adders recombine within a
+        few gates, e.g., Temperary_logical_AND never holds more than two
+        basis states, so an adder with hundreds of qubits is simulated with
+        a handful of amplitudes, while the dense state vector needs 2^n.
+
+    The simulator has the same gate methods as a qiskit circuit, thus it
+        can be passed to the circuit builders in place of "circ". Qubits
+        and classical bits are integer indices, which are provided by the
+        "q" and "c" attributes.
+
+    input:
+        num_qubits  :       number of qubits, whose initial state is |0>
+        num_clbits  :       number of classical bits
+        tolerance   :       amplitudes whose magnitude is below are dropped
+        seed        :       seed of the random outcomes of measurements
+        term_limit  :       largest number of amplitudes allowed, a
+                                MemoryError is raised when a gate exceeds it
+
+    **Example:**
+
+    sim = Sparse_simulator(3*n+1, n+1)
+    sim = bit2gate(sim, sim.q, data_string)
+    sim = CRA_in_Google(sim, sim.q, sim.c, n)
+    counts = sim.get_counts()
+    phases = sim.get_phases()
+
+    counts is the same as the counts returned by the qasm simulator with
+        shots=1, e.g., {'110': 1}, and phases holds the phase of every
+        basis state left relative to the largest amplitude.
+
+    The gates x, z, cx and cz can be conditioned on a classical bit with
+        c_if, e.g., sim.cz(q[0], q[1]).c_if(c[0], 1), which is used by the
+        measurement-based uncomputation. "random_clbits" holds the
+        classical bits whose last measurement had a random outcome, thus a
+        random mid-circuit measurement whose classical bit is measured
+        again later does not make the counts random.
+    '''
+
+    def __init__(self, num_qubits, num_clbits=0, tolerance=1e-12, seed=None, term_limit=None):
+        self.q = range(num_qubits)
+        self.c = range(num_clbits)
+        self.tolerance = tolerance
+        self.state = {0: 1+0j}
+        self.clbits = bytearray(num_clbits)
+        # number of measurements whose outcome was random, and the
+        # classical bits which hold a random outcome
+        self.random_measurements = 0
+        self.random_clbits = set()
+        # largest number of amplitudes held at once
+        self.max_terms = 1
+        self.term_limit = term_limit
+        self._rng = random.Random(seed)
+
+    def __getattr__(self, name):
+        raise AttributeError("Sparse_simulator does not support '%s' gate" % name)
+
+    # permutation gates
+    def x(self, q_t):
+        mask = 1<<q_t
+        self.state = {index^mask: amp for index, amp in self.state.items()}
+        return _Conditional(self, self.x, (q_t,))
+
+    def cx(self, q_c, q_t):
+        c, mask = 1<<q_c, 1<<q_t
+        self.state = {(index^mask if index&c else index): amp for index, amp in self.state.items()}
+        return _Conditional(self, self.cx, (q_c, q_t))
+
+    def ccx(self, q_c1, q_c2, q_t):
+        c, mask = (1<<q_c1)|(1<<q_c2), 1<<q_t
+        self.state = {(index^mask if index&c==c else index): amp for index, amp in self.state.items()}
+
+    def swap(self, q_0, q_1):
+        state = {}
+        for index, amp in self.state.items():
+            if (index>>q_0 ^ index>>q_1) & 1:
+                index ^= (1<<q_0)|(1<<q_1)
+            state[index] = amp
+        self.state = state
+
+    # diagonal gates
+    def _phase(self, mask, phase):
+        # multiply the amplitudes whose bits in mask are all 1 by phase
+        state = self.state
+        for index in state:
+            if index&mask==mask:
+                state[index] *= phase
+
+    def z(self, q_t):
+        self._phase(1<<q_t, -1)
+        return _Conditional(self, self.z, (q_t,))
+
+    def s(self, q_t):
+        self._phase(1<<q_t, 1j)
+
+    def sdg(self, q_t):
+        self._phase(1<<q_t, -1j)
+
+    def t(self, q_t):
+        self._phase(1<<q_t, cmath.exp(1j*math.pi/4))
+
+    def tdg(self, q_t):
+        self._phase(1<<q_t, cmath.exp(-1j*math.pi/4))
+
+    def p(self, theta, q_t):
+        self._phase(1<<q_t, cmath.exp(1j*theta))
+
+    def cz(self, q_c, q_t):
+        self._phase((1<<q_c)|(1<<q_t), -1)
+        return _Conditional(self, self.cz, (q_c, q_t))
+
+    def cp(self, theta, q_c, q_t):
+        self._phase((1<<q_c)|(1<<q_t), cmath.exp(1j*theta))
+
+    # branching gates
+    def _single(self, q_t, matrix, control=0):
+        # apply the 2x2 matrix on q_t to the basis states whose bits in
+        # control are all 1
+        mask = 1<<q_t
+        (u00, u01), (u10, u11) = matrix
+        state = {}
+        for index, amp in self.state.items():
+            if index&control!=control:
+                state[index] = state.get(index, 0) + amp
+            elif index&mask:
+                state[index^mask] = state.get(index^mask, 0) + u01*amp
+                state[index] = state.get(index, 0) + u11*amp
+            else:
+                state[index] = state.get(index, 0) + u00*amp
+                state[index^mask] = state.get(index^mask, 0) + u10*amp
+        self._prune(state)
+
+    def _prune(self, state):
+        tolerance = self.tolerance
+        self.state = {index: amp for index, amp in state.items() if abs(amp)>tolerance}
+        self.max_terms = max(self.max_terms, len(self.state))
+        if self.term_limit is not None and len(self.state) > self.term_limit:
+            raise MemoryError("The state holds %d amplitudes, more than the limit of %d"
+                              % (len(self.state), self.term_limit))
+
+    def h(self, q_t):
+        r = 1/math.sqrt(2)
+        self._single(q_t, ((r, r), (r, -r)))
+
+    def sx(self, q_t):
+        self._single(q_t, ((0.5+0.5j, 0.5-0.5j), (0.5-0.5j, 0.5+0.5j)))
+
+    def csx(self, q_c, q_t):
+        self._single(q_t, ((0.5+0.5j, 0.5-0.5j), (0.5-0.5j, 0.5+0.5j)), control=1<<q_c)
+
+    def measure(self, q, c):
+        mask = 1<<q
+        probability = sum(abs(amp)**2 for index, amp in self.state.items() if index&mask)
+        norm = sum(abs(amp)**2 for amp in self.state.values())
+        probability /= norm
+        self.random_clbits.discard(c)
+        if probability < self.tolerance:
+            bit = 0
+        elif probability > 1-self.tolerance:
+            bit = 1
+        else:
+            # the outcome is random, so the state collapses
+            self.random_measurements += 1
+            self.random_clbits.add(c)
+            bit = int(self._rng.random() < probability)
+            scale = 1/math.sqrt(probability if bit else 1-probability)
+            self.state = {index: amp*scale for index, amp in self.state.items()
+                          if bool(index&mask)==bool(bit)}
+        self.clbits[c] = bit
+
+    def barrier(self, *args):
+        pass
+
+    def get_amplitudes(self):
+        '''
+        The non-zero amplitudes. The i-th character of each key is the state
+            of q[i], which is the same bit ordering as bit2gate.
+        '''
+        num_qubits = len(self.q)
+        return {format(index, '0%db' % num_qubits)[::-1]: amp for index, amp in self.state.items()}
+
+    def get_phases(self):
+        '''
+        The phase in radians of each basis state relative to the basis state
+            with the largest amplitude. For a circuit that maps a basis state
+            to a basis state, a single entry with phase 0 is left, otherwise
+            the other entries are the relative phases left on the outputs.
+        '''
+        reference = max(self.state.values(), key=abs)
+        amplitudes = self.get_amplitudes()
+        return {key: cmath.phase(amp/reference) for key, amp in amplitudes.items()}
+
+    def get_global_phase(self):
+        '''
+        The phase in radians of the largest amplitude, e.g., the phase that
+            is left on a basis-state output.
+        '''
+        return cmath.phase(max(self.state.values(), key=abs))
+
+    def get_counts(self):
+        '''
+        The measured classical bits in the same format as the counts of
+            qiskit, i.e., c[0] is the rightmost character.
+        '''
+        return {''.join('1' if bit else '0' for bit in reversed(self.clbits)): 1}
+
+def sparse_run(circ, input_bit, tolerance=1e-12, seed=None, term_limit=None):
+    '''
+    This is used to run a qiskit circuit, which has been built, on the
+        Sparse_simulator.
+    input:
+        circ        :       circuit
+        input_bit   :       input state of the qubits, the i-th character
+                                is the state of q[i]
+    output:
+        sim         :       simulator after the run, whose counts, amplitudes
+                                and phases can be read
+    '''
+    sim = Sparse_simulator(circ.num_qubits, circ.num_clbits, tolerance, seed, term_limit)
+    sim = bit2gate(sim, sim.q, input_bit)
+    for inst in circ.data:
+        qubits = [circ.find_bit(qubit).index for qubit in inst.qubits]
+        clbits = [circ.find_bit(clbit).index for clbit in inst.clbits]
+        name = inst.operation.name
+        if name=='measure':
+            sim.measure(qubits[0], clbits[0])
+        elif name=='id':
+            continue
+        elif inst.operation.condition is not None:
+            # a condition on a single classical bit, as written by c_if
+            clbit, value = inst.operation.condition
+            getattr(sim, name)(*inst.operation.params, *qubits).c_if(circ.find_bit(clbit).index, int(value))
+        else:
+            getattr(sim, name)(*inst.operation.params, *qubits)
+    return sim
+
+def sparse_add(name, n, inputs):
+    '''
+    This is used to run an adder input by input on the Sparse_simulator,
+        e.g., an adder with gates which are not permutations, which the
+        Bit_sliced_simulator does not support.
+    input:
+        name        :       name of the adder, e.g., 'CRA_in_Google'
+        n           :       length of input data
+        inputs      :       list of (A, B, carry)
+    output:
+        results     :       list of decoded sums, see Tools.adder_layout. The
+                                sum is None if the output needed a random
+                                measurement, i.e., the adder does not compute
+                                it, while the random mid-circuit measurements
+                                of the measurement-based uncomputation are
+                                allowed.
+    '''
+    layout = adder_layout(name, n)
+    builder = adder_builder(name)
+    results = []
+    for A, B, carry in inputs:
+        sim = Sparse_simulator(layout['num_qubits'], layout['num_clbits'])
+        sim = bit2gate(sim, sim.q, data_string(name, n, A, B, carry))
+        sim = builder(sim, sim.q, sim.c, n)
+        if sim.random_clbits:
+            results.append(None)
+        else:
+            results.append(decode_counts(name, n, sim.get_counts()))
+    return results
+
+if __name__ == "__main__":
+    import time
+    from QCRA.CRA_in_Google import CRA_in_Google
+    # input
+    n = 200
+    data_A = random.getrandbits(n)
+    data_B = random.getrandbits(n)
+    Carry_in = random.getrandbits(1)
+    # the operands are stored from the least significant bit
+    bits_A = format(data_A, '0%db' % n)[::-1]
+    bits_B = format(data_B, '0%db' % n)[::-1]
+    data_string = str(Carry_in)
+    for i in range(n):
+        data_string += bits_A[i]
+        data_string += bits_B[i]
+        data_string += '0'
+    start = time.perf_counter()
+    # initiate the simulator with 3n+1 qubits and n+1 classical bits
+    sim = Sparse_simulator(3*n+1, n+1)
+    # prepare custom bit on the qubits with X gates
+    sim = bit2gate(sim, sim.q, data_string)
+    # build and execute the quantum circuit
+    sim = CRA_in_Google(sim, sim.q, sim.c, n)
+    counts = sim.get_counts()
+    elapsed = time.perf_counter() - start
+    result = int(list(counts)[0], 2)
+    print("%d-bit CRA_in_Google on %d qubits: %s in %.3f ms" % (n, 3*n+1, result==data_A+data_B+Carry_in, elapsed*1e3))
+    print("largest number of amplitudes: %d, random measurements: %d" % (sim.max_terms, sim.random_measurements))
+    print("basis states left: %d, phase of the output: %.4f" % (len(sim.state), sim.get_global_phase()))
@@ -0,0 +1,267 @@
+'''
+Qubit layout of the adders. For every adder the position of each input bit,
+    the qubits prepared as |1>, and the weights used to decode the measured
+    classical bits are collected here, so that the simulators and tools do
+    not have to copy the data_string of each __main__ driver.
+
+For the quantum carry ripple adders (CRA), A and B are n-bit integers and
+    carry is the 1-bit input carry. The classical register holds the n+1 bit
+    sum, i.e.,
+
+        sum = A + B + carry
+
+For the quantum most-significant digit-first adders (QMDA), A and B are the
+    2n-bit strings of the __main__ drivers read as integers, i.e., bit j of A
+    is data_A[j], and carry holds Carry[0] in bit 0 and Carry[1] in bit 1.
+    Each pair of bits is a signed digit, and the classical register holds
+    the redundant representation of the sum, which satisfies
+
+        sum = sum_i 2^i (A_2i - A_2i+1) + sum_i (2^i B_2i - 2^(i+1) B_2i+1)
+              + 2^n Carry_0 + 2^n - 1
+
+    where the result is decoded with the weight 1 for c[0], -2^(i+1) for
+    c[2i+1] and 2^(i+2) for c[2i+2]. Carry_1 is passed to c[2n+1] unchanged
+    and has no weight.
+
+The Toffoli policy set with Tools.toffoli_policy.use_toffoli_policy is
+    applied by adder_builder to every ccx of the adder, and the ancillas it
+    needs are added by adder_size and adder_layout after the qubits of the
+    adder, so every tool which builds an adder from here follows the policy.
+'''
+import importlib
+
+# module and qubit layout of each adder
+ADDERS = {
+    'CRA_in_Islam'                  : ('QCRA.CAR_in_Islam',                 'CRA_3'),
+    'CRA_in_Biswas'                 : ('QCRA.CRA_in_Biswas',                'CRA_3'),
+    'CRA_in_Cuccaro_2cnotversion'   : ('QCRA.CRA_in_Cuccaro_2cnotversion',  'CRA_3'),
+    'CRA_in_Google'                 : ('QCRA.CRA_in_Google',                'CRA_3'),
+    'CRA_in_Google_MBU'             : ('QCRA.CRA_in_Google_MBU',            'CRA_3'),
+    'CRA_in_Cuccaro_in_place'       : ('QCRA.CRA_in_Cuccaro_in_place',      'CRA_2'),
+    'CRA_in_Takahashi'              : ('QCRA.CRA_in_Takahashi',             'CRA_Takahashi'),
+    'CRA_in_Mazumder'               : ('QCRA.CRA_in_Mazumder',              'CRA_Mazumder'),
+    'CRA_in_Sohel'                  : ('QCRA.CRA_in_Sohel',                 'CRA_4'),
+    'Brent_Kung_adder'              : ('QCRA.Prefix_adder',                 'CRA_prefix'),
+    'Kogge_Stone_adder'             : ('QCRA.Prefix_adder',                 'CRA_prefix'),
+    'Sklansky_adder'                : ('QCRA.Prefix_adder',                 'CRA_prefix'),
+    'Draper_adder'                  : ('QCRA.Prefix_adder',                 'CRA_prefix'),
+    'QMDA_Carry_First'              : ('QMDA.QMDA_Carry_First',             'QMDA_5'),
+    'QMDA_mixed'                    : ('QMDA.QMDA_mixed',                   'QMDA_5'),
+    'QMDA_Sum_google_mixed'         : ('QMDA.QMDA_Sum_google_mixed',        'QMDA_5_shifted'),
+    'QMDA_in_Biswas'                : ('QMDA.QMDA_in_Biswas',               'QMDA_6'),
+    'QMDA_in_Cuccaro'               : ('QMDA.QMDA_in_Cuccaro',              'QMDA_6'),
+    'QMDA_in_Google'                : ('QMDA.QMDA_in_Google',               'QMDA_6'),
+    'QMDA_in_Islam'                 : ('QMDA.QMDA_in_Islam',                'QMDA_6'),
+    'QMDA_in_Mazumder'              : ('QMDA.QMDA_in_Mazumder',             'QMDA_12'),
+    'QMDA_in_Sohel'                 : ('QMDA.QMDA_in_Sohel',                'QMDA_8'),
+}
+
+def adder_builder(name, toffoli_policy=True):
+    '''
+    This is used to get the function which builds the adder.
+    input:
+        name        :       name of the adder, e.g., 'CRA_in_Islam'
+        toffoli_policy  :   whether the ccx gates follow the policy set by
+                                use_toffoli_policy, or are native ccx
+    output:
+        builder     :       function with the signature (circ, q, c, n)
+    '''
+    if name not in ADDERS:
+        raise ValueError("Unknown adder '%s'" % name)
+    module = importlib.import_module(ADDERS[name][0])
+    builder = getattr(module, name)
+    if toffoli_policy:
+        # imported here, since Tools.toffoli_policy imports this module
+        from Tools.toffoli_policy import policy_builder
+        builder = policy_builder(name, builder)
+    return builder
+
+# number of qubits per bit or digit, and extra qubits, of each kind of layout
+SIZES = {
+    'CRA_2'             : (2, 2),
+    'CRA_Takahashi'     : (2, 1),
+    'CRA_3'             : (3, 1),
+    'CRA_4'             : (4, 1),
+    'CRA_Mazumder'      : (6, 1),
+    'CRA_prefix'        : (3, 1),
+    'QMDA_5'            : (5, 2),
+    'QMDA_5_shifted'    : (5, 3),
+    'QMDA_6'            : (6, 2),
+    'QMDA_8'            : (8, 2),
+    'QMDA_12'           : (12, 2),
+}
+
+def adder_size(name, n, toffoli_policy=True):
+    '''
+    This is used to get the number of qubits and classical bits of an adder
+        without building its layout, which holds O(n) weights of O(n) bits.
+        The ancillas of the Toffoli policy are counted if "toffoli_policy".
+    output:
+        num_qubits, num_clbits
+    '''
+    if name not in ADDERS:
+        raise ValueError("Unknown adder '%s'" % name)
+    kind = ADDERS[name][1]
+    width, extra = SIZES[kind]
+    if kind=='CRA_prefix':
+        # the ancillas of the prefix network follow the CRA_3 layout
+        module = importlib.import_module(ADDERS[name][0])
+        network, in_place = module.PREFIX_ADDERS[name]
+        extra += module.prefix_ancillas(network, n, in_place)
+    num_clbits = n+1 if kind.startswith('CRA') else 2*n+2
+    if toffoli_policy:
+        from Tools.toffoli_policy import policy_ancillas
+        extra += policy_ancillas()
+    return width*n+extra, num_clbits
+
+def _CRA_layout(n, width):
+    layout = {'num_qubits': width*n+1, 'num_clbits': n+1, 'ones': []}
+    layout['carry'] = [0]
+    layout['A'] = [width*i+1 for i in range(n)]
+    layout['B'] = [width*i+2 for i in range(n)]
+    return layout
+
+def _CRA_Takahashi_layout(n):
+    # no input carry, the carry out is the last qubit
+    layout = {'num_qubits': 2*n+1, 'num_clbits': n+1, 'ones': [], 'carry': []}
+    layout['A'] = [2*i for i in range(n)]
+    layout['B'] = [2*i+1 for i in range(n)]
+    return layout
+
+def _CRA_Mazumder_layout(n):
+    layout = {'num_qubits': 6*n+1, 'num_clbits': n+1}
+    layout['carry'] = [3]
+    layout['A'] = [0] + [6*i+1 for i in range(1,n)]
+    layout['B'] = [2] + [6*i+3 for i in range(1,n)]
+    layout['ones'] = [1, 6] + [6*i+j for i in range(1,n) for j in (2,6)]
+    return layout
+
+def _QMDA_layout(n, width, offsets, ones=(), shift=0):
+    # offsets are the positions of A_2i, A_2i+1, B_2i, B_2i+1 in a digit
+    layout = {'num_qubits': width*n+2+shift, 'num_clbits': 2*n+2}
+    layout['A'] = []
+    layout['B'] = []
+    for i in range(n):
+        layout['A'] += [width*i+shift+offsets[0], width*i+shift+offsets[1]]
+        layout['B'] += [width*i+shift+offsets[2], width*i+shift+offsets[3]]
+    layout['carry'] = [width*n+shift, width*n+shift+1]
+    layout['ones'] = [width*i+shift+j for i in range(n) for j in ones]
+    return layout
+
+def adder_layout(name, n):
+    '''
+    This is used to get the qubit layout of an adder.
+    input:
+        name        :       name of the adder, e.g., 'CRA_in_Islam'
+        n           :       length of input data, which is the number of
+                                bits for CRA and digits for QMDA
+    output:
+        layout      :       dictionary with
+                                'num_qubits', 'num_clbits' : size of the circuit,
+                                                             see adder_size
+                                'A', 'B', 'carry'          : qubit of each input bit
+                                'ones'                     : qubits prepared as |1>
+                                'A_weights', 'B_weights',
+                                'carry_weights', 'offset'  : value of the inputs
+                                'sum_weights'              : value of each classical bit
+
+    **Example:**
+
+    layout = adder_layout('CRA_in_Islam', 2)
+
+    layout['A'] is [1, 4], i.e., A_0 is prepared on q[1] and A_1 on q[4].
+    '''
+    if name not in ADDERS:
+        raise ValueError("Unknown adder '%s'" % name)
+    kind = ADDERS[name][1]
+    if kind=='CRA_3':
+        layout = _CRA_layout(n, 3)
+    elif kind=='CRA_prefix':
+        layout = _CRA_layout(n, 3)
+        layout['num_qubits'] = adder_size(name, n, toffoli_policy=False)[0]
+    elif kind=='CRA_2':
+        layout = _CRA_layout(n, 2)
+        layout['num_qubits'] = 2*n+2
+    elif kind=='CRA_Takahashi':
+        layout = _CRA_Takahashi_layout(n)
+    elif kind=='CRA_4':
+        layout = _CRA_layout(n, 4)
+    elif kind=='CRA_Mazumder':
+        layout = _CRA_Mazumder_layout(n)
+    elif kind=='QMDA_5':
+        layout = _QMDA_layout(n, 5, (0,1,2,3))
+    elif kind=='QMDA_5_shifted':
+        layout = _QMDA_layout(n, 5, (0,1,2,3), shift=1)
+    elif kind=='QMDA_6':
+        layout = _QMDA_layout(n, 6, (0,1,2,4))
+    elif kind=='QMDA_8':
+        layout = _QMDA_layout(n, 8, (0,1,2,5))
+    elif kind=='QMDA_12':
+        layout = _QMDA_layout(n, 12, (0,2,3,8), ones=(1,6,7,11))
+    # the ancillas of the Toffoli policy follow the qubits of the adder
+    from Tools.toffoli_policy import policy_ancillas
+    layout['num_qubits'] += policy_ancillas()
+    if kind.startswith('CRA'):
+        layout['A_weights'] = [2**i for i in range(n)]
+        layout['B_weights'] = [2**i for i in range(n)]
+        layout['carry_weights'] = [1]*len(layout['carry'])
+        layout['offset'] = 0
+        layout['sum_weights'] = [2**i for i in range(n+1)]
+    else:
+        layout['A_weights'] = []
+        layout['B_weights'] = []
+        layout['sum_weights'] = [1]
+        for i in range(n):
+            layout['A_weights'] += [2**i, -2**i]
+            layout['B_weights'] += [2**i, -2**(i+1)]
+            layout['sum_weights'] += [-2**(i+1), 2**(i+2)]
+        layout['carry_weights'] = [2**n, 0]
+        layout['offset'] = 2**n-1
+        layout['sum_weights'] += [0]
+    return layout
+
+def data_string(name, n, A, B, carry):
+    '''
+    This is used to get the input bit of an adder, which can be prepared
+        with bit2gate.
+    input:
+        name        :       name of the adder
+        n           :       length of input data
+        A, B        :       input data as integers
+        carry       :       input carry as integer
+    output:
+        input_bit   :       string whose i-th character is the state of q[i]
+    '''
+    layout = adder_layout(name, n)
+    bits = ['0']*layout['num_qubits']
+    for i in layout['ones']:
+        bits[i] = '1'
+    for key, value in (('A', A), ('B', B), ('carry', carry)):
+        for j, i in enumerate(layout[key]):
+            bits[i] = str((value>>j) & 1)
+    return ''.join(bits)
+
+def expected_sum(name, n, A, B, carry):
+    '''
+    This is used to compute the sum that the adder should output.
+    '''
+    layout = adder_layout(name, n)
+    result = layout['offset']
+    for key, value in (('A', A), ('B', B), ('carry', carry)):
+        for j, weight in enumerate(layout[key+'_weights']):
+            result += weight * ((value>>j) & 1)
+    return result
+
+def decode_counts(name, n, counts):
+    '''
+    This is used to decode the counts of a run with shots=1 to the sum.
+    input:
+        name        :       name of the adder
+        n           :       length of input data
+        counts      :       counts, e.g., {'110': 1}
+    output:
+        result      :       decoded sum
+    '''
+    key = max(counts, key=counts.get).replace(' ', '')
+    weights = adder_layout(name, n)['sum_weights']
+    return sum(weight for weight, bit in zip(weights, reversed(key)) if bit=='1')
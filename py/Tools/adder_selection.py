@@ -0,0 +1,135 @@
+'''
+Selection of the adder of a given width by cost. Every adder of
+    Tools.adder_layout, i.e., every CRA and QMDA family with each of the
+    BQFAs it is built from, is costed with estimate_resources, and the adder
+    with the smallest objective, e.g., the T-count or the depth, among the
+    ones which meet the constraints, e.g., a qubit budget, is returned with
+    its builder and qubit layout.
+
+The adders of ADDER_TEMPLATES are costed in O(1) for any n. The prefix
+    adders and CRA_in_Google_MBU are counted gate by gate, so they are only
+    costed up to n=count_max_n.
+
+The adders are only ranked against the adders of the same encoding, which
+    is given with every selection: the 'binary' adders, i.e., the CRAs and
+    the prefix adders, add n-bit integers, and the 'signed_digit' adders,
+    i.e., the QMDAs, add n signed digits in the encoding of
+    Tools.adder_layout, so they do not do the same job. The encoding of an
+    adder is given by the kind of its qubit layout.
+'''
+from Tools.adder_layout import ADDERS, adder_builder, adder_layout
+from Tools.resource_estimation import ADDER_TEMPLATES, estimate_resources
+
+# the largest n of the adders which are counted gate by gate
+COUNT_MAX_N = 2**10
+
+# encoding of the inputs : prefix of the layout kinds of its adders
+ENCODINGS = {'binary': 'CRA', 'signed_digit': 'QMDA'}
+
+def adder_encoding(name):
+    '''
+    The encoding of the inputs of an adder, i.e., a key of ENCODINGS.
+    '''
+    for encoding, kind in ENCODINGS.items():
+        if ADDERS[name][1].startswith(kind):
+            return encoding
+    raise ValueError("The adder '%s' has no known encoding" % name)
+
+def _score(objective, resources):
+    if callable(objective):
+        return objective(resources)
+    if isinstance(objective, dict):
+        return sum(weight*resources[key] for key, weight in objective.items())
+    return resources[objective]
+
+def rank_adders(n, encoding, objective='t_count', constraints=None, names=None, count_max_n=COUNT_MAX_N):
+    '''
+    This is used to rank the adders of width n and of one encoding by cost.
+    input:
+        n           :       length of input data
+        encoding    :       encoding of the inputs, 'binary' for n-bit
+                                integers or 'signed_digit' for n signed
+                                digits, see ENCODINGS
+        objective   :       key of the resources, e.g., 't_count' or 'depth',
+                                a dictionary from keys to weights, or a
+                                function of the resources, which is minimised
+        constraints :       dictionary from keys of the resources to their
+                                largest allowed value, e.g., {'qubits': 2*n+2}
+        names       :       names of the adders, all adders if None
+        count_max_n :       the adders which are not in ADDER_TEMPLATES are
+                                skipped for a larger n
+    output:
+        ranking     :       list of (score, name, resources) of the adders
+                                which meet the constraints, best first, where
+                                resources is given by estimate_resources
+    '''
+    if encoding not in ENCODINGS:
+        raise ValueError("Unknown encoding '%s', one of %s" % (encoding, ', '.join(ENCODINGS)))
+    constraints = constraints or {}
+    ranking = []
+    for name in (ADDERS if names is None else names):
+        if adder_encoding(name)!=encoding:
+            continue
+        if name not in ADDER_TEMPLATES and n > count_max_n:
+            continue
+        resources = estimate_resources(name, n)
+        if all(resources[key] <= limit for key, limit in constraints.items()):
+            ranking.append((_score(objective, resources), name, resources))
+    # ties are broken by the number of qubits
+    ranking.sort(key=lambda entry: (entry[0], entry[2]['qubits'], entry[1]))
+    return ranking
+
+def select_adder(n, encoding, objective='t_count', constraints=None, names=None, count_max_n=COUNT_MAX_N):
+    '''
+    This is used to choose the adder of width n and of one encoding with the
+        smallest cost which meets the constraints.
+    input:
+        see rank_adders
+    output:
+        name        :       name of the adder
+        builder     :       function which builds the adder, (circ, q, c, n)
+        layout      :       qubit layout of the adder, see adder_layout
+        resources   :       estimated resources of the adder
+
+    **Example:**
+
+    name, builder, layout, resources = select_adder(64, 'binary', 't_count', {'qubits': 130})
+
+    name is 'CRA_in_Takahashi', the adder with the fewest T gates among the
+        ones with at most 130 qubits, and
+    circ = builder(circ, q, c, 64)
+        adds the operands prepared on layout['A'], layout['B'] and
+        layout['carry'].
+    '''
+    ranking = rank_adders(n, encoding, objective, constraints, names, count_max_n)
+    if not ranking:
+        raise ValueError("No %s adder of n=%d meets the constraints %s" % (encoding, n, constraints))
+    score, name, resources = ranking[0]
+    return name, adder_builder(name), adder_layout(name, n), resources
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Choose the adder of width n with the smallest cost")
+    parser.add_argument('--n', type=int, nargs='*', default=[4, 64, 2**20], help="widths of the adders")
+    parser.add_argument('--objective', default=None, help="resource to minimise, default a table of objectives")
+    parser.add_argument('--max-qubits', type=int, default=None, help="largest number of qubits")
+    parser.add_argument('--encodings', nargs='*', default=list(ENCODINGS), choices=list(ENCODINGS),
+                        help="encodings of the inputs, each ranked separately")
+    parser.add_argument('--top', type=int, default=3, help="number of adders listed")
+    args = parser.parse_args()
+    objectives = [args.objective] if args.objective else ['t_count', 't_depth', 'depth', 'qubits', 'cnot_count']
+    print("%-12s %8s %-12s %11s   %s" % ('encoding', 'n', 'objective', 'max qubits', 'best adders (score, qubits)'))
+    for encoding in args.encodings:
+        for n in args.n:
+            budgets = [args.max_qubits] if args.max_qubits else [None, 2*n+2]
+            for objective in objectives:
+                for budget in budgets:
+                    start = time.perf_counter()
+                    constraints = None if budget is None else {'qubits': budget}
+                    ranking = rank_adders(n, encoding, objective, constraints)
+                    elapsed = time.perf_counter() - start
+                    listed = ', '.join("%s (%d, %d)" % (name, score, resources['qubits'])
+                                       for score, name, resources in ranking[:args.top])
+                    print("%-12s %8d %-12s %11s   %s  [%.3f s]" % (encoding, n, objective, '-' if budget is None else budget,
+                                                                  listed or 'none', elapsed))
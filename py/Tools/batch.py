@@ -0,0 +1,206 @@
+'''
+Batch runs of an adder on many inputs. The __main__ drivers build, transpile
+    and run one circuit per input, so most of the time of a sweep over
+    inputs is the overhead of each job. Here the body of the adder is
+    transpiled once by Tools.transpile_cache, every input is attached to the
+    shared body, and all circuits are submitted to the backend as the
+    experiments of a single job, whose parallel settings are passed to Aer.
+
+In the parameterised mode the circuit is built and transpiled only once: the
+    input is prepared by rx(theta_i) on every input qubit, which is X up to
+    a global phase for theta_i=pi and the identity for theta_i=0, and the
+    operands are bound with the parameter_binds of Aer, so every input only
+    costs its simulation.
+'''
+import math
+import numpy as np
+from Tools.adder_layout import adder_layout, data_string, decode_counts
+from Tools.transpile_cache import cached_transpile, attach_input
+
+def _inputs(pairs):
+    # (A, B, carry) of every pair, the carry is 0 if it is not given
+    return [tuple(pair) if len(pair)==3 else (pair[0], pair[1], 0) for pair in pairs]
+
+def batch_circuits(name, n, pairs, backend=None, cache_dir=None, **transpile_options):
+    '''
+    This is used to get the circuits of an adder for many inputs, which
+        share one transpiled body.
+    input:
+        name        :       name of the adder, e.g., 'CRA_in_Google'
+        n           :       length of input data
+        pairs       :       list of (A, B) or (A, B, carry)
+        backend     :       backend of the transpiled body
+        cache_dir   :       directory of the transpile cache
+        transpile_options : basis_gates, coupling_map and optimization_level,
+                                see cached_transpile
+    output:
+        circs       :       list of transpiled circuits
+    '''
+    body, layout = cached_transpile(name, n, backend, cache_dir=cache_dir, **transpile_options)
+    basis_gates = transpile_options.get('basis_gates')
+    return [attach_input(body, layout, data_string(name, n, A, B, carry), basis_gates)
+            for A, B, carry in _inputs(pairs)]
+
+def run_batch(name, n, pairs, backend=None, shots=1, max_parallel_experiments=0,
+              max_parallel_threads=0, cache_dir=None, **run_options):
+    '''
+    This is used to run an adder on many inputs in a single job and decode
+        the sums.
+    input:
+        name                        :   name of the adder, e.g., 'CRA_in_Google'
+        n                           :   length of input data
+        pairs                       :   list of (A, B) or (A, B, carry)
+        backend                     :   backend, by default QasmSimulator()
+        shots                       :   shots of every experiment
+        max_parallel_experiments    :   number of experiments Aer runs at
+                                            once, 0 for as many as the
+                                            threads and the memory allow
+        max_parallel_threads        :   number of threads of Aer, 0 for all
+                                            CPUs
+        cache_dir                   :   directory of the transpile cache
+        run_options                 :   other options of backend.run, e.g.,
+                                            method='matrix_product_state'
+    output:
+        sums        :       numpy array of the decoded sums, in the order of
+                                pairs, from the most frequent outcome of
+                                every experiment
+
+    **Example:**
+
+    sums = run_batch('CRA_in_Google', 4, [(3, 5), (7, 9, 1)])
+
+    sums is array([8, 17]).
+    '''
+    if backend is None:
+        from qiskit.providers.aer import QasmSimulator
+        backend = QasmSimulator()
+    circs = batch_circuits(name, n, pairs, backend, cache_dir)
+    if not circs:
+        return np.array([], dtype=np.int64)
+    result = backend.run(circs, shots=shots, max_parallel_experiments=max_parallel_experiments,
+                         max_parallel_threads=max_parallel_threads, **run_options).result()
+    # the sums of the QMDA can be negative or wider than 64 bits, in which
+    # case numpy keeps the Python integers
+    return np.array([decode_counts(name, n, result.get_counts(k)) for k in range(len(circs))])
+
+def parameterized_circuit(name, n, backend=None, cache_dir=None, **transpile_options):
+    '''
+    This is used to get the circuit of an adder whose input is prepared by
+        parameterised rx gates in front of the transpiled body.
+    input:
+        name        :       name of the adder, e.g., 'CRA_in_Google'
+        n           :       length of input data
+        backend     :       backend of the transpiled body
+        cache_dir   :       directory of the transpile cache
+        transpile_options : see batch_circuits
+    output:
+        circ        :       parameterised circuit
+        parameters  :       dictionary from 'A', 'B' and 'carry' to the
+                                ParameterVector of the input bits
+    '''
+    from qiskit import transpile
+    from qiskit.circuit import ParameterVector
+    body, layout = cached_transpile(name, n, backend, cache_dir=cache_dir, **transpile_options)
+    qubits = adder_layout(name, n)
+    parameters = {key: ParameterVector(key, len(qubits[key])) for key in ('A', 'B', 'carry')}
+    prep = body.copy_empty_like()
+    for i in qubits['ones']:
+        prep.x(layout[i])
+    for key, vector in parameters.items():
+        for i, theta in zip(qubits[key], vector):
+            prep.rx(theta, layout[i])
+    basis_gates = transpile_options.get('basis_gates')
+    if basis_gates is not None and not {'x', 'rx'} <= set(basis_gates):
+        prep = transpile(prep, basis_gates=basis_gates, optimization_level=0)
+    return prep.compose(body), parameters
+
+def parameter_binds(parameters, pairs):
+    '''
+    This is used to get the values of the parameters of
+        parameterized_circuit for many inputs.
+    input:
+        parameters  :       parameters returned by parameterized_circuit
+        pairs       :       list of (A, B) or (A, B, carry)
+    output:
+        binds       :       dictionary from every parameter to the list of
+                                its values, pi for 1 and 0 for 0, which is
+                                the format of parameter_binds of Aer
+    '''
+    inputs = _inputs(pairs)
+    binds = {}
+    for k, key in enumerate(('A', 'B', 'carry')):
+        for j, theta in enumerate(parameters[key]):
+            binds[theta] = [math.pi*((values[k]>>j) & 1) for values in inputs]
+    return binds
+
+def run_parameterized(name, n, pairs, backend=None, shots=1, max_parallel_experiments=0,
+                      max_parallel_threads=0, chunk_size=4096, cache_dir=None, **run_options):
+    '''
+    This is used to run an adder on many inputs with a single parameterised
+        circuit and decode the sums. The inputs are bound in chunks of
+        chunk_size experiments per job, which bounds the memory of the
+        results of a sweep over millions of inputs.
+    input:
+        chunk_size  :       number of inputs of every job
+        the others  :       see run_batch
+    output:
+        sums        :       numpy array of the decoded sums, see run_batch
+
+    **Example:**
+
+    sums = run_parameterized('CRA_in_Google', 4, [(3, 5), (7, 9, 1)])
+
+    sums is array([8, 17]).
+    '''
+    if backend is None:
+        from qiskit.providers.aer import QasmSimulator
+        backend = QasmSimulator()
+    circ, parameters = parameterized_circuit(name, n, backend, cache_dir)
+    sums = []
+    for start in range(0, len(pairs), chunk_size):
+        chunk = pairs[start:start+chunk_size]
+        result = backend.run([circ], shots=shots, parameter_binds=[parameter_binds(parameters, chunk)],
+                             max_parallel_experiments=max_parallel_experiments,
+                             max_parallel_threads=max_parallel_threads, **run_options).result()
+        sums += [decode_counts(name, n, result.get_counts(k)) for k in range(len(chunk))]
+    if not sums:
+        return np.array([], dtype=np.int64)
+    return np.array(sums)
+
+if __name__ == "__main__":
+    import random
+    import time
+    from qiskit import QuantumCircuit, transpile
+    from qiskit.providers.aer import QasmSimulator
+    from Basic_Gates.init_state import bit2gate
+    from Tools.adder_layout import adder_builder, adder_size, expected_sum
+    backend = QasmSimulator()
+    name = 'CRA_in_Google'
+    n = 4
+    rng = random.Random(0)
+    pairs = [(rng.getrandbits(n), rng.getrandbits(n), rng.getrandbits(1)) for _ in range(200)]
+
+    # one circuit and one job per input, as in the __main__ drivers
+    start = time.perf_counter()
+    sums = []
+    for A, B, carry in pairs:
+        circ = QuantumCircuit(*adder_size(name, n))
+        circ = bit2gate(circ, circ.qubits, data_string(name, n, A, B, carry))
+        circ = adder_builder(name)(circ, circ.qubits, circ.clbits, n)
+        counts = backend.run(transpile(circ, backend), shots=1).result().get_counts()
+        sums.append(decode_counts(name, n, counts))
+    print("%d jobs: %.3f s" % (len(pairs), time.perf_counter()-start))
+
+    start = time.perf_counter()
+    batch_sums = run_batch(name, n, pairs, backend)
+    print("1 job of %d experiments: %.3f s" % (len(pairs), time.perf_counter()-start))
+    # on basis-state inputs the matrix product state stays small
+    start = time.perf_counter()
+    mps_sums = run_batch(name, n, pairs, backend, method='matrix_product_state')
+    print("1 job of %d experiments with the matrix product state: %.3f s" % (len(pairs), time.perf_counter()-start))
+    start = time.perf_counter()
+    parameterized_sums = run_parameterized(name, n, pairs, backend)
+    print("1 parameterised circuit bound to %d inputs: %.3f s" % (len(pairs), time.perf_counter()-start))
+    expected = np.array([expected_sum(name, n, *pair) for pair in pairs])
+    print("all sums correct: %s" % (np.array_equal(batch_sums, expected) and np.array_equal(mps_sums, expected)
+                                    and np.array_equal(parameterized_sums, expected) and batch_sums.tolist()==sums))
@@ -0,0 +1,278 @@
+'''
+Benchmark of the adders and the BQFA templates. Every case is run in its own
+    subprocess, so that its peak resident memory (RSS) is not inflated by the
+    previous cases, and records
+
+        build_time              :   time to build the QuantumCircuit, including
+                                        the preparation of the input
+        transpile_time          :   time of transpile for the QasmSimulator
+        simulation_time         :   time of the QasmSimulator with shots=1
+        sparse_simulation_time  :   time of the Sparse_simulator
+        import_rss, peak_rss    :   RSS in MB after the imports and at the end
+        gates, depth            :   number of gates and depth as built
+        t_count, cnot_count,
+        t_depth                 :   from Tools.resource_estimation
+
+The QasmSimulator uses the state vector up to MAX_STATEVECTOR_QUBITS qubits and
+    the matrix product state above, which is recorded as simulation_method.
+
+Every time is the minimum over "repeats" runs of its stage, because a
+    single run of a few milliseconds varies several times over with the
+    load of the machine, while the minimum is stable.
+
+The results are written as JSON and compared against a baseline: a metric is
+    a regression if it grows by more than the relative threshold and the
+    absolute slack of THRESHOLDS, i.e., the gate counts and depths must not
+    grow at all and the peak RSS by at most 10% and 5 MB. The times only
+    give a warning beyond TIME_THRESHOLDS, i.e., 2x and 20 ms, because even
+    their minimum depends on the load of a shared machine, unless
+    --fail-on-time is given.
+'''
+import sys
+import json
+import os
+import platform
+import subprocess
+import time
+
+MAX_STATEVECTOR_QUBITS = 24
+
+# number of runs of every timed stage, whose minimum is recorded
+REPEATS = 5
+
+# metric : (relative threshold, absolute slack), of the warnings
+TIME_THRESHOLDS = {
+    'build_time'                : (1.0, 0.02),
+    'transpile_time'            : (1.0, 0.02),
+    'simulation_time'           : (1.0, 0.02),
+    'sparse_simulation_time'    : (1.0, 0.02),
+}
+
+# metric : (relative threshold, absolute slack), of the regressions
+THRESHOLDS = {
+    'peak_rss'                  : (0.10, 5),
+    'gates'                     : (0, 0),
+    'depth'                     : (0, 0),
+    't_count'                   : (0, 0),
+    'cnot_count'                : (0, 0),
+    't_depth'                   : (0, 0),
+}
+
+# BQFA templates, see Tools.resource_estimation.TEMPLATES
+BQFA_TEMPLATES = ('Carry_First_BQFA', 'Sum_First_BQFA', 'BQFA_Sum_first_left', 'BQFA_Sum_first_right',
+                  'BQFA_in_Biswas', 'BQFA_in_Cuccaro', 'BQFA_in_Google', 'BQFA_in_Islam',
+                  'BQFA_in_Mazumder', 'BQFA_in_Sohel')
+
+def _rss():
+    # peak resident memory of this process in MB, ru_maxrss is in kB on Linux
+    import resource
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss/2**20 if sys.platform=='darwin' else maxrss/2**10
+
+def _builder(kind, name, n):
+    # builder, size of the circuit, input bit and resource estimate of a case
+    import importlib
+    import random
+    from Tools import adder_layout, resource_estimation
+    rng = random.Random(n)
+    if kind=='adder':
+        layout = adder_layout.adder_layout(name, n)
+        inputs = [rng.getrandbits(len(layout[key])) for key in ('A', 'B', 'carry')]
+        input_bit = adder_layout.data_string(name, n, *inputs)
+        estimate = resource_estimation.estimate_resources(name, n)
+        builder = lambda circ, q, c: adder_layout.adder_builder(name)(circ, q, c, n)
+        return builder, layout['num_qubits'], layout['num_clbits'], input_bit, estimate
+    # a template is applied n times on its qubits, which are all measured
+    module, function, num_qubits = resource_estimation.TEMPLATES[name]
+    template = getattr(importlib.import_module(module), function)
+    def builder(circ, q, c):
+        for _ in range(n):
+            circ = template(circ, *q)
+        for i in range(num_qubits):
+            circ.measure(q[i], c[i])
+        return circ
+    cost = resource_estimation.template_cost(name)
+    estimate = {key: n*cost[key] for key in ('t_count', 'cnot_count', 't_depth')}
+    input_bit = ''.join(str(rng.getrandbits(1)) for _ in range(num_qubits))
+    return builder, num_qubits, num_qubits, input_bit, estimate
+
+def _min_time(stage, repeats):
+    # minimum time of the stage over the repeats, and the result of its last run
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        value = stage()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, value
+
+def run_case(kind, name, n, repeats=REPEATS):
+    '''
+    This is used to benchmark one case in the current process.
+    input:
+        kind        :       'adder' or 'template'
+        name        :       name of the adder or the BQFA template
+        n           :       length of input data of the adder, or number of
+                                times the template is applied
+        repeats     :       number of runs of every timed stage
+    output:
+        result      :       dictionary of the metrics
+    '''
+    from qiskit import QuantumRegister, ClassicalRegister, QuantumCircuit, transpile
+    from qiskit.providers.aer import QasmSimulator
+    from Basic_Gates.init_state import bit2gate
+    from Simulator.Sparse_simulator import Sparse_simulator
+    builder, num_qubits, num_clbits, input_bit, estimate = _builder(kind, name, n)
+    result = {'kind': kind, 'name': name, 'n': n, 'qubits': num_qubits, 'repeats': repeats,
+              'import_rss': _rss()}
+
+    def build():
+        q = QuantumRegister(num_qubits,'q')
+        c = ClassicalRegister(num_clbits,'c')
+        circ = QuantumCircuit(q,c)
+        circ = bit2gate(circ, q, input_bit)
+        return builder(circ, q, c)
+    result['build_time'], circ = _min_time(build, repeats)
+    ops = circ.count_ops()
+    result['gates'] = sum(ops.values()) - ops.get('measure', 0) - ops.get('barrier', 0)
+    result['depth'] = circ.depth()
+    for key in ('t_count', 'cnot_count', 't_depth'):
+        result[key] = estimate[key]
+
+    backend = QasmSimulator()
+    result['transpile_time'], transpiled = _min_time(lambda: transpile(circ, backend), repeats)
+
+    method = 'statevector' if num_qubits <= MAX_STATEVECTOR_QUBITS else 'matrix_product_state'
+    result['simulation_time'], counts = _min_time(
+        lambda: backend.run(transpiled, shots=1, method=method).result().get_counts(), repeats)
+    result['simulation_method'] = method
+
+    def sparse_simulation():
+        sim = Sparse_simulator(num_qubits, num_clbits, seed=0)
+        sim = bit2gate(sim, sim.q, input_bit)
+        return builder(sim, sim.q, sim.c)
+    result['sparse_simulation_time'], sim = _min_time(sparse_simulation, repeats)
+    # both simulators must agree on deterministic outputs
+    result['agree'] = bool(sim.random_clbits) or list(counts)==list(sim.get_counts())
+    result['peak_rss'] = _rss()
+    return result
+
+def benchmark_cases(adders=None, templates=None, ns=(1, 2, 4, 8)):
+    '''
+    This is used to list the cases of a benchmark.
+    output:
+        cases       :       list of (kind, name, n)
+    '''
+    from Tools.adder_layout import ADDERS
+    cases = [('adder', name, n) for name in (ADDERS if adders is None else adders) for n in ns]
+    cases += [('template', name, n) for name in (BQFA_TEMPLATES if templates is None else templates) for n in ns]
+    return cases
+
+def run_benchmark(cases, timeout=None, repeats=REPEATS):
+    '''
+    This is used to run every case in its own subprocess.
+    input:
+        cases       :       list of (kind, name, n), see benchmark_cases
+        timeout     :       timeout of each case in seconds
+        repeats     :       number of runs of every timed stage
+    output:
+        report      :       dictionary with the environment in 'meta' and
+                                the results of the cases in 'results'
+    '''
+    import qiskit
+    report = {'meta': {'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                       'python': platform.python_version(),
+                       'qiskit': qiskit.__version__,
+                       'platform': platform.platform(),
+                       'cpu_count': os.cpu_count()},
+              'results': []}
+    # the cases are run as the module Tools.benchmark from the root of the
+    # packages
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for kind, name, n in cases:
+        try:
+            process = subprocess.run([sys.executable, '-m', 'Tools.benchmark', '--case', kind, name, str(n),
+                                      '--repeats', str(repeats)],
+                                     capture_output=True, text=True, timeout=timeout, cwd=root)
+            if process.returncode==0:
+                result = json.loads(process.stdout.splitlines()[-1])
+            else:
+                result = {'kind': kind, 'name': name, 'n': n,
+                          'error': process.stderr.strip().splitlines()[-1]}
+        except subprocess.TimeoutExpired:
+            result = {'kind': kind, 'name': name, 'n': n, 'error': 'timeout'}
+        report['results'].append(result)
+    return report
+
+def _exceeds(old, new, thresholds):
+    # metrics which grew by more than their threshold
+    return [(metric, old[metric], new[metric]) for metric, (relative, absolute) in thresholds.items()
+            if metric in old and metric in new and new[metric] > old[metric]*(1+relative)+absolute]
+
+def compare(report, baseline, thresholds=THRESHOLDS, time_thresholds=TIME_THRESHOLDS):
+    '''
+    This is used to compare a benchmark with a baseline.
+    output:
+        regressions :       list of (kind, name, n, metric, baseline, new) of
+                                the metrics of thresholds and the errors
+        warnings    :       list of (kind, name, n, metric, baseline, new) of
+                                the times of time_thresholds
+    '''
+    old_results = {(r['kind'], r['name'], r['n']): r for r in baseline['results']}
+    regressions = []
+    warnings = []
+    for result in report['results']:
+        key = (result['kind'], result['name'], result['n'])
+        old = old_results.get(key)
+        if old is None or 'error' in old:
+            continue
+        if 'error' in result:
+            regressions.append(key + ('error', None, result['error']))
+            continue
+        regressions += [key + exceeded for exceeded in _exceeds(old, result, thresholds)]
+        warnings += [key + exceeded for exceeded in _exceeds(old, result, time_thresholds)]
+    return regressions, warnings
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark of the adders and the BQFA templates")
+    parser.add_argument('--case', nargs=3, default=None, metavar=('KIND', 'NAME', 'N'),
+                        help="run a single case and print its result, used by the subprocesses")
+    parser.add_argument('--n', type=int, nargs='*', default=[1, 2, 4, 8], help="sweep of n")
+    parser.add_argument('--adders', nargs='*', default=None, help="names of the adders, default all")
+    parser.add_argument('--templates', nargs='*', default=None, help="names of the BQFA templates, default all")
+    parser.add_argument('--timeout', type=float, default=600, help="timeout of each case in seconds")
+    parser.add_argument('--output', default=None, help="JSON file to write the results to")
+    parser.add_argument('--baseline', default=None, help="JSON file of a previous run to compare with")
+    parser.add_argument('--repeats', type=int, default=REPEATS, help="runs of every timed stage, the minimum is kept")
+    parser.add_argument('--fail-on-time', action='store_true', help="count the time warnings as regressions")
+    args = parser.parse_args()
+    if args.case is not None:
+        kind, name, n = args.case
+        print(json.dumps(run_case(kind, name, int(n), args.repeats)))
+        sys.exit(0)
+
+    report = run_benchmark(benchmark_cases(args.adders, args.templates, args.n), args.timeout, args.repeats)
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
+    print("%-9s %-28s %3s %7s %7s %9s %9s %9s %8s %8s %6s"
+          % ('kind', 'name', 'n', 'gates', 'depth', 'build s', 'transp s', 'sim s', 'sparse s', 'RSS MB', 'agree'))
+    for r in report['results']:
+        if 'error' in r:
+            print("%-9s %-28s %3d error: %s" % (r['kind'], r['name'], r['n'], r['error']))
+        else:
+            print("%-9s %-28s %3d %7d %7d %9.4f %9.4f %9.4f %8.4f %8.1f %6s"
+                  % (r['kind'], r['name'], r['n'], r['gates'], r['depth'], r['build_time'], r['transpile_time'],
+                     r['simulation_time'], r['sparse_simulation_time'], r['peak_rss'], r['agree']))
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            regressions, warnings = compare(report, json.load(f))
+        if args.fail_on_time:
+            regressions, warnings = regressions+warnings, []
+        for warning in warnings:
+            print("warning: %s %s n=%d %s: %s -> %s" % warning)
+        for regression in regressions:
+            print("regression: %s %s n=%d %s: %s -> %s" % regression)
+        print("%d regressions, %d time warnings against %s" % (len(regressions), len(warnings), args.baseline))
+        sys.exit(1 if regressions else 0)
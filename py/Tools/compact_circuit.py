@@ -0,0 +1,321 @@
+'''
+Compact array-backed record of a circuit. A QuantumCircuit holds every gate
+    as a CircuitInstruction with its Qubit and Clbit objects, which costs
+    hundreds of bytes per gate, so a QMDA with millions of gates does not
+    fit in memory. The Compact_circuit is passed to the builders in place of
+    "circ" and stores every gate as one opcode byte in an array and its
+    operands as 32-bit integers in a second flat array, i.e., a few bytes
+    per gate. The recorded circuit is then exported by replaying it on a
+    QuantumCircuit, a Qasm_emitter, a simulator or a Resource_counter.
+
+The angles of cp are stored in a third array of doubles in the order of the
+    cp gates, and the conditions of c_if in a dictionary from the index of
+    the gate, because only the measurement-based uncomputation uses them.
+    Barriers are not recorded.
+'''
+from array import array
+from Tools.adder_layout import adder_builder, adder_size
+
+# name and number of operands of every opcode, the operands of measure are
+# the qubit and the classical bit
+OPCODES = (('x', 1), ('h', 1), ('s', 1), ('sdg', 1), ('z', 1), ('t', 1), ('tdg', 1),
+           ('cx', 2), ('cz', 2), ('csx', 2), ('cp', 2), ('swap', 2), ('ccx', 3), ('measure', 2))
+_OPCODE = {name: opcode for opcode, (name, arity) in enumerate(OPCODES)}
+_CP = _OPCODE['cp']
+
+class _Conditional:
+    # returned by the gates, so that the gate which was just recorded can be
+    # conditioned on a classical bit with c_if as in qiskit
+    __slots__ = ('_circ', '_index')
+
+    def __init__(self, circ, index):
+        self._circ = circ
+        self._index = index
+
+    def c_if(self, c, value):
+        self._circ.conditions[self._index] = (c, value)
+        return self
+
+class Compact_circuit:
+    '''
+    This is used to record a circuit gate by gate in flat arrays. It has the
+        same gate methods as a qiskit circuit, thus it can be passed to the
+        circuit builders in place of "circ". Qubits and classical bits are
+        integer indices, which are provided by the "q" and "c" attributes.
+
+    input:
+        num_qubits  :       number of qubits
+        num_clbits  :       number of classical bits
+
+    **Example:**
+
+    circ = Compact_circuit(3*n+1, n+1)
+    circ = CRA_in_Google(circ, circ.q, circ.c, n)
+    qc = circ.to_qiskit()
+    sim = circ.replay(Sparse_simulator(3*n+1, n+1))
+
+    qc is the same QuantumCircuit as the one built by CRA_in_Google, and sim
+        has run the adder. The gates x, z, cx and cz can be conditioned on a
+        classical bit with c_if.
+    '''
+    __slots__ = ('q', 'c', 'num_qubits', 'num_clbits', 'opcodes', 'operands', 'params', 'conditions')
+
+    def __init__(self, num_qubits, num_clbits=0):
+        self.q = range(num_qubits)
+        self.c = range(num_clbits)
+        self.num_qubits = num_qubits
+        self.num_clbits = num_clbits
+        self.opcodes = array('B')
+        self.operands = array('i')
+        self.params = array('d')
+        # index of the gate : (classical bit, value)
+        self.conditions = {}
+
+    def __getattr__(self, name):
+        raise AttributeError("Compact_circuit does not support '%s' gate" % name)
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    # the opcodes are the indices in OPCODES
+    def _gate(self, opcode, *operands):
+        self.opcodes.append(opcode)
+        self.operands.extend(operands)
+        return _Conditional(self, len(self.opcodes)-1)
+
+    def x(self, q_t):
+        return self._gate(0, q_t)
+
+    def h(self, q_t):
+        self._gate(1, q_t)
+
+    def s(self, q_t):
+        self._gate(2, q_t)
+
+    def sdg(self, q_t):
+        self._gate(3, q_t)
+
+    def z(self, q_t):
+        return self._gate(4, q_t)
+
+    def t(self, q_t):
+        self._gate(5, q_t)
+
+    def tdg(self, q_t):
+        self._gate(6, q_t)
+
+    def cx(self, q_c, q_t):
+        return self._gate(7, q_c, q_t)
+
+    def cz(self, q_c, q_t):
+        return self._gate(8, q_c, q_t)
+
+    def csx(self, q_c, q_t):
+        self._gate(9, q_c, q_t)
+
+    def cp(self, theta, q_c, q_t):
+        self.params.append(theta)
+        self._gate(10, q_c, q_t)
+
+    def swap(self, q_0, q_1):
+        self._gate(11, q_0, q_1)
+
+    def ccx(self, q_c1, q_c2, q_t):
+        self._gate(12, q_c1, q_c2, q_t)
+
+    def measure(self, q, c):
+        self._gate(13, q, c)
+
+    def barrier(self, *args):
+        pass
+
+    @property
+    def nbytes(self):
+        '''
+        The memory of the arrays in bytes.
+        '''
+        return sum(len(a)*a.itemsize for a in (self.opcodes, self.operands, self.params))
+
+    def gates(self):
+        '''
+        This is used to iterate over the recorded gates.
+        output:
+            (name, operands, params, condition) of every gate, where
+                operands is a tuple of indices, params holds the angle of
+                cp, and condition is (c, value) or None
+        '''
+        operands = self.operands
+        params = iter(self.params)
+        conditions = self.conditions
+        k = 0
+        for index, opcode in enumerate(self.opcodes):
+            name, arity = OPCODES[opcode]
+            gate_params = (next(params),) if opcode==_CP else ()
+            yield name, tuple(operands[k:k+arity]), gate_params, conditions.get(index)
+            k += arity
+
+    def replay(self, circ, q=None, c=None):
+        '''
+        This is used to apply the recorded gates to another circuit, e.g., a
+            QuantumCircuit, a Qasm_emitter or a simulator.
+        input:
+            circ        :       circuit with the gate methods used
+            q           :       qubits of circ, by default the indices
+            c           :       classical bits of circ, by default the indices
+        output:
+            circ        :       circuit
+        '''
+        q = range(self.num_qubits) if q is None else q
+        c = range(self.num_clbits) if c is None else c
+        for name, operands, params, condition in self.gates():
+            if name=='measure':
+                result = circ.measure(q[operands[0]], c[operands[1]])
+            else:
+                result = getattr(circ, name)(*params, *(q[i] for i in operands))
+            if condition is not None:
+                result.c_if(c[condition[0]], condition[1])
+        return circ
+
+    def to_qiskit(self):
+        '''
+        This is used to export the recorded gates as a QuantumCircuit with the
+            registers q and c.
+        '''
+        from qiskit import QuantumRegister, ClassicalRegister, QuantumCircuit
+        q = QuantumRegister(self.num_qubits, 'q')
+        if self.num_clbits:
+            c = ClassicalRegister(self.num_clbits, 'c')
+            return self.replay(QuantumCircuit(q, c), q, c)
+        return self.replay(QuantumCircuit(q), q)
+
+    def to_qasm(self, stream, version=3):
+        '''
+        This is used to write the recorded gates as OpenQASM.
+        input:
+            stream      :       text stream
+            version     :       3 for OpenQASM 3, 2 for OpenQASM 2
+        '''
+        from Tools.qasm_emitter import Qasm_emitter
+        emitter = Qasm_emitter(stream, self.num_qubits, self.num_clbits, version)
+        self.replay(emitter)
+        emitter.flush()
+
+    def to_numpy(self):
+        '''
+        This is used to get the gates as NumPy arrays for vectorised
+            processing.
+        output:
+            opcodes     :       uint8 array of the opcodes, see OPCODES
+            operands    :       int32 array of shape (number of gates, 3),
+                                    whose unused operands are -1
+        '''
+        import numpy as np
+        opcodes = np.frombuffer(self.opcodes, dtype=np.uint8)
+        arity = np.array([arity for name, arity in OPCODES], dtype=np.int64)[opcodes]
+        flat = np.frombuffer(self.operands, dtype=np.int32)
+        operands = np.full((len(opcodes), 3), -1, dtype=np.int32)
+        starts = np.cumsum(arity) - arity
+        for j in range(3):
+            rows = np.nonzero(arity > j)[0]
+            operands[rows, j] = flat[starts[rows]+j]
+        return opcodes, operands
+
+def from_qiskit(qc):
+    '''
+    This is used to record a QuantumCircuit, which has been built, in a
+        Compact_circuit. Barriers are dropped.
+    input:
+        qc          :       circuit
+    output:
+        circ        :       Compact_circuit with the same gates
+    '''
+    from qiskit.circuit import Clbit
+    circ = Compact_circuit(qc.num_qubits, qc.num_clbits)
+    for inst in qc.data:
+        operation = inst.operation
+        qubits = [qc.find_bit(qubit).index for qubit in inst.qubits]
+        if operation.name=='barrier':
+            continue
+        if operation.name=='measure':
+            result = circ.measure(qubits[0], qc.find_bit(inst.clbits[0]).index)
+        else:
+            result = getattr(circ, operation.name)(*operation.params, *qubits)
+        if operation.condition is not None:
+            clbit, value = operation.condition
+            if not isinstance(clbit, Clbit):
+                raise ValueError("Only conditions on a single classical bit are supported")
+            result.c_if(qc.find_bit(clbit).index, int(value))
+    return circ
+
+def record_adder(name, n, input_bit=None):
+    '''
+    This is used to record an adder in a Compact_circuit.
+    input:
+        name        :       name of the adder, e.g., 'CRA_in_Google'
+        n           :       length of input data
+        input_bit   :       input state of the qubits, which is prepared
+                                with X gates in front of the adder, the
+                                i-th character is the state of q[i]
+    output:
+        circ        :       Compact_circuit of the adder
+    '''
+    circ = Compact_circuit(*adder_size(name, n))
+    if input_bit is not None:
+        for i in range(len(input_bit)):
+            if input_bit[i]=='1':
+                circ.x(circ.q[i])
+    return adder_builder(name)(circ, circ.q, circ.c, n)
+
+if __name__ == "__main__":
+    import io
+    import random
+    import time
+    import tracemalloc
+    from qiskit import QuantumCircuit
+    from Simulator.Sparse_simulator import Sparse_simulator
+    from Tools.adder_layout import data_string, expected_sum, decode_counts
+    from Tools.qasm_emitter import emit_adder
+
+    def operations(qc):
+        return [(inst.operation.name, [qc.find_bit(qubit).index for qubit in inst.qubits],
+                 inst.operation.params) for inst in qc.data]
+
+    # the exported circuits are the same as the built ones
+    n = 8
+    for name in ('CRA_in_Google', 'CRA_in_Google_MBU', 'QMDA_in_Google', 'Draper_adder'):
+        A, B, carry = random.getrandbits(n), random.getrandbits(n), random.getrandbits(1)
+        input_bit = data_string(name, n, A, B, carry)
+        circ = record_adder(name, n, input_bit)
+        built = QuantumCircuit(*adder_size(name, n))
+        built = adder_builder(name)(built, built.qubits, built.clbits, n)
+        same_circuit = operations(record_adder(name, n).to_qiskit())==operations(built)
+        stream = io.StringIO()
+        circ.to_qasm(stream)
+        expected = io.StringIO()
+        emit_adder(name, n, expected, input_bit=input_bit)
+        sim = circ.replay(Sparse_simulator(*adder_size(name, n)))
+        correct = decode_counts(name, n, sim.get_counts())==expected_sum(name, n, A, B, carry)
+        print("%s n=%d: %d gates, same circuit: %s, same QASM: %s, sum correct: %s"
+              % (name, n, len(circ), same_circuit, stream.getvalue()==expected.getvalue(), correct))
+
+    # memory per gate of a large adder
+    name = 'QMDA_in_Google'
+    n = 2000
+    adder_builder(name)
+    tracemalloc.start()
+    start = time.perf_counter()
+    qc = QuantumCircuit(*adder_size(name, n))
+    qc = adder_builder(name)(qc, qc.qubits, qc.clbits, n)
+    elapsed = time.perf_counter() - start
+    qiskit_memory = tracemalloc.get_traced_memory()[0]
+    del qc
+    tracemalloc.stop()
+    tracemalloc.start()
+    start = time.perf_counter()
+    circ = record_adder(name, n)
+    compact_elapsed = time.perf_counter() - start
+    compact_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print("%s n=%d, %d gates:" % (name, n, len(circ)))
+    print("QuantumCircuit:  %6.1f bytes per gate, built in %.2f s" % (qiskit_memory/len(circ), elapsed))
+    print("Compact_circuit: %6.1f bytes per gate, recorded in %.2f s" % (compact_memory/len(circ), compact_elapsed))
@@ -0,0 +1,266 @@
+'''
+Equivalence checking of circuits which map every basis state to a basis
+    state, e.g., the basic gates, the BQFAs and the adders. Such a circuit
+    is the unitary U|x> = e^(i phi_x)|pi(x)>, so it is fully determined by
+    the permutation pi and the phases phi of the basis inputs, which are
+    extracted without building the 2^n x 2^n unitary of Operator.
+
+The circuits built from X, CNOT, Toffoli and SWAP are run on all inputs at
+    once with the Bit_sliced_simulator, and their phases are 0. The other
+    circuits, e.g., the Toffoli_gate built from controlled square roots of
+    X, are run input by input on the Sparse_simulator, which gives both the
+    output basis state and its phase. Two circuits are equivalent if they
+    have the same permutation and the same phases up to a global phase on
+    every input, so the check is a proof rather than a sample. A circuit
+    whose output is not a basis state for some input is not checked.
+
+Only the qubits not fixed by "constants" are enumerated, i.e., 2^k inputs
+    for k free qubits, thus adders of hundreds of qubits are checked on
+    their operand qubits with the ancillas fixed to |0>.
+'''
+import itertools
+import numpy as np
+from Basic_Gates.init_state import bit2gate
+from Simulator.Bit_sliced_simulator import Bit_sliced_simulator, bit_sliced_add
+from Simulator.Sparse_simulator import Sparse_simulator, sparse_add
+from Tools.adder_layout import adder_layout
+from Tools.compact_circuit import Compact_circuit, from_qiskit
+
+# relative error of the phases which are compared
+PHASE_TOLERANCE = 1e-9
+
+def _apply(circuit):
+    # the circuit as a function of (circ, q, c), which applies its gates
+    if callable(circuit):
+        return circuit
+    if not isinstance(circuit, Compact_circuit):
+        circuit = from_qiskit(circuit)
+    return lambda circ, q, c: circuit.replay(circ, q, c)
+
+def basis_inputs(num_qubits, constants=None):
+    '''
+    This is used to enumerate the basis inputs of a circuit.
+    input:
+        num_qubits  :       number of qubits
+        constants   :       dictionary from qubit to its fixed input bit
+    output:
+        inputs      :       uint8 array of shape (2^k, num_qubits), where k is
+                                the number of qubits which are not fixed
+    '''
+    constants = constants or {}
+    variables = [i for i in range(num_qubits) if i not in constants]
+    inputs = np.zeros((2**len(variables), num_qubits), dtype=np.uint8)
+    for i, bit in constants.items():
+        inputs[:, i] = bit
+    index = np.arange(2**len(variables), dtype=np.uint64)
+    for j, i in enumerate(variables):
+        inputs[:, i] = (index>>np.uint64(j)) & np.uint64(1)
+    return inputs
+
+def basis_map(circuit, num_qubits, inputs, num_clbits=0, seed=0):
+    '''
+    This is used to get the output basis state and its phase for every basis
+        input of a circuit.
+    input:
+        circuit     :       Compact_circuit, QuantumCircuit, or a function
+                                f(circ, q, c) which adds the gates to circ
+        num_qubits  :       number of qubits
+        inputs      :       uint8 array of shape (number of inputs,
+                                num_qubits), see basis_inputs
+        num_clbits  :       number of classical bits
+        seed        :       seed of the mid-circuit measurements
+    output:
+        outputs     :       uint8 array of the output bits, of the same shape
+                                as inputs
+        phases      :       complex array of the phase e^(i phi) of every
+                                output, which is nan if the output of the
+                                input is not a basis state
+
+    **Example:**
+
+    outputs, phases = basis_map(lambda circ, q, c: Toffoli_gate(circ, *q), 3,
+                                basis_inputs(3))
+
+    outputs[k] is inputs[k] with q[2] flipped if q[0] and q[1] are 1, and
+        phases is 1 for every input.
+    '''
+    apply = _apply(circuit)
+    num_inputs = len(inputs)
+    sim = Bit_sliced_simulator(num_qubits, num_clbits, num_inputs)
+    for i in range(num_qubits):
+        sim.set_plane(sim.q[i], inputs[:, i])
+    try:
+        apply(sim, sim.q, sim.c)
+        outputs = np.stack([sim.get_plane(sim.q[i]) for i in range(num_qubits)], axis=1)
+        return outputs, np.ones(num_inputs, dtype=complex)
+    except AttributeError:
+        # the circuit is not built from permutation gates
+        pass
+    outputs = np.zeros_like(inputs)
+    phases = np.full(num_inputs, np.nan, dtype=complex)
+    for k in range(num_inputs):
+        sim = Sparse_simulator(num_qubits, num_clbits, seed=seed)
+        sim = bit2gate(sim, sim.q, ''.join('1' if bit else '0' for bit in inputs[k]))
+        apply(sim, sim.q, sim.c)
+        amplitudes = sim.get_amplitudes()
+        if len(amplitudes)==1:
+            (output, amp), = amplitudes.items()
+            outputs[k] = [int(bit) for bit in output]
+            phases[k] = amp/abs(amp)
+    return outputs, phases
+
+def _bits(row):
+    return ''.join(str(int(bit)) for bit in row)
+
+def equivalent(circuit_1, circuit_2, num_qubits, constants=None, outputs=None, num_clbits=0):
+    '''
+    This is used to prove or refute that two circuits are equivalent on all
+        basis inputs with the "constants".
+    input:
+        circuit_1   :       circuit, see basis_map
+        circuit_2   :       circuit
+        num_qubits  :       number of qubits of both circuits
+        constants   :       dictionary from qubit to its fixed input bit,
+                                e.g., the ancillas which start in |0>
+        outputs     :       None to compare all qubits and the phases, or a
+                                pair of lists of qubits (outputs of circuit_1,
+                                outputs of circuit_2) to compare only these
+                                bits, e.g., the sum and carry of two BQFAs
+                                whose garbage differs
+        num_clbits  :       number of classical bits
+    output:
+        counterexample  :   None if the circuits are equivalent, otherwise a
+                                dictionary with the first differing 'input'
+                                and the 'outputs' and 'phases' of both
+
+    **Example:**
+
+    counterexample = equivalent(lambda circ, q, c: Toffoli_gate(circ, *q),
+                                lambda circ, q, c: circ.ccx(*q), 3)
+
+    counterexample is None, i.e., Toffoli_gate is the ccx gate.
+    '''
+    inputs = basis_inputs(num_qubits, constants)
+    outputs_1, phases_1 = basis_map(circuit_1, num_qubits, inputs, num_clbits)
+    outputs_2, phases_2 = basis_map(circuit_2, num_qubits, inputs, num_clbits)
+    for phases, name in ((phases_1, 'circuit_1'), (phases_2, 'circuit_2')):
+        undefined = np.nonzero(np.isnan(phases))[0]
+        if len(undefined):
+            raise ValueError("The output of %s on the input %s is not a basis state"
+                             % (name, _bits(inputs[undefined[0]])))
+    if outputs is None:
+        different = np.any(outputs_1!=outputs_2, axis=1)
+        # the phases are compared up to the global phase of the first input
+        ratio = phases_1/phases_2
+        different |= np.abs(ratio-ratio[0]) > PHASE_TOLERANCE
+        selected_1, selected_2 = outputs_1, outputs_2
+    else:
+        selected_1, selected_2 = outputs_1[:, list(outputs[0])], outputs_2[:, list(outputs[1])]
+        different = np.any(selected_1!=selected_2, axis=1)
+    mismatches = np.nonzero(different)[0]
+    if not len(mismatches):
+        return None
+    k = mismatches[0]
+    return {'input': _bits(inputs[k]), 'outputs': (_bits(selected_1[k]), _bits(selected_2[k])),
+            'phases': (complex(phases_1[k]), complex(phases_2[k]))}
+
+def operand_constants(name, n):
+    '''
+    This is used to fix the qubits of an adder which are not operands, i.e.,
+        the ancillas to |0> and the qubits of 'ones' to |1>.
+    output:
+        constants   :       dictionary from qubit to its fixed input bit, see
+                                equivalent
+    '''
+    layout = adder_layout(name, n)
+    operands = set(layout['A']) | set(layout['B']) | set(layout['carry'])
+    return {i: int(i in layout['ones']) for i in range(layout['num_qubits']) if i not in operands}
+
+def adders_equivalent(name_1, name_2, n):
+    '''
+    This is used to prove or refute that two adders give the same sum on all
+        inputs, whatever their qubit layouts and garbage. Both adders must
+        encode the inputs in the same way, e.g., two CRAs or two QMDAs of
+        Tools.adder_layout. The input carry is 0 if an adder has none.
+    input:
+        name_1      :       name of the first adder, e.g., 'CRA_in_Islam'
+        name_2      :       name of the second adder
+        n           :       length of input data
+    output:
+        counterexample  :   None if the adders are equivalent, otherwise a
+                                dictionary with the first differing 'A',
+                                'B', 'carry' and the 'sums' of both, where
+                                a sum is None if it needed a random
+                                measurement
+
+    **Example:**
+
+    counterexample = adders_equivalent('CRA_in_Islam', 'CRA_in_Biswas', 4)
+    '''
+    layouts = adder_layout(name_1, n), adder_layout(name_2, n)
+    for key in ('A_weights', 'B_weights', 'offset'):
+        if layouts[0][key]!=layouts[1][key]:
+            raise ValueError("%s and %s encode the inputs differently" % (name_1, name_2))
+    width_A, width_B = len(layouts[0]['A']), len(layouts[0]['B'])
+    width_carry = min(len(layout['carry']) for layout in layouts)
+    grid = np.array(list(itertools.product(range(2**width_A), range(2**width_B), range(2**width_carry))),
+                    dtype=np.uint64)
+    A, B, carry = grid[:, 0], grid[:, 1], grid[:, 2]
+    sums = []
+    for name in (name_1, name_2):
+        try:
+            sums.append(bit_sliced_add(name, n, A, B, carry).tolist())
+        except AttributeError:
+            sums.append(sparse_add(name, n, grid.tolist()))
+    # a sum which needed a random measurement is not computed by the adder,
+    # so it is a counterexample even if the other adder is random too
+    for k, (sum_1, sum_2) in enumerate(zip(*sums)):
+        if sum_1 is None or sum_2 is None or sum_1!=sum_2:
+            return {'A': int(A[k]), 'B': int(B[k]), 'carry': int(carry[k]), 'sums': (sum_1, sum_2)}
+    return None
+
+if __name__ == "__main__":
+    import time
+    from Basic_Gates.Peres_gate import Peres_gate
+    from Basic_Gates.Toffoli_gate import Toffoli_gate
+    from BQFA.BQFA_Carry_First import Carry_First_BQFA
+    from BQFA.BQFA_Sum_First import Sum_First_BQFA
+    from BQFA.BQFA_in_Cuccaro import BQFA_in_Cuccaro
+    from Tools.adder_layout import adder_size
+    from Tools.compact_circuit import record_adder
+    from Tools.peephole import peephole
+
+    def ccx_cx(circ, q, c):
+        circ.ccx(q[0], q[1], q[2])
+        circ.cx(q[0], q[1])
+
+    checks = [
+        ('Toffoli_gate == ccx', lambda circ, q, c: Toffoli_gate(circ, *q),
+            lambda circ, q, c: circ.ccx(*q), 3, None, None),
+        ('Peres_gate == ccx+cx', lambda circ, q, c: Peres_gate(circ, *q), ccx_cx, 3, None, None),
+        # the sum is on q[0] and q[1], the carry on q[3]
+        ('Carry_First_BQFA == BQFA_in_Cuccaro', lambda circ, q, c: Carry_First_BQFA(circ, *q),
+            lambda circ, q, c: BQFA_in_Cuccaro(circ, *q), 4, {3: 0}, ([0, 3], [1, 3])),
+        # the garbage differs, so the full permutations differ
+        ('Carry_First_BQFA == Sum_First_BQFA', lambda circ, q, c: Carry_First_BQFA(circ, *q),
+            lambda circ, q, c: Sum_First_BQFA(circ, *q), 4, {3: 0}, None),
+    ]
+    for label, circuit_1, circuit_2, num_qubits, constants, outputs in checks:
+        start = time.perf_counter()
+        counterexample = equivalent(circuit_1, circuit_2, num_qubits, constants, outputs)
+        print("%-50s %-6s %8.4f s %s" % (label, counterexample is None, time.perf_counter()-start,
+                                         counterexample or ''))
+    for n in range(1, 6):
+        start = time.perf_counter()
+        counterexample = adders_equivalent('CRA_in_Islam', 'CRA_in_Biswas', n)
+        print("%-50s %-6s %8.4f s %s" % ('CRA_in_Islam == CRA_in_Biswas, n=%d' % n, counterexample is None,
+                                         time.perf_counter()-start, counterexample or ''))
+    # a refactor of an adder is checked on the whole state of its qubits
+    for name, n in (('CRA_in_Cuccaro_in_place', 8), ('Kogge_Stone_adder', 4), ('QMDA_in_Google', 2)):
+        circ = record_adder(name, n)
+        num_qubits, num_clbits = adder_size(name, n)
+        start = time.perf_counter()
+        counterexample = equivalent(circ, peephole(circ)[0], num_qubits, operand_constants(name, n),
+                                    num_clbits=num_clbits)
+        print("%-50s %-6s %8.4f s %s" % ('%s n=%d == peephole, %d qubits' % (name, n, num_qubits),
+                                         counterexample is None, time.perf_counter()-start, counterexample or ''))
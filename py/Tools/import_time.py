@@ -0,0 +1,55 @@
+'''
+Cold import time of the modules. Every module is imported in a fresh
+    interpreter, so nothing is cached in sys.modules, and the time of the
+    import and whether qiskit or Aer was loaded by it are reported. The
+    templates, the simulators and the Resource_counter only need the
+    minimal "circ" interface, so importing them must not load qiskit, which
+    takes most of the start-up time of a short job.
+
+The modules are imported from the root of the packages, i.e., the directory
+    which holds Basic_Gates, BQFA, QCRA, QMDA, Simulator and Tools.
+'''
+import json
+import os
+import subprocess
+import sys
+
+MODULES = ('Basic_Gates.Temperary_logical_AND', 'BQFA.BQFA_in_Google', 'QCRA.CRA_in_Google',
+           'QCRA.Prefix_adder', 'QMDA.QMDA_in_Google', 'Simulator.Sparse_simulator',
+           'Tools.adder_layout', 'Tools.resource_estimation', 'Tools.verification')
+
+_PROBE = '''
+import sys, time, json
+start = time.perf_counter()
+import %s
+print(json.dumps({'time': time.perf_counter()-start,
+                  'qiskit': 'qiskit' in sys.modules,
+                  'aer': 'qiskit.providers.aer' in sys.modules or 'qiskit_aer' in sys.modules}))
+'''
+
+def import_time(module, repeat=3):
+    '''
+    This is used to measure the cold import time of a module.
+    input:
+        module      :       name of the module, e.g., 'QCRA.CRA_in_Google'
+        repeat      :       number of fresh interpreters, the fastest is kept
+    output:
+        result      :       dictionary with the time in seconds and whether
+                                'qiskit' and 'aer' were loaded
+    '''
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    best = None
+    for _ in range(repeat):
+        process = subprocess.run([sys.executable, '-c', _PROBE % module], capture_output=True,
+                                 text=True, cwd=root, check=True)
+        result = json.loads(process.stdout.splitlines()[-1])
+        if best is None or result['time'] < best['time']:
+            best = result
+    return best
+
+if __name__ == "__main__":
+    modules = sys.argv[1:] or MODULES
+    print("%-36s %10s %8s %5s" % ('module', 'time (s)', 'qiskit', 'aer'))
+    for module in modules:
+        result = import_time(module)
+        print("%-36s %10.3f %8s %5s" % (module, result['time'], result['qiskit'], result['aer']))
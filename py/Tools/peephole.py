@@ -0,0 +1,165 @@
+'''
+Peephole optimisation of the built adders. The builders call the templates
+    one after another, so a gate at the end of a template can meet its
+    inverse at the start of the next one, e.g., the fan-out CNOTs and the
+    logical ANDs of neighbouring levels of the prefix adders. The pass
+    cancels these pairs without the unitary synthesis of the transpiler.
+    The X gates around the BQFAs of the QMDA do not cancel, because the
+    BQFA uses the qubit as a control in between.
+
+A gate is cancelled with an earlier inverse gate on the same qubits if every
+    gate in between which shares a qubit with it commutes with it. Two gates
+    commute if they act on every shared qubit in the same basis: the
+    controls of cx, ccx and csx, both qubits of cz and cp, and z, s, sdg, t
+    and tdg are diagonal (Z), while x and the targets of cx, ccx and csx are
+    X-like. h, swap, measure and the gates conditioned with c_if block the
+    cancellation. The gates are processed in order with a list of the gates
+    left on every qubit, so a cancellation exposes the gates around it to
+    the later gates, and the search looks back at most "window" gates on a
+    qubit, thus the pass runs in linear time.
+
+The self-inverse gates x, z, h, cx, cz, ccx and swap cancel with themselves,
+    and t, s cancel with tdg, sdg.
+'''
+from Tools.compact_circuit import Compact_circuit, from_qiskit
+
+_Z, _X, _OTHER = 0, 1, 2
+
+_INVERSE = {'x': 'x', 'z': 'z', 'h': 'h', 'cx': 'cx', 'cz': 'cz', 'ccx': 'ccx', 'swap': 'swap',
+            't': 'tdg', 'tdg': 't', 's': 'sdg', 'sdg': 's'}
+
+def _roles(name, num_qubits):
+    # basis of the gate on each of its qubits
+    if name in ('z', 's', 'sdg', 't', 'tdg', 'cz', 'cp'):
+        return (_Z,)*num_qubits
+    if name=='x':
+        return (_X,)
+    if name in ('cx', 'ccx', 'csx'):
+        return (_Z,)*(num_qubits-1) + (_X,)
+    return (_OTHER,)*num_qubits
+
+def _key(name, qubits):
+    # gates with the same key are the same gate, the qubits of cz and swap
+    # and the controls of ccx are unordered
+    if name in ('cz', 'swap'):
+        return name, frozenset(qubits)
+    if name=='ccx':
+        return name, frozenset(qubits[:2]), qubits[2]
+    return name, qubits
+
+def peephole(circ, window=16):
+    '''
+    This is used to cancel the pairs of inverse gates of a circuit.
+    input:
+        circ        :       Compact_circuit, or a QuantumCircuit which has
+                                been built from the gates of the templates
+        window      :       number of gates on a qubit searched for the
+                                inverse of every gate
+    output:
+        circ        :       optimised circuit of the same type
+        removed     :       number of gates removed
+
+    **Example:**
+
+    circ, removed = peephole(record_adder('QMDA_in_Google', n))
+
+    circ has the same unitary and measurements as the adder with "removed"
+        gates fewer.
+    '''
+    if not isinstance(circ, Compact_circuit):
+        optimised, removed = peephole(from_qiskit(circ), window)
+        return optimised.to_qiskit(), removed
+    gates = list(circ.gates())
+    alive = [True]*len(gates)
+    # roles of every gate on its qubits, as a dictionary from the qubit
+    roles = []
+    # indices of the gates left on every qubit, in order
+    wires = [[] for _ in range(circ.num_qubits)]
+    removed = 0
+    for index, (name, operands, params, condition) in enumerate(gates):
+        qubits = operands[:1] if name=='measure' else operands
+        if condition is not None:
+            role = dict.fromkeys(qubits, _OTHER)
+        else:
+            role = dict(zip(qubits, _roles(name, len(qubits))))
+        roles.append(role)
+        partner = None
+        if condition is None and name in _INVERSE:
+            inverse = _key(_INVERSE[name], operands)
+            wire = wires[qubits[0]]
+            for position in range(len(wire)-1, max(len(wire)-1-window, -1), -1):
+                j = wire[position]
+                other = gates[j]
+                if other[3] is None and _key(other[0], other[1])==inverse:
+                    if all(_commute(role, roles[k]) for qubit in qubits[1:] for k in _after(wires[qubit], j)):
+                        partner = j
+                    break
+                if not _commute(role, roles[j]):
+                    break
+        if partner is None:
+            for qubit in qubits:
+                wires[qubit].append(index)
+        else:
+            alive[partner] = alive[index] = False
+            removed += 2
+            for qubit in qubits:
+                wire = wires[qubit]
+                # the partner is among the last gates of the wire
+                position = len(wire)-1
+                while wire[position]!=partner:
+                    position -= 1
+                del wire[position]
+    optimised = Compact_circuit(circ.num_qubits, circ.num_clbits)
+    for index, (name, operands, params, condition) in enumerate(gates):
+        if alive[index]:
+            if name=='measure':
+                result = optimised.measure(*operands)
+            else:
+                result = getattr(optimised, name)(*params, *operands)
+            if condition is not None:
+                result.c_if(*condition)
+    return optimised, removed
+
+def _commute(role, other):
+    # the gates act on every shared qubit in the same basis
+    for qubit, basis in other.items():
+        shared = role.get(qubit)
+        if shared is not None and (shared==_OTHER or shared!=basis):
+            return False
+    return True
+
+def _after(wire, j):
+    # the gates on a wire after the gate j
+    for position in range(len(wire)-1, -1, -1):
+        if wire[position]==j:
+            break
+        yield wire[position]
+
+if __name__ == "__main__":
+    import random
+    import time
+    from qiskit import QuantumCircuit, transpile
+    from Simulator.Sparse_simulator import Sparse_simulator
+    from Tools.adder_layout import ADDERS, adder_builder, adder_size, data_string, expected_sum, decode_counts
+    from Tools.compact_circuit import record_adder
+    # the generic optimiser on the gates of the templates
+    basis_gates = ['x', 'h', 's', 'sdg', 'z', 't', 'tdg', 'cx', 'cz', 'csx', 'cp', 'swap', 'ccx']
+    n = 8
+    print("%-28s %7s %9s %9s %10s %10s %8s" % ('adder', 'gates', 'peephole', 'level 3', 'peephole s', 'level 3 s', 'correct'))
+    for name in sorted(ADDERS):
+        qc = QuantumCircuit(*adder_size(name, n))
+        qc = adder_builder(name)(qc, qc.qubits, qc.clbits, n)
+        start = time.perf_counter()
+        optimised, removed = peephole(qc)
+        elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        level_3 = transpile(qc, basis_gates=basis_gates, optimization_level=3)
+        level_3_elapsed = time.perf_counter() - start
+        level_3_removed = qc.size() - level_3.size()
+        # the optimised adder still adds
+        A, B, carry = random.getrandbits(n), random.getrandbits(n), random.getrandbits(1)
+        circ, _ = peephole(record_adder(name, n, data_string(name, n, A, B, carry)))
+        sim = circ.replay(Sparse_simulator(*adder_size(name, n)))
+        correct = decode_counts(name, n, sim.get_counts())==expected_sum(name, n, A, B, carry)
+        print("%-28s %7d %9d %9d %10.4f %10.4f %8s"
+              % (name, qc.size(), removed, level_3_removed, elapsed, level_3_elapsed, correct))
@@ -0,0 +1,214 @@
+'''
+Streaming OpenQASM export of the adders. The Qasm_emitter is passed to the
+    builders in place of "circ" and writes every gate to a file or stream as
+    soon as it is generated, so no QuantumCircuit is built and the memory
+    does not depend on n.
+
+Both OpenQASM 3 and OpenQASM 2 are written. The gates of the adders are in
+    stdgates.inc and qelib1.inc, except csx and cp. In OpenQASM 3 the
+    definition of csx is written in the header, and in OpenQASM 2 csx is
+    written as h, cu1(pi/2), h and cp as cu1, because some versions of
+    qelib1.inc already define csx and a second definition is an error.
+
+The gates x, z, cx and cz can be conditioned on a classical bit with c_if,
+    which is written as "if (c[i] == 1) { ... }" in OpenQASM 3. OpenQASM 2
+    can only condition on a whole register, so c_if is an error there.
+'''
+import fractions
+import math
+from Tools.adder_layout import adder_builder, adder_size
+
+_HEADER = {
+    3: ('OPENQASM 3.0;\n'
+        'include "stdgates.inc";\n'
+        'gate csx a, b { ctrl @ sx a, b; }\n'
+        'qubit[%d] q;\n'
+        'bit[%d] c;\n'),
+    2: ('OPENQASM 2.0;\n'
+        'include "qelib1.inc";\n'
+        'qreg q[%d];\n'
+        'creg c[%d];\n'),
+}
+
+def _angle(theta):
+    # multiples of pi are written exactly, e.g., -pi/2
+    ratio = fractions.Fraction(theta/math.pi).limit_denominator(1024)
+    if abs(float(ratio)*math.pi-theta) > 1e-12:
+        return repr(theta)
+    if ratio==0:
+        return '0'
+    numerator = '' if abs(ratio.numerator)==1 else str(abs(ratio.numerator))
+    text = ('-' if ratio < 0 else '') + (numerator+'*' if numerator else '') + 'pi'
+    return text if ratio.denominator==1 else text+'/%d' % ratio.denominator
+
+class _Conditional:
+    # returned by the gates, so that the gate which was just written can be
+    # conditioned on a classical bit with c_if as in qiskit
+    def __init__(self, emitter):
+        self._emitter = emitter
+
+    def c_if(self, c, value):
+        emitter = self._emitter
+        if emitter.version!=3:
+            raise ValueError("OpenQASM 2 can only condition on a whole register, not on c[%d]" % c)
+        emitter._pending = 'if (c[%d] == %d) { %s }\n' % (c, value, emitter._pending.rstrip('\n'))
+        return self
+
+class Qasm_emitter:
+    '''
+    This is used to write a circuit as OpenQASM text gate by gate. It has the
+        same gate methods as a qiskit circuit, thus it can be passed to the
+        circuit builders in place of "circ". Qubits and classical bits are
+        integer indices, which are provided by the "q" and "c" attributes.
+
+    input:
+        stream      :       text stream, e.g., a file opened with "w"
+        num_qubits  :       number of qubits
+        num_clbits  :       number of classical bits
+        version     :       3 for OpenQASM 3, 2 for OpenQASM 2
+
+    **Example:**
+
+    with open('CRA_in_Google.qasm', 'w') as f:
+        emitter = Qasm_emitter(f, 3*n+1, n+1)
+        emitter = CRA_in_Google(emitter, emitter.q, emitter.c, n)
+        emitter.flush()
+
+    The file holds the OpenQASM 3 program of the adder after flush is
+        called. The last gate is held back until the next one, so that it
+        can still be conditioned with c_if.
+    '''
+
+    def __init__(self, stream, num_qubits, num_clbits=0, version=3):
+        if version not in _HEADER:
+            raise ValueError("OpenQASM version must be 2 or 3, not %s" % version)
+        self.q = range(num_qubits)
+        self.c = range(num_clbits)
+        self.version = version
+        self.num_gates = 0
+        self._write = stream.write
+        self._separator = ', ' if version==3 else ','
+        self._pending = ''
+        self._write(_HEADER[version] % (num_qubits, num_clbits))
+
+    def __getattr__(self, name):
+        raise AttributeError("Qasm_emitter does not support '%s' gate" % name)
+
+    def _line(self, line):
+        self._write(self._pending)
+        self._pending = line
+
+    def _gate(self, name, *qubits):
+        self.num_gates += 1
+        self._line('%s %s;\n' % (name, self._separator.join('q[%d]' % qubit for qubit in qubits)))
+        return _Conditional(self)
+
+    def flush(self):
+        '''
+        This is used to write the last gate, which is held back for c_if.
+        '''
+        self._write(self._pending)
+        self._pending = ''
+
+    def x(self, q_t):
+        return self._gate('x', q_t)
+
+    def h(self, q_t):
+        self._gate('h', q_t)
+
+    def s(self, q_t):
+        self._gate('s', q_t)
+
+    def sdg(self, q_t):
+        self._gate('sdg', q_t)
+
+    def z(self, q_t):
+        return self._gate('z', q_t)
+
+    def t(self, q_t):
+        self._gate('t', q_t)
+
+    def tdg(self, q_t):
+        self._gate('tdg', q_t)
+
+    def cx(self, q_c, q_t):
+        return self._gate('cx', q_c, q_t)
+
+    def cz(self, q_c, q_t):
+        return self._gate('cz', q_c, q_t)
+
+    def ccx(self, q_c1, q_c2, q_t):
+        self._gate('ccx', q_c1, q_c2, q_t)
+
+    def swap(self, q_0, q_1):
+        self._gate('swap', q_0, q_1)
+
+    def csx(self, q_c, q_t):
+        if self.version==3:
+            self._gate('csx', q_c, q_t)
+        else:
+            self._gate('h', q_t)
+            self._gate('cu1(pi/2)', q_c, q_t)
+            self._gate('h', q_t)
+
+    def cp(self, theta, q_c, q_t):
+        name = 'cp' if self.version==3 else 'cu1'
+        self._gate('%s(%s)' % (name, _angle(theta)), q_c, q_t)
+
+    def measure(self, q, c):
+        if self.version==3:
+            self._line('c[%d] = measure q[%d];\n' % (c, q))
+        else:
+            self._line('measure q[%d] -> c[%d];\n' % (q, c))
+
+    def barrier(self, *qubits):
+        if qubits:
+            self._gate('barrier', *qubits)
+
+def emit_adder(name, n, stream, version=3, input_bit=None):
+    '''
+    This is used to write an adder as OpenQASM without building it.
+    input:
+        name        :       name of the adder, e.g., 'CRA_in_Google'
+        n           :       length of input data
+        stream      :       text stream, or the path of the file to write
+        version     :       3 for OpenQASM 3, 2 for OpenQASM 2
+        input_bit   :       input state of the qubits, which is prepared
+                                with X gates in front of the adder, the
+                                i-th character is the state of q[i]
+    output:
+        num_gates   :       number of gates written
+    '''
+    if isinstance(stream, str):
+        with open(stream, 'w') as f:
+            return emit_adder(name, n, f, version, input_bit)
+    emitter = Qasm_emitter(stream, *adder_size(name, n), version=version)
+    if input_bit is not None:
+        for i in range(len(input_bit)):
+            if input_bit[i]=='1':
+                emitter.x(emitter.q[i])
+    emitter = adder_builder(name)(emitter, emitter.q, emitter.c, n)
+    emitter.flush()
+    return emitter.num_gates
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+    import tracemalloc
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ('CRA_in_Google', 'QMDA_in_Google'):
+            # the modules of the adder are imported before the memory is traced
+            adder_builder(name)
+            for n in (10**4, 10**5):
+                path = os.path.join(directory, '%s_%d.qasm' % (name, n))
+                start = time.perf_counter()
+                num_gates = emit_adder(name, n, path)
+                elapsed = time.perf_counter() - start
+                # the peak memory is traced in a second run, which tracemalloc slows down
+                tracemalloc.start()
+                emit_adder(name, n, path)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                print("%s n=%d: %d gates, %.1f MB of OpenQASM 3 in %.2f s, peak memory %.2f MB"
+                      % (name, n, num_gates, os.path.getsize(path)/2**20, elapsed, peak/2**20))
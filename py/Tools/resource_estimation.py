@@ -0,0 +1,392 @@
+'''
+Resource estimation of the adders without building a QuantumCircuit. The
+    number of gates, T gates and CNOT gates of an adder is the sum of the
+    costs of the templates it is built from, e.g., MAG, UMA_1 or
+    BQFA_in_Google, times the number of times its loops call them, so it is
+    computed in O(1) for any n.
+
+The gates which are not Clifford+T are counted with the decompositions in
+    DECOMPOSITIONS, i.e., a Toffoli gate costs 7 T gates and 6 CNOT gates
+    with T-depth 4, and CSX and CP(+-pi/2) cost 3 T gates and 2 CNOT gates
+    with T-depth 2. The adders are built with the native ccx, whatever the
+    policy set with Tools.toffoli_policy.use_toffoli_policy.
+
+The depth is not additive, because the templates of neighbouring digits
+    overlap. Every adder repeats the same loop body on qubits shifted by a
+    constant stride, so the depth is affine in n once the loop is longer
+    than its prologue and epilogue: it is counted gate by gate with the
+    Resource_counter for three small n and extrapolated. The ripple adders
+    (CRA) grow linearly, while the QMDA have a constant depth.
+'''
+import functools
+import importlib
+import math
+from Tools.adder_layout import adder_builder, adder_size
+
+# Clifford+T decomposition of the gates, the operands index the qubits of
+# the gate. ccx is the 7 T gate decomposition used by qiskit, cs and csdg
+# are CP(pi/2) and CP(-pi/2), and csx is cs conjugated by H.
+DECOMPOSITIONS = {
+    'ccx'   : (('h',2), ('cx',1,2), ('tdg',2), ('cx',0,2), ('t',2), ('cx',1,2),
+               ('tdg',2), ('cx',0,2), ('t',1), ('t',2), ('h',2), ('cx',0,1),
+               ('t',0), ('tdg',1), ('cx',0,1)),
+    'cs'    : (('t',0), ('t',1), ('cx',0,1), ('tdg',1), ('cx',0,1)),
+    'csdg'  : (('tdg',0), ('tdg',1), ('cx',0,1), ('t',1), ('cx',0,1)),
+    'csx'   : (('h',1), ('t',0), ('t',1), ('cx',0,1), ('tdg',1), ('cx',0,1), ('h',1)),
+    'swap'  : (('cx',0,1), ('cx',1,0), ('cx',0,1)),
+}
+
+# resources which are added up over the templates
+ADDITIVE = ('gates', 'measurements', 't_count', 'cnot_count', 'clifford_count')
+
+def _gate_name(name, params):
+    # CP is only Clifford+T for the angles +-pi/2
+    if name=='cp':
+        if abs(abs(params[0])-math.pi/2) > 1e-9:
+            raise ValueError("cp(%s) has no exact Clifford+T decomposition" % params[0])
+        return 'cs' if params[0] > 0 else 'csdg'
+    return name
+
+class _Conditional:
+    # returned by the gates, so that the gate can be conditioned on a
+    # classical bit with c_if as in qiskit, which delays the gate until the
+    # classical bit is written
+    def __init__(self, counter, qubits):
+        self._counter = counter
+        self._qubits = qubits
+
+    def c_if(self, c, value):
+        counter = self._counter
+        wires = self._qubits + (len(counter.q)+c,)
+        for times, duration in ((counter._depth, 1), (counter._clifford_t_depth, 1), (counter._t_depth, 0)):
+            time = max(max(times[wire] for wire in self._qubits), times[wires[-1]]+duration)
+            for wire in wires:
+                times[wire] = time
+        return self
+
+class Resource_counter:
+    '''
+    This is used to count the resources of a circuit gate by gate without
+        building it. It has the same gate methods as a qiskit circuit, thus
+        it can be passed to the circuit builders in place of "circ". Qubits
+        and classical bits are integer indices, which are provided by the
+        "q" and "c" attributes.
+
+    The depths are tracked with an ASAP schedule: "depth" is the depth of the
+        circuit as built, which is the same as QuantumCircuit.depth(), and
+        "clifford_t_depth" and "t_depth" are the depth and the number of T
+        layers after the gates are decomposed with DECOMPOSITIONS.
+
+    input:
+        num_qubits  :       number of qubits
+        num_clbits  :       number of classical bits
+
+    **Example:**
+
+    counter = Resource_counter(3*n+1, n+1)
+    counter = CRA_in_Islam(counter, counter.q, counter.c, n)
+    resources = counter.get_resources()
+
+    resources['t_count'] is the number of T gates of the adder.
+    '''
+
+    def __init__(self, num_qubits, num_clbits=0):
+        self.q = range(num_qubits)
+        self.c = range(num_clbits)
+        self.counts = {}
+        self.resources = {key: 0 for key in ADDITIVE}
+        # time of the last gate on every qubit and classical bit, which are
+        # the wires 0..num_qubits-1 and num_qubits..num_qubits+num_clbits-1
+        num_wires = num_qubits+num_clbits
+        self._depth = [0]*num_wires
+        self._clifford_t_depth = [0]*num_wires
+        self._t_depth = [0]*num_wires
+
+    def __getattr__(self, name):
+        raise AttributeError("Resource_counter does not support '%s' gate" % name)
+
+    def _schedule(self, times, wires, duration):
+        # the gate starts after the last gate on all its wires
+        time = max(times[wire] for wire in wires) + duration
+        for wire in wires:
+            times[wire] = time
+
+    def _apply(self, name, qubits, params=()):
+        self.counts[name] = self.counts.get(name, 0) + 1
+        self.resources['gates'] += 1
+        self._schedule(self._depth, qubits, 1)
+        for gate in DECOMPOSITIONS.get(_gate_name(name, params), ((name,)+tuple(range(len(qubits))),)):
+            wires = [qubits[i] for i in gate[1:]]
+            self._schedule(self._clifford_t_depth, wires, 1)
+            if gate[0] in ('t', 'tdg'):
+                self.resources['t_count'] += 1
+                self._schedule(self._t_depth, wires, 1)
+            else:
+                self._schedule(self._t_depth, wires, 0)
+                if gate[0]=='cx':
+                    self.resources['cnot_count'] += 1
+                else:
+                    self.resources['clifford_count'] += 1
+        return _Conditional(self, tuple(qubits))
+
+    def x(self, q_t):
+        return self._apply('x', (q_t,))
+
+    def h(self, q_t):
+        self._apply('h', (q_t,))
+
+    def s(self, q_t):
+        self._apply('s', (q_t,))
+
+    def sdg(self, q_t):
+        self._apply('sdg', (q_t,))
+
+    def z(self, q_t):
+        return self._apply('z', (q_t,))
+
+    def t(self, q_t):
+        self._apply('t', (q_t,))
+
+    def tdg(self, q_t):
+        self._apply('tdg', (q_t,))
+
+    def cx(self, q_c, q_t):
+        return self._apply('cx', (q_c, q_t))
+
+    def cz(self, q_c, q_t):
+        return self._apply('cz', (q_c, q_t))
+
+    def ccx(self, q_c1, q_c2, q_t):
+        self._apply('ccx', (q_c1, q_c2, q_t))
+
+    def csx(self, q_c, q_t):
+        self._apply('csx', (q_c, q_t))
+
+    def cp(self, theta, q_c, q_t):
+        self._apply('cp', (q_c, q_t), (theta,))
+
+    def swap(self, q_0, q_1):
+        self._apply('swap', (q_0, q_1))
+
+    def measure(self, q, c):
+        wires = (q, len(self.q)+c)
+        self.counts['measure'] = self.counts.get('measure', 0) + 1
+        self.resources['measurements'] += 1
+        for times in (self._depth, self._clifford_t_depth):
+            self._schedule(times, wires, 1)
+        self._schedule(self._t_depth, wires, 0)
+
+    def barrier(self, *args):
+        pass
+
+    def get_resources(self):
+        '''
+        The resources of the circuit, i.e., a dictionary with
+            'qubits', 'clbits'                  : size of the circuit
+            'gates', 'measurements'             : number of gates and measurements as built
+            't_count', 'cnot_count',
+            'clifford_count'                    : number of T/Tdg, CNOT and other gates
+                                                      after the decomposition
+            'depth'                             : depth as built
+            'clifford_t_depth', 't_depth'       : depth and T-depth after the decomposition
+        '''
+        resources = {'qubits': len(self.q), 'clbits': len(self.c)}
+        resources.update(self.resources)
+        resources['depth'] = max(self._depth, default=0)
+        resources['clifford_t_depth'] = max(self._clifford_t_depth, default=0)
+        resources['t_depth'] = max(self._t_depth, default=0)
+        return resources
+
+# name : (module, function, number of qubits)
+TEMPLATES = {
+    'MAG'                       : ('BQFA.BQFA_in_Cuccaro', 'MAG', 3),
+    'UMA_1'                     : ('BQFA.BQFA_in_Cuccaro', 'UMA_1', 3),
+    'UMA_2'                     : ('BQFA.BQFA_in_Cuccaro', 'UMA_2', 3),
+    'BQFA_Sum_first_left'       : ('BQFA.BQFA_Sum_First', 'BQFA_Sum_first_left', 3),
+    'BQFA_Sum_first_right'      : ('BQFA.BQFA_Sum_First', 'BQFA_Sum_first_right', 3),
+    'Carry_First_BQFA'          : ('BQFA.BQFA_Carry_First', 'Carry_First_BQFA', 4),
+    'Sum_First_BQFA'            : ('BQFA.BQFA_Sum_First', 'Sum_First_BQFA', 4),
+    'BQFA_in_Biswas'            : ('BQFA.BQFA_in_Biswas', 'BQFA_in_Biswas', 4),
+    'BQFA_in_Cuccaro'           : ('BQFA.BQFA_in_Cuccaro', 'BQFA_in_Cuccaro', 4),
+    'BQFA_in_Google'            : ('BQFA.BQFA_in_Google', 'BQFA_in_Google', 4),
+    'BQFA_in_Islam'             : ('BQFA.BQFA_in_Islam', 'BQFA_in_Islam', 4),
+    'BQFA_in_Mazumder'          : ('BQFA.BQFA_in_Mazumder', 'BQFA_in_Mazumder', 7),
+    'BQFA_in_Sohel'             : ('BQFA.BQFA_in_Sohel', 'BQFA_in_Sohel', 5),
+    'Temperary_logical_AND'     : ('Basic_Gates.Temperary_logical_AND', 'Temperary_logical_AND', 3),
+    'Toffoli_gate'              : ('Basic_Gates.Toffoli_gate', 'Toffoli_gate', 3),
+    'Peres_gate'                : ('Basic_Gates.Peres_gate', 'Peres_gate', 3),
+    'NG_gate'                   : ('Basic_Gates.NG_gate', 'NG_gate', 4),
+    'sqrt_root_CNOT_Hermitian'  : ('Basic_Gates.sqrt_root_CNOT_Hermitian_gate', 'sqrt_root_CNOT_Hermitian', 2),
+}
+
+# number of calls of each template and gate by the loops of each adder
+ADDER_TEMPLATES = {
+    'CRA_in_Islam'                  : lambda n: {'BQFA_in_Islam': n, 'measure': n+1},
+    'CRA_in_Biswas'                 : lambda n: {'BQFA_in_Biswas': n, 'measure': n+1},
+    'CRA_in_Cuccaro_2cnotversion'   : lambda n: {'BQFA_in_Cuccaro': n, 'measure': n+1},
+    'CRA_in_Google'                 : lambda n: {'BQFA_in_Google': n, 'measure': n+1},
+    'CRA_in_Cuccaro_in_place'       : lambda n: {'MAG': n, 'cx': 1, 'UMA_1': n, 'measure': n+1},
+    'CRA_in_Takahashi'              : lambda n: {'cx': 5*n-5 if n > 1 else 1, 'ccx': 2*n-1, 'measure': n+1},
+    'CRA_in_Mazumder'               : lambda n: {'BQFA_in_Mazumder': n, 'measure': n+1},
+    'CRA_in_Sohel'                  : lambda n: {'BQFA_in_Sohel': n, 'measure': n+1},
+    'QMDA_Carry_First'              : lambda n: {'x': 3*n, 'MAG': n, 'BQFA_in_Cuccaro': n,
+                                                 'UMA_1': n, 'measure': 2*n+2},
+    'QMDA_mixed'                    : lambda n: {'x': 3*n, 'MAG': 1, 'BQFA_Sum_first_left': n-1,
+                                                 'BQFA_in_Google': n, 'UMA_1': 1,
+                                                 'BQFA_Sum_first_right': n-1, 'measure': 2*n+2},
+    'QMDA_Sum_google_mixed'         : lambda n: {'x': 3*n, 'BQFA_Sum_first_left': n, 'cx': 1,
+                                                 'BQFA_Sum_first_right': n, 'BQFA_in_Google': n,
+                                                 'measure': 2*n+2},
+    'QMDA_in_Biswas'                : lambda n: {'x': 3*n, 'BQFA_in_Biswas': 2*n, 'measure': 2*n+2},
+    'QMDA_in_Cuccaro'               : lambda n: {'x': 3*n, 'BQFA_in_Cuccaro': 2*n, 'measure': 2*n+2},
+    'QMDA_in_Google'                : lambda n: {'x': 3*n, 'BQFA_in_Google': 2*n, 'measure': 2*n+2},
+    'QMDA_in_Islam'                 : lambda n: {'x': 3*n, 'BQFA_in_Islam': 2*n, 'measure': 2*n+2},
+    'QMDA_in_Mazumder'              : lambda n: {'x': 3*n, 'BQFA_in_Mazumder': 2*n, 'measure': 2*n+2},
+    'QMDA_in_Sohel'                 : lambda n: {'x': 3*n, 'BQFA_in_Sohel': 2*n, 'measure': 2*n+2},
+}
+
+# the depth is extrapolated from n=DEPTH_BASE, DEPTH_BASE+1 and DEPTH_BASE+2
+DEPTH_BASE = 3
+
+@functools.lru_cache(maxsize=None)
+def template_cost(name):
+    '''
+    This is used to count the resources of a template or a single gate.
+    input:
+        name        :       key of TEMPLATES, or 'x', 'cx', 'ccx' or 'measure'
+    output:
+        resources   :       resources of the template, see
+                                Resource_counter.get_resources
+    '''
+    if name=='measure':
+        counter = Resource_counter(1, 1)
+        counter.measure(0, 0)
+    elif name in ('x', 'cx', 'ccx'):
+        counter = Resource_counter(3)
+        getattr(counter, name)(*counter.q[:{'x': 1, 'cx': 2, 'ccx': 3}[name]])
+    elif name in TEMPLATES:
+        module, function, num_qubits = TEMPLATES[name]
+        counter = Resource_counter(num_qubits)
+        getattr(importlib.import_module(module), function)(counter, *counter.q)
+    else:
+        raise ValueError("Unknown template '%s'" % name)
+    return counter.get_resources()
+
+@functools.lru_cache(maxsize=None)
+def count_resources(name, n):
+    '''
+    This is used to count the resources of an adder gate by gate with the
+        Resource_counter. The cost is O(n), so it is used for small n.
+    '''
+    counter = Resource_counter(*adder_size(name, n, toffoli_policy=False))
+    counter = adder_builder(name, toffoli_policy=False)(counter, counter.q, counter.c, n)
+    return counter.get_resources()
+
+def _depths(name, n):
+    keys = ('depth', 'clifford_t_depth', 't_depth')
+    if n <= DEPTH_BASE+2:
+        resources = count_resources(name, n)
+        return {key: resources[key] for key in keys}
+    first, second, third = [count_resources(name, DEPTH_BASE+k) for k in range(3)]
+    depths = {}
+    for key in keys:
+        step = second[key]-first[key]
+        if third[key]-second[key]!=step:
+            raise ValueError("The %s of %s is not affine in n" % (key, name))
+        depths[key] = first[key] + step*(n-DEPTH_BASE)
+    return depths
+
+def estimate_resources(name, n):
+    '''
+    This is used to estimate the resources of an adder in O(1) time. The
+        adders which are not in ADDER_TEMPLATES, i.e., the prefix adders,
+        are counted with count_resources.
+    input:
+        name        :       name of the adder, e.g., 'CRA_in_Google'
+        n           :       length of input data, which is the number of
+                                bits for CRA and digits for QMDA
+    output:
+        resources   :       dictionary with the same keys as
+                                Resource_counter.get_resources
+
+    **Example:**
+
+    resources = estimate_resources('QMDA_in_Google', 2**20)
+
+    resources['t_count'] is 16*2^20, i.e., 4 T gates for each of the 2*2^20
+        BQFA_in_Google, and resources['t_depth'] does not depend on n.
+    '''
+    if name not in ADDER_TEMPLATES:
+        # the depth of the prefix adders is not affine in n, thus they are
+        # counted gate by gate
+        return dict(count_resources(name, n))
+    num_qubits, num_clbits = adder_size(name, n, toffoli_policy=False)
+    resources = {'qubits': num_qubits, 'clbits': num_clbits}
+    resources.update({key: 0 for key in ADDITIVE})
+    for template, multiplicity in ADDER_TEMPLATES[name](n).items():
+        cost = template_cost(template)
+        for key in ADDITIVE:
+            resources[key] += multiplicity*cost[key]
+    resources.update(_depths(name, n))
+    return resources
+
+def _counted_resources(name, n):
+    # resources of the QuantumCircuit, counted by qiskit
+    from qiskit import QuantumCircuit
+    num_qubits, num_clbits = adder_size(name, n, toffoli_policy=False)
+    circ = QuantumCircuit(num_qubits, num_clbits)
+    circ = adder_builder(name, toffoli_policy=False)(circ, circ.qubits, circ.clbits, n)
+    decomposed = QuantumCircuit(num_qubits, num_clbits)
+    for inst in circ.data:
+        name_gate = _gate_name(inst.operation.name, inst.operation.params)
+        if name_gate in DECOMPOSITIONS:
+            for gate in DECOMPOSITIONS[name_gate]:
+                getattr(decomposed, gate[0])(*[inst.qubits[i] for i in gate[1:]])
+        else:
+            decomposed.append(inst.operation, inst.qubits, inst.clbits)
+    ops = circ.count_ops()
+    decomposed_ops = decomposed.count_ops()
+    resources = {'qubits': circ.num_qubits, 'clbits': circ.num_clbits}
+    resources['gates'] = sum(ops.values()) - ops.get('measure', 0) - ops.get('barrier', 0)
+    resources['measurements'] = ops.get('measure', 0)
+    resources['t_count'] = decomposed_ops.get('t', 0) + decomposed_ops.get('tdg', 0)
+    resources['cnot_count'] = decomposed_ops.get('cx', 0)
+    resources['clifford_count'] = (sum(decomposed_ops.values()) - resources['t_count']
+                                   - resources['cnot_count'] - resources['measurements']
+                                   - decomposed_ops.get('barrier', 0))
+    resources['depth'] = circ.depth()
+    resources['clifford_t_depth'] = decomposed.depth()
+    resources['t_depth'] = decomposed.depth(lambda inst: inst.operation.name in ('t', 'tdg'))
+    return resources
+
+def cross_check(names=None, max_n=6):
+    '''
+    This is used to compare the estimates with the resources of the
+        QuantumCircuit of each adder, counted by qiskit, for n=1..max_n.
+    output:
+        mismatches  :       list of (name, n, key, estimated, counted)
+    '''
+    mismatches = []
+    for name in names or ADDER_TEMPLATES:
+        for n in range(1, max_n+1):
+            estimated = estimate_resources(name, n)
+            counted = _counted_resources(name, n)
+            for key in counted:
+                if estimated[key]!=counted[key]:
+                    mismatches.append((name, n, key, estimated[key], counted[key]))
+    return mismatches
+
+if __name__ == "__main__":
+    import time
+    mismatches = cross_check()
+    print("cross-check against qiskit for n=1..6: %d mismatches" % len(mismatches))
+    for mismatch in mismatches:
+        print("    %s n=%d %s: estimated %d, counted %d" % mismatch)
+    keys = ('qubits', 't_count', 't_depth', 'cnot_count', 'depth')
+    print("%-28s %8s" % ('adder', 'n') + ''.join("%14s" % key for key in keys))
+    start = time.perf_counter()
+    for name in ('CRA_in_Cuccaro_2cnotversion', 'CRA_in_Google', 'QMDA_Carry_First', 'QMDA_mixed', 'QMDA_in_Google'):
+        for n in (2**10, 2**15, 2**20):
+            resources = estimate_resources(name, n)
+            print("%-28s %8d" % (name, n) + ''.join("%14d" % resources[key] for key in keys))
+    print("estimated in %.3f ms" % ((time.perf_counter()-start)*1e3))
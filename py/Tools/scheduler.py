@@ -0,0 +1,305 @@
+'''
+ASAP/ALAP scheduler of the built circuits. Every gate of a circuit gets the
+    earliest (ASAP) and the latest (ALAP) start time allowed by the gates
+    before and after it on the same qubits and classical bits, given the
+    latency of each kind of gate. From the schedule the critical path, the
+    number of busy qubits in every time step and the idle time of every
+    qubit are reported, which shows where an adder loses parallelism, and
+    the circuit can be rebuilt moment by moment.
+
+A gate conditioned with c_if also waits on the classical bits of its
+    condition, so it is scheduled after the measurement which writes them.
+    With the default latency of 1 for every gate, the length of the schedule
+    is the same as QuantumCircuit.depth().
+'''
+from qiskit.circuit import Clbit
+
+def _condition_bits(circ, operation):
+    # indices of the classical bits read by the condition of an operation
+    if operation.condition is None:
+        return ()
+    bits = operation.condition[0]
+    if isinstance(bits, Clbit):
+        return (circ.find_bit(bits).index,)
+    return tuple(circ.find_bit(clbit).index for clbit in bits)
+
+def _operations(circ):
+    # (name, qubits, clbits, operation) of every gate of a circuit, and the
+    # classical bits of the condition of every gate
+    operations, conditions = [], []
+    for inst in circ.data:
+        if inst.operation.name=='barrier':
+            continue
+        qubits = tuple(circ.find_bit(qubit).index for qubit in inst.qubits)
+        clbits = tuple(circ.find_bit(clbit).index for clbit in inst.clbits)
+        operations.append((inst.operation.name, qubits, clbits, inst.operation))
+        conditions.append(_condition_bits(circ, inst.operation))
+    return operations, conditions
+
+def _wire_order(circ):
+    # the sequence of (name, qubits, clbits, condition bits) on every qubit
+    # and classical bit, which is kept by any valid schedule
+    order = [[] for _ in range(circ.num_qubits+circ.num_clbits)]
+    for (name, qubits, clbits, _), condition in zip(*_operations(circ)):
+        entry = (name, qubits, clbits, condition)
+        for w in set(qubits + tuple(circ.num_qubits+c for c in clbits+condition)):
+            order[w].append(entry)
+    return order
+
+class Schedule:
+    '''
+    This is the schedule of a circuit, which is built by schedule().
+
+    attributes:
+        operations  :       list of (name, qubits, clbits, operation)
+        conditions  :       classical bits of the condition of each operation
+        latency     :       latency of each operation
+        asap, alap  :       earliest and latest start time of each operation
+        length      :       length of the schedule
+        num_qubits  :       number of qubits
+        registers   :       registers of the circuit, which are kept by
+                                to_circuit for the conditions on them
+    '''
+
+    def __init__(self, operations, latency, num_qubits, num_clbits, conditions=None, registers=None):
+        self.operations = operations
+        self.registers = registers
+        self.conditions = conditions or [()]*len(operations)
+        self.latency = latency
+        self.num_qubits = num_qubits
+        self.num_clbits = num_clbits
+        # the wires are the qubits and then the classical bits, which are
+        # written by a measurement or read by a condition
+        wires = [tuple(sorted(set(qubits + tuple(num_qubits+c for c in clbits+condition))))
+                 for (_, qubits, clbits, _), condition in zip(operations, self.conditions)]
+        self._wires = wires
+        # ASAP: after the last operation on every wire, and the operation
+        # which finishes last is kept to trace the critical path back
+        ready = [0]*(num_qubits+num_clbits)
+        last = [None]*(num_qubits+num_clbits)
+        self.asap = []
+        self._before = []
+        for k, wire_list in enumerate(wires):
+            start = max((ready[w] for w in wire_list), default=0)
+            before = None
+            for w in wire_list:
+                if last[w] is not None and ready[w]==start:
+                    before = last[w]
+            self.asap.append(start)
+            self._before.append(before)
+            for w in wire_list:
+                ready[w] = start + latency[k]
+                last[w] = k
+        self.length = max(ready, default=0)
+        # ALAP: before the first later operation on every wire
+        due = [self.length]*(num_qubits+num_clbits)
+        self.alap = [0]*len(operations)
+        for k in range(len(operations)-1, -1, -1):
+            start = min(due[w] for w in wires[k]) - latency[k]
+            self.alap[k] = start
+            for w in wires[k]:
+                due[w] = start
+
+    def slack(self):
+        '''
+        The slack of each operation, i.e., ALAP minus ASAP start. The
+            operations with zero slack are on a critical path.
+        '''
+        return [alap-asap for asap, alap in zip(self.asap, self.alap)]
+
+    def check(self, method='asap'):
+        '''
+        This is used to check that every operation starts after the previous
+            operation on each of its wires has finished, e.g., that a gate
+            with c_if follows the measurement of its condition. A ValueError
+            is raised otherwise.
+        '''
+        starts = self.asap if method=='asap' else self.alap
+        ready = [0]*(self.num_qubits+self.num_clbits)
+        for k, wire_list in enumerate(self._wires):
+            if any(starts[k] < ready[w] for w in wire_list):
+                raise ValueError("Operation %d (%s) starts at %d before its wires are ready"
+                                 % (k, self.operations[k][0], starts[k]))
+            for w in wire_list:
+                ready[w] = starts[k] + self.latency[k]
+
+    def critical_path(self):
+        '''
+        A longest chain of operations, as indices into "operations" in order.
+        '''
+        if not self.operations:
+            return []
+        finish = [start+latency for start, latency in zip(self.asap, self.latency)]
+        k = max(range(len(finish)), key=lambda i: finish[i])
+        path = []
+        while k is not None:
+            path.append(k)
+            k = self._before[k]
+        return path[::-1]
+
+    def moments(self, method='asap'):
+        '''
+        The operations grouped by their start time.
+        output:
+            moments     :       list whose t-th element is the list of
+                                    operations starting at time t
+        '''
+        starts = self.asap if method=='asap' else self.alap
+        moments = [[] for _ in range(self.length)]
+        for k, start in enumerate(starts):
+            moments[start].append(k)
+        return moments
+
+    def layer_width(self, method='asap'):
+        '''
+        The number of busy qubits in every time step.
+        '''
+        starts = self.asap if method=='asap' else self.alap
+        width = [0]*(self.length+1)
+        for k, start in enumerate(starts):
+            busy = len(self.operations[k][1])
+            width[start] += busy
+            width[start+self.latency[k]] -= busy
+        for t in range(1, self.length+1):
+            width[t] += width[t-1]
+        return width[:self.length]
+
+    def idle_time(self, method='asap'):
+        '''
+        The idle time of every qubit between its first and its last
+            operation, i.e., the time the qubit waits while it holds data.
+        '''
+        starts = self.asap if method=='asap' else self.alap
+        first = [None]*self.num_qubits
+        end = [0]*self.num_qubits
+        busy = [0]*self.num_qubits
+        for k, start in enumerate(starts):
+            for q in self.operations[k][1]:
+                if first[q] is None or start < first[q]:
+                    first[q] = start
+                end[q] = max(end[q], start+self.latency[k])
+                busy[q] += self.latency[k]
+        return [0 if first[q] is None else end[q]-first[q]-busy[q] for q in range(self.num_qubits)]
+
+    def report(self, method='asap'):
+        '''
+        A summary of the schedule, i.e., a dictionary with
+            'length'            :   length of the schedule
+            'operations'        :   number of operations
+            'critical_path'     :   number of operations on the critical path
+            'critical_gates'    :   number of each gate on the critical path
+            'max_width',
+            'mean_width'        :   largest and mean number of busy qubits
+            'idle_time'         :   total idle time of the qubits
+            'utilisation'       :   busy qubit time over num_qubits*length
+        '''
+        path = self.critical_path()
+        critical_gates = {}
+        for k in path:
+            name = self.operations[k][0]
+            critical_gates[name] = critical_gates.get(name, 0) + 1
+        width = self.layer_width(method)
+        busy = sum(len(self.operations[k][1])*self.latency[k] for k in range(len(self.operations)))
+        return {'length': self.length,
+                'operations': len(self.operations),
+                'critical_path': len(path),
+                'critical_gates': critical_gates,
+                'max_width': max(width, default=0),
+                'mean_width': sum(width)/self.length if self.length else 0,
+                'idle_time': sum(self.idle_time(method)),
+                'utilisation': busy/(self.num_qubits*self.length) if self.length else 0}
+
+    def to_circuit(self, method='asap', barriers=False):
+        '''
+        This is used to rebuild the circuit moment by moment.
+        input:
+            method      :       'asap' or 'alap'
+            barriers    :       whether a barrier is added between moments
+        output:
+            circ        :       new circuit
+        '''
+        from qiskit import QuantumCircuit
+        if self.registers:
+            circ = QuantumCircuit(*self.registers)
+        else:
+            circ = QuantumCircuit(self.num_qubits, self.num_clbits)
+        for moment in self.moments(method):
+            for k in moment:
+                name, qubits, clbits, operation = self.operations[k]
+                circ.append(operation, [circ.qubits[q] for q in qubits], [circ.clbits[c] for c in clbits])
+            if barriers and moment:
+                circ.barrier()
+        return circ
+
+def schedule(circ, latencies=None):
+    '''
+    This is used to schedule a built circuit.
+    input:
+        circ        :       circuit
+        latencies   :       dictionary from gate name to latency, e.g.,
+                                {'ccx': 3, 'measure': 10}, the other gates
+                                have latency 1
+    output:
+        schedule    :       Schedule
+
+    **Example:**
+
+    sched = schedule(circ, {'ccx': 3})
+    report = sched.report()
+
+    report['length'] is the depth of the circuit when a Toffoli gate takes
+        3 time steps.
+    '''
+    latencies = latencies or {}
+    operations, conditions = _operations(circ)
+    latency = [latencies.get(name, 1) for name, _, _, _ in operations]
+    registers = None
+    # a circuit with bits outside of its registers is rebuilt bit by bit
+    if sum(reg.size for reg in circ.qregs+circ.cregs)==circ.num_qubits+circ.num_clbits:
+        registers = circ.qregs + circ.cregs
+    return Schedule(operations, latency, circ.num_qubits, circ.num_clbits, conditions, registers)
+
+def check_schedule(circ, sched):
+    '''
+    This is used to check the ASAP and ALAP schedules of a circuit and the
+        circuits rebuilt from them, whose gates must be in the same order as
+        in circ on every qubit and classical bit. A ValueError is raised
+        otherwise.
+    '''
+    order = _wire_order(circ)
+    for method in ('asap', 'alap'):
+        sched.check(method)
+        if _wire_order(sched.to_circuit(method))!=order:
+            raise ValueError("The %s circuit reorders the gates of a wire" % method)
+
+def schedule_adder(name, n, latencies=None, check=False):
+    '''
+    This is used to build an adder and schedule it, and to check the
+        schedule with check_schedule if "check".
+    '''
+    from qiskit import QuantumCircuit
+    from Tools.adder_layout import adder_builder, adder_size
+    circ = QuantumCircuit(*adder_size(name, n))
+    circ = adder_builder(name)(circ, circ.qubits, circ.clbits, n)
+    sched = schedule(circ, latencies)
+    if check:
+        check_schedule(circ, sched)
+    return sched
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="ASAP/ALAP schedule of the adders")
+    parser.add_argument('--adders', nargs='*', default=['QMDA_in_Google', 'QMDA_mixed', 'QMDA_Carry_First'])
+    parser.add_argument('--n', type=int, nargs='*', default=[4, 8, 16])
+    parser.add_argument('--latency', nargs='*', default=[], metavar='GATE=LATENCY',
+                        help="latency of a gate, e.g., ccx=3 measure=10")
+    args = parser.parse_args()
+    latencies = {gate: int(latency) for gate, latency in (item.split('=') for item in args.latency)}
+    print("%-20s %4s %7s %9s %8s %8s %9s %12s  %s"
+          % ('adder', 'n', 'length', 'critical', 'max wid', 'mean wid', 'idle', 'utilisation', 'gates on the critical path'))
+    for name in args.adders:
+        for n in args.n:
+            report = schedule_adder(name, n, latencies, check=True).report()
+            print("%-20s %4d %7d %9d %8d %8.2f %9d %12.3f  %s"
+                  % (name, n, report['length'], report['critical_path'], report['max_width'],
+                     report['mean_width'], report['idle_time'], report['utilisation'], report['critical_gates']))
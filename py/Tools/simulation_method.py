@@ -0,0 +1,289 @@
+'''
+Automatic choice of the simulator of a circuit. The gate set and the width
+    of the circuit are inspected before it is run, and the cheapest method
+    which supports all its gates is chosen, in the order of METHODS:
+
+        reversible              :   Reversible_simulator, for X, CNOT,
+                                        Toffoli and SWAP only, O(n) memory
+        stabilizer              :   stabilizer tableau of Aer, for Clifford
+                                        circuits, O(n^2) memory
+        sparse                  :   Sparse_simulator, for Clifford+T, CSX and
+                                        CP, whose memory is the number of
+                                        basis states held at once, which is a
+                                        handful for the adders on a basis
+                                        state input
+        matrix_product_state,
+        statevector             :   Aer, for any gate, whichever needs less
+                                        memory
+
+The memory of the matrix product state is bounded by the bond dimension of
+    every cut between q[k-1] and q[k], which is at most 2^min(k, n-k) and
+    at most the product of the operator Schmidt ranks of the gates across
+    the cut, i.e., 2 for the controlled gates and 4 for SWAP and the other
+    2-qubit gates. Thus the ripple adders, whose gates act on neighbouring
+    qubits, have a small bond dimension, while the dense state vector needs
+    16*2^n bytes. If no method fits in the available memory, a MemoryError
+    is raised with the estimate before anything is run. The sparse
+    simulator is stopped with a MemoryError once its amplitudes exceed the
+    available memory, because the number of basis states it holds is only
+    known at run time.
+
+The extended stabilizer of Aer is not used: it samples the outcomes
+    approximately and returns wrong sums for the adders with T gates, which
+    the sparse simulator runs exactly.
+'''
+import os
+from Basic_Gates.init_state import bit2gate
+from Tools.compact_circuit import Compact_circuit
+
+METHODS = ('reversible', 'stabilizer', 'sparse', 'matrix_product_state', 'statevector')
+# the methods of Aer, which can be passed as methods to compare them
+AER_METHODS = ('stabilizer', 'matrix_product_state', 'statevector')
+
+_REVERSIBLE_GATES = {'x', 'cx', 'ccx', 'swap'}
+_CLIFFORD_GATES = {'id', 'x', 'y', 'z', 'h', 's', 'sdg', 'sx', 'sxdg', 'cx', 'cy', 'cz', 'swap'}
+_SPARSE_GATES = {'id', 'x', 'z', 'h', 's', 'sdg', 't', 'tdg', 'p', 'sx', 'cx', 'cz', 'ccx', 'csx', 'cp', 'swap'}
+# gates which the Sparse_simulator can condition with c_if
+_SPARSE_CONDITIONAL = {'x', 'z', 'cx', 'cz'}
+# log2 of the operator Schmidt rank of a gate across any cut
+_SCHMIDT_RANK = {'cx': 1, 'cy': 1, 'cz': 1, 'cp': 1, 'csx': 1, 'ccx': 1, 'swap': 2}
+
+# bytes of an amplitude of the Sparse_simulator, a dictionary entry of an
+# int and a complex
+SPARSE_TERM_BYTES = 160
+
+def available_memory():
+    '''
+    The available memory in bytes, or None if it is unknown.
+    '''
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1])*1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES')*os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError, AttributeError):
+        return None
+
+def _operations(circ):
+    # (name, qubits, conditioned) of every gate except measure and barrier
+    if isinstance(circ, Compact_circuit):
+        for name, operands, params, condition in circ.gates():
+            if name!='measure':
+                yield name, operands, condition is not None
+    else:
+        for inst in circ.data:
+            name = inst.operation.name
+            if name not in ('measure', 'barrier'):
+                yield name, [circ.find_bit(qubit).index for qubit in inst.qubits], \
+                      inst.operation.condition is not None
+
+def circuit_profile(circ):
+    '''
+    This is used to inspect the gates of a circuit.
+    input:
+        circ        :       QuantumCircuit or Compact_circuit
+    output:
+        profile     :       dictionary with
+                                'num_qubits'    : width of the circuit
+                                'gates'         : set of the gate names
+                                'conditioned'   : set of the names of the
+                                                    gates with c_if
+                                'bond'          : log2 of the bound of the
+                                                    bond dimension of every cut
+    '''
+    num_qubits = circ.num_qubits
+    gates, conditioned = set(), set()
+    # the gates across the cut k, between q[k-1] and q[k], add up in a
+    # difference array
+    crossing = [0]*(num_qubits+1)
+    for name, qubits, condition in _operations(circ):
+        gates.add(name)
+        if condition:
+            conditioned.add(name)
+        if len(qubits) > 1:
+            low, high = min(qubits), max(qubits)
+            rank = _SCHMIDT_RANK.get(name, 2*(len(qubits)-1))
+            crossing[low+1] += rank
+            crossing[high+1] -= rank
+    bond = []
+    total = 0
+    for k in range(num_qubits+1):
+        total += crossing[k]
+        bond.append(min(k, num_qubits-k, total))
+    return {'num_qubits': num_qubits, 'gates': gates, 'conditioned': conditioned,
+            'bond': bond}
+
+def method_memory(method, profile):
+    '''
+    This is used to estimate the memory of a method in bytes.
+    input:
+        method      :       one of METHODS
+        profile     :       see circuit_profile
+    output:
+        memory      :       estimate in bytes, or None if the method does
+                                not support the gates of the circuit
+    '''
+    gates, conditioned = profile['gates'], profile['conditioned']
+    n = profile['num_qubits']
+    if method=='reversible':
+        if gates <= _REVERSIBLE_GATES and not conditioned:
+            return 2*n
+    elif method=='stabilizer':
+        if gates <= _CLIFFORD_GATES:
+            return (2*n)*(2*n+1)//8 + 1
+    elif method=='sparse':
+        if gates <= _SPARSE_GATES and conditioned <= _SPARSE_CONDITIONAL:
+            # the basis state of the input, the rest is checked at run time
+            return SPARSE_TERM_BYTES
+    elif method=='matrix_product_state':
+        bond = profile['bond']
+        # a tensor of 2 x bond x bond complex amplitudes per qubit
+        return sum(32 << (bond[k]+bond[k+1]) for k in range(n))
+    elif method=='statevector':
+        return 16 << n
+    else:
+        raise ValueError("Unknown method '%s'" % method)
+    return None
+
+def _format_bytes(memory):
+    if memory >= 1 << 60:
+        return "2^%d B" % (int(memory).bit_length()-1)
+    for unit in ('B', 'KB', 'MB', 'GB', 'TB'):
+        if memory < 1024:
+            break
+        memory /= 1024
+    return "%.1f %s" % (memory, unit)
+
+def select_method(circ, methods=METHODS, memory=None):
+    '''
+    This is used to choose the cheapest simulator of a circuit, which fits
+        in the memory.
+    input:
+        circ        :       QuantumCircuit or Compact_circuit
+        methods     :       methods to choose from, e.g., AER_METHODS
+        memory      :       memory in bytes, by default the available memory
+    output:
+        method      :       chosen method
+        estimate    :       memory estimate of the method in bytes
+
+    **Example:**
+
+    method, estimate = select_method(circ)
+
+    method is 'sparse' for QMDA_in_Google, whose dense state vector does
+        not fit in the memory for n > 5.
+    '''
+    memory = available_memory() if memory is None else memory
+    profile = circuit_profile(circ)
+    estimates = [(method, method_memory(method, profile)) for method in methods]
+    estimates = [(method, estimate) for method, estimate in estimates if estimate is not None]
+    if not estimates:
+        raise ValueError("None of the methods %s supports the gates %s" % (methods, sorted(profile['gates'])))
+    # the dense methods are compared by memory, the others are preferred in order
+    dense = [entry for entry in estimates if entry[0] in ('matrix_product_state', 'statevector')]
+    ordered = [entry for entry in estimates if entry[0] not in ('matrix_product_state', 'statevector')]
+    ordered += sorted(dense, key=lambda entry: entry[1])
+    for method, estimate in ordered:
+        if memory is None or estimate <= memory:
+            return method, estimate
+    method, estimate = min(ordered, key=lambda entry: entry[1])
+    raise MemoryError("The cheapest method for %d qubits, %s, needs about %s, but only %s is available"
+                      % (profile['num_qubits'], method, _format_bytes(estimate), _format_bytes(memory)))
+
+def simulate(circ, input_bit=None, shots=1, methods=METHODS, memory=None, seed=None):
+    '''
+    This is used to run a circuit with the method chosen by select_method.
+    input:
+        circ        :       QuantumCircuit or Compact_circuit, whose qubits
+                                start in |0>
+        input_bit   :       input state of the qubits, which is prepared
+                                with X gates in front of the circuit
+        shots       :       number of shots
+        methods     :       methods to choose from
+        memory      :       memory in bytes, by default the available memory
+        seed        :       seed of the random outcomes of measurements
+    output:
+        counts      :       measured classical bits, in the format of qiskit
+        method      :       method used
+    '''
+    memory = available_memory() if memory is None else memory
+    method, estimate = select_method(circ, methods, memory)
+    input_bit = input_bit or ''
+    if method in ('reversible', 'sparse'):
+        from Simulator.Reversible_simulator import Reversible_simulator
+        from Simulator.Sparse_simulator import Sparse_simulator
+        from Tools.compact_circuit import from_qiskit
+        compact = circ if isinstance(circ, Compact_circuit) else from_qiskit(circ)
+        if method=='reversible':
+            # the outcome is deterministic, so one run gives every shot
+            sim = Reversible_simulator(compact.num_qubits, compact.num_clbits)
+            sim = compact.replay(bit2gate(sim, sim.q, input_bit))
+            return {key: shots for key in sim.get_counts()}, method
+        term_limit = None if memory is None else memory//SPARSE_TERM_BYTES
+        counts = {}
+        for shot in range(shots):
+            sim = Sparse_simulator(compact.num_qubits, compact.num_clbits,
+                                   seed=None if seed is None else seed+shot, term_limit=term_limit)
+            sim = compact.replay(bit2gate(sim, sim.q, input_bit))
+            for key in sim.get_counts():
+                counts[key] = counts.get(key, 0) + 1
+        return counts, method
+    from qiskit import transpile
+    from qiskit.providers.aer import QasmSimulator
+    qc = circ.to_qiskit() if isinstance(circ, Compact_circuit) else circ
+    prep = bit2gate(qc.copy_empty_like(), range(qc.num_qubits), input_bit)
+    backend = QasmSimulator(method=method)
+    if memory is not None:
+        backend.set_options(max_memory_mb=memory >> 20)
+    run = transpile(prep.compose(qc), backend)
+    result = backend.run(run, shots=shots, seed_simulator=seed).result()
+    return result.get_counts(), method
+
+def simulate_adder(name, n, A, B, carry=0, methods=METHODS, memory=None, seed=None):
+    '''
+    This is used to add two integers with an adder on the method chosen by
+        select_method. The adder is recorded in a Compact_circuit, so no
+        QuantumCircuit is built unless an Aer method is chosen.
+    output:
+        result      :       decoded sum, see adder_layout
+        method      :       method used
+
+    **Example:**
+
+    result, method = simulate_adder('QMDA_in_Google', 1000, A, B)
+    '''
+    from Tools.adder_layout import data_string, decode_counts
+    from Tools.compact_circuit import record_adder
+    circ = record_adder(name, n)
+    counts, method = simulate(circ, data_string(name, n, A, B, carry), 1, methods, memory, seed)
+    return decode_counts(name, n, counts), method
+
+if __name__ == "__main__":
+    import random
+    import time
+    from Tools.adder_layout import ADDERS, adder_size, expected_sum
+    from Tools.compact_circuit import record_adder
+    print("available memory: %s" % _format_bytes(available_memory()))
+    print("%-28s %5s %7s %22s %12s %14s %14s %8s" % ('adder', 'n', 'qubits', 'method', 'estimate',
+                                                       'MPS estimate', 'statevector', 'correct'))
+    for name in sorted(ADDERS):
+        for n in (4, 64):
+            A, B, carry = random.getrandbits(n), random.getrandbits(n), random.getrandbits(1)
+            profile = circuit_profile(record_adder(name, n))
+            method, estimate = select_method(record_adder(name, n))
+            start = time.perf_counter()
+            result, method = simulate_adder(name, n, A, B, carry)
+            print("%-28s %5d %7d %22s %12s %14s %14s %8s"
+                  % (name, n, adder_size(name, n)[0], method, _format_bytes(estimate),
+                     _format_bytes(method_memory('matrix_product_state', profile)),
+                     _format_bytes(method_memory('statevector', profile)),
+                     result==expected_sum(name, n, A, B, carry)))
+    # without the exact simulators, a wide QMDA is refused before it runs
+    try:
+        select_method(record_adder('QMDA_in_Google', 64), methods=('statevector',))
+    except MemoryError as error:
+        print("QMDA_in_Google n=64 on the state vector: %s" % error)
@@ -0,0 +1,329 @@
+'''
+Policy for the Toffoli gates of the adders. The builders add Toffoli gates
+    with circ.ccx, and Toffoli_policy wraps "circ" so that every ccx of any
+    adder is replaced by the implementation chosen by the policy, without
+    changing the builders:
+
+        ccx                 :   native Toffoli gate of the backend
+        Toffoli_Tdepth4     :   7 T gates, 6 CNOT gates, T-depth 4
+        Toffoli_gate        :   controlled square roots of X
+        Toffoli_Tdepth1     :   7 T gates with T-depth 1 on 4 ancillas
+
+The implementation is chosen by name, or with 'auto' by the smallest
+    weighted cost over the T-count, T-depth, CNOT count, ancillas and native
+    Toffoli gates of the implementations, which are counted once with the
+    Resource_counter. The weights of a backend are passed per build, or set
+    for every build with use_toffoli_policy as the composite gates are. The
+    policy set with use_toffoli_policy is applied by
+    Tools.adder_layout.adder_builder, so every adder built by the tools,
+    e.g., cached_transpile, the benchmark, emit_adder and record_adder,
+    follows it, and adder_size counts its ancillas. The analytic estimates
+    of Tools.resource_estimation keep the native ccx.
+
+The relative-phase logical AND and the Peres gate are not implementations
+    of a single ccx: the logical AND is only correct on a target in |0>
+    which is uncomputed by its inverse, and the Peres gate also has a CNOT,
+    so the adders which use them keep them. The Toffoli gates of a stage
+    share one T layer with Tdepth1_circuit instead of Toffoli_Tdepth1.
+'''
+import functools
+import importlib
+from Tools.adder_layout import adder_builder, adder_size
+from Tools.resource_estimation import Resource_counter
+
+# name : (module, function, number of ancillas), ccx is the native gate
+TOFFOLI_IMPLEMENTATIONS = {
+    'ccx'               : (None, None, 0),
+    'Toffoli_Tdepth4'   : ('Basic_Gates.Toffoli_Tdepth4', 'Toffoli_Tdepth4', 0),
+    'Toffoli_gate'      : ('Basic_Gates.Toffoli_gate', 'Toffoli_gate', 0),
+    'Toffoli_Tdepth1'   : ('Basic_Gates.Toffoli_Tdepth1', 'Toffoli_Tdepth1', 4),
+}
+
+# metrics of the cost model
+METRICS = ('t_count', 't_depth', 'cnot_count', 'ancillas', 'ccx')
+
+# weight of every metric, the native ccx is not available if its weight is None
+DEFAULT_WEIGHTS = {'t_count': 1, 't_depth': 1, 'cnot_count': 0, 'ancillas': 0, 'ccx': None}
+
+_implementation = 'ccx'
+_weights = DEFAULT_WEIGHTS
+
+def use_toffoli_policy(implementation='ccx', weights=None):
+    '''
+    This is used to set the policy of every adder built by
+        Tools.adder_layout.adder_builder and of every Toffoli_policy which is
+        created without an implementation, e.g.,
+        use_toffoli_policy('auto', weights) retargets all builds to a
+        backend. By default ccx is kept.
+    '''
+    global _implementation, _weights
+    if implementation!='auto' and implementation not in TOFFOLI_IMPLEMENTATIONS:
+        raise ValueError("Unknown Toffoli implementation '%s'" % implementation)
+    _implementation = implementation
+    _weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+
+def policy_implementation():
+    '''
+    The Toffoli implementation set by use_toffoli_policy, where 'auto' is
+        chosen with its weights.
+    '''
+    if _implementation=='auto':
+        return choose_toffoli(_weights)[0]
+    return _implementation
+
+def policy_ancillas():
+    '''
+    The number of ancillas of the Toffoli implementation set by
+        use_toffoli_policy.
+    '''
+    return TOFFOLI_IMPLEMENTATIONS[policy_implementation()][2]
+
+def policy_builder(name, builder):
+    '''
+    This is used to apply the policy set by use_toffoli_policy to a builder
+        of Tools.adder_layout, which is returned unchanged for ccx.
+    input:
+        name        :       name of the adder
+        builder     :       function with the signature (circ, q, c, n)
+    output:
+        builder     :       function with the same signature, whose qubits
+                                after the ones of the adder are the ancillas
+                                of the policy, see adder_size
+    '''
+    implementation = policy_implementation()
+    if implementation=='ccx':
+        return builder
+    weights = _weights
+    def build(circ, q, c, n):
+        num_qubits = adder_size(name, n, toffoli_policy=False)[0]
+        q = list(q)
+        policy = Toffoli_policy(circ, implementation, weights, q[num_qubits:])
+        builder(policy, q[:num_qubits], c, n)
+        return policy.circ
+    return build
+
+def _function(implementation):
+    module, function, num_ancillas = TOFFOLI_IMPLEMENTATIONS[implementation]
+    return getattr(importlib.import_module(module), function)
+
+@functools.lru_cache(maxsize=None)
+def _toffoli_cost(implementation):
+    module, function, num_ancillas = TOFFOLI_IMPLEMENTATIONS[implementation]
+    if module is None:
+        return {'t_count': 0, 't_depth': 0, 'cnot_count': 0, 'ancillas': 0, 'ccx': 1}
+    counter = Resource_counter(3+num_ancillas)
+    if num_ancillas:
+        _function(implementation)(counter, 0, 1, 2, counter.q[3:])
+    else:
+        _function(implementation)(counter, 0, 1, 2)
+    resources = counter.get_resources()
+    return {'t_count': resources['t_count'], 't_depth': resources['t_depth'],
+            'cnot_count': resources['cnot_count'], 'ancillas': num_ancillas, 'ccx': 0}
+
+def toffoli_cost(implementation):
+    '''
+    This is used to count the resources of a Toffoli implementation.
+    input:
+        implementation  :   key of TOFFOLI_IMPLEMENTATIONS
+    output:
+        cost        :       dictionary from every metric of METRICS to its
+                                value for one Toffoli gate
+    '''
+    return dict(_toffoli_cost(implementation))
+
+def _score(cost, weights):
+    return sum(weights[metric]*cost[metric] for metric in METRICS if cost[metric])
+
+def choose_toffoli(weights=None, num_ancillas=None):
+    '''
+    This is used to choose the Toffoli implementation of the smallest cost.
+    input:
+        weights     :       weight of every metric, the missing metrics are
+                                taken from DEFAULT_WEIGHTS
+        num_ancillas:       number of ancillas available, any if None
+    output:
+        implementation  :   key of TOFFOLI_IMPLEMENTATIONS
+        score       :       weighted cost of one Toffoli gate
+
+    **Example:**
+
+    implementation, score = choose_toffoli({'t_depth': 10, 'ancillas': 1})
+
+    implementation is 'Toffoli_Tdepth1', whose T-depth is 1.
+    '''
+    weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+    candidates = []
+    for implementation in TOFFOLI_IMPLEMENTATIONS:
+        cost = _toffoli_cost(implementation)
+        if cost['ccx'] and weights['ccx'] is None:
+            continue
+        if num_ancillas is not None and cost['ancillas'] > num_ancillas:
+            continue
+        # ties keep the order of TOFFOLI_IMPLEMENTATIONS
+        candidates.append((_score(cost, weights), len(candidates), implementation))
+    score, order, implementation = min(candidates)
+    return implementation, score
+
+class Toffoli_policy:
+    '''
+    This is used to build any adder with the Toffoli implementation of a
+        policy. It wraps a circuit and has the same gate methods, thus it can
+        be passed to the circuit builders in place of "circ". Every ccx is
+        replaced by the chosen implementation, and the other gates are added
+        unchanged.
+
+    input:
+        circ        :       circuit, or any object with its gate methods
+        implementation  :   key of TOFFOLI_IMPLEMENTATIONS, 'auto' to choose
+                                it with the weights, or None for the policy
+                                set by use_toffoli_policy
+        weights     :       weight of every metric for 'auto', see
+                                choose_toffoli
+        q_ancillas  :       ancillas whose initial state is |0>, which are
+                                returned as |0> after every Toffoli gate
+
+    **Example:**
+
+    policy = Toffoli_policy(circ, 'auto', {'t_depth': 10}, q[3*n+1:3*n+5])
+    policy = CRA_in_Cuccaro_2cnotversion(policy, q, c, n)
+    circ = policy.circ
+    report = policy.report()
+
+    report['implementation'] is 'Toffoli_Tdepth1', and report['total'] holds
+        the resources of the report['toffoli_count'] Toffoli gates.
+    '''
+
+    def __init__(self, circ, implementation=None, weights=None, q_ancillas=()):
+        if implementation is None:
+            implementation, weights = _implementation, _weights if weights is None else weights
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.q_ancillas = list(q_ancillas)
+        if implementation=='auto':
+            implementation, score = choose_toffoli(self.weights, len(self.q_ancillas))
+        elif implementation not in TOFFOLI_IMPLEMENTATIONS:
+            raise ValueError("Unknown Toffoli implementation '%s'" % implementation)
+        num_ancillas = TOFFOLI_IMPLEMENTATIONS[implementation][2]
+        if len(self.q_ancillas) < num_ancillas:
+            raise ValueError("%s needs %d ancillas, %d are given"
+                             % (implementation, num_ancillas, len(self.q_ancillas)))
+        self.circ = circ
+        self.implementation = implementation
+        self.toffoli_count = 0
+        self._toffoli = None if implementation=='ccx' else _function(implementation)
+        self._q_ancillas = self.q_ancillas[:num_ancillas]
+
+    def __getattr__(self, name):
+        # the other gates, whose result is returned, so that c_if can be used
+        return getattr(self.circ, name)
+
+    def ccx(self, q_c1, q_c2, q_t):
+        # the wrapper is returned as by Tdepth1_circuit.ccx
+        self.toffoli_count += 1
+        if self._toffoli is None:
+            self.circ.ccx(q_c1, q_c2, q_t)
+        elif self._q_ancillas:
+            self._toffoli(self.circ, q_c1, q_c2, q_t, self._q_ancillas)
+        else:
+            self._toffoli(self.circ, q_c1, q_c2, q_t)
+        return self
+
+    def report(self):
+        '''
+        The policy and the cost of the Toffoli gates added so far, i.e., a
+            dictionary with
+            'implementation'                    : chosen implementation
+            'toffoli_count'                     : number of ccx replaced
+            'cost'                              : metrics of one Toffoli gate
+            'total'                             : metrics of all Toffoli gates,
+                                                      whose ancillas are shared
+            'score'                             : weighted cost of all Toffoli
+                                                      gates
+        '''
+        cost = toffoli_cost(self.implementation)
+        total = {metric: cost[metric]*self.toffoli_count for metric in METRICS}
+        total['ancillas'] = cost['ancillas']
+        weights = dict(self.weights, ccx=self.weights['ccx'] or 0)
+        return {'implementation': self.implementation, 'toffoli_count': self.toffoli_count,
+                'cost': cost, 'total': total, 'score': _score(total, weights)}
+
+def build_adder(name, n, circ=None, implementation=None, weights=None):
+    '''
+    This is used to build an adder with a Toffoli policy, and to report the
+        policy with the circuit. If the implementation needs ancillas, they
+        are added after the qubits of the adder.
+    input:
+        name        :       name of the adder, e.g., 'CRA_in_Cuccaro_in_place'
+        n           :       length of input data
+        circ        :       class of the circuit, which is created with the
+                                numbers of qubits and classical bits, e.g.,
+                                Compact_circuit or Resource_counter. A
+                                Compact_circuit by default.
+        implementation  :   see Toffoli_policy
+        weights     :       see Toffoli_policy
+    output:
+        circ        :       circuit of the adder
+        report      :       see Toffoli_policy.report, with the 'qubits' of
+                                the circuit
+
+    **Example:**
+
+    circ, report = build_adder('CRA_in_Takahashi', n, Resource_counter, 'auto',
+                               {'t_count': 1, 'ccx': 5})
+    '''
+    if circ is None:
+        from Tools.compact_circuit import Compact_circuit
+        circ = Compact_circuit
+    if implementation is None:
+        implementation, weights = _implementation, _weights if weights is None else weights
+    if implementation=='auto':
+        implementation, score = choose_toffoli(weights)
+    elif implementation not in TOFFOLI_IMPLEMENTATIONS:
+        raise ValueError("Unknown Toffoli implementation '%s'" % implementation)
+    # the builder without the global policy, which is replaced by this one
+    num_qubits, num_clbits = adder_size(name, n, toffoli_policy=False)
+    num_ancillas = TOFFOLI_IMPLEMENTATIONS[implementation][2]
+    built = circ(num_qubits+num_ancillas, num_clbits)
+    q = list(built.q)
+    policy = Toffoli_policy(built, implementation, weights, q[num_qubits:])
+    adder_builder(name, toffoli_policy=False)(policy, q[:num_qubits], built.c, n)
+    report = policy.report()
+    report['qubits'] = num_qubits+num_ancillas
+    return built, report
+
+if __name__ == "__main__":
+    import random
+    from Simulator.Sparse_simulator import Sparse_simulator
+    from Tools.adder_layout import data_string, expected_sum, decode_counts
+
+    print("%-18s %8s %8s %11s %9s %5s" % ('implementation', 't_count', 't_depth', 'cnot_count', 'ancillas', 'ccx'))
+    for implementation in TOFFOLI_IMPLEMENTATIONS:
+        cost = toffoli_cost(implementation)
+        print("%-18s %8d %8d %11d %9d %5d" % ((implementation,)+tuple(cost[metric] for metric in METRICS)))
+
+    # cost profiles of backends
+    profiles = {
+        'native ccx'            : {'ccx': 1, 't_count': 1},
+        'T-count'               : {'t_count': 1, 't_depth': 0, 'cnot_count': 0.1},
+        'T-depth, free qubits'  : {'t_count': 0.1, 't_depth': 10, 'ancillas': 0},
+        'T-depth, scarce qubits': {'t_count': 0.1, 't_depth': 10, 'ancillas': 10},
+    }
+    n = 8
+    print()
+    print("%-24s %-28s %-18s %8s %8s %8s %7s %8s" % ('profile', 'adder', 'implementation', 'toffoli',
+                                                     't_count', 't_depth', 'qubits', 'correct'))
+    for label, weights in profiles.items():
+        for name in ('CRA_in_Cuccaro_in_place', 'CRA_in_Takahashi', 'QMDA_Carry_First'):
+            resources = build_adder(name, n, Resource_counter, 'auto', weights)[0].get_resources()
+            circ, report = build_adder(name, n, None, 'auto', weights)
+            # the adder still adds with the ancillas of the policy
+            A, B, carry = random.getrandbits(n), random.getrandbits(n), random.getrandbits(1)
+            sim = Sparse_simulator(circ.num_qubits, circ.num_clbits)
+            input_bit = data_string(name, n, A, B, carry)
+            for i in range(len(input_bit)):
+                if input_bit[i]=='1':
+                    sim.x(sim.q[i])
+            circ.replay(sim)
+            correct = decode_counts(name, n, sim.get_counts())==expected_sum(name, n, A, B, carry)
+            print("%-24s %-28s %-18s %8d %8d %8d %7d %8s"
+                  % (label, name, report['implementation'], report['toffoli_count'],
+                     resources['t_count'], resources['t_depth'], report['qubits'], correct))
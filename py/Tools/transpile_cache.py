@@ -0,0 +1,207 @@
+'''
+On-disk cache of the transpiled adders. The structure of an adder circuit
+    only depends on the adder and n, while the input data only changes the
+    layer of X gates which prepares it, so the body of the adder is built and
+    transpiled once, stored in QPY format, and the input is attached to the
+    loaded body for every run.
+
+The cache is content-addressed: the key is the SHA-256 of the name of the
+    adder, n, the basis gates, the coupling map, the optimisation level, the
+    Toffoli policy of Tools.toffoli_policy, the qiskit version and the source of the template modules and of
+    Tools.adder_layout, which builds them, so editing a template or
+    upgrading qiskit never returns a stale circuit. The source is hashed
+    once per process. The directory
+    is given by the QUANTUM_ADDER_CACHE environment variable, by default
+    ~/.cache/quantum_adder.
+'''
+import functools
+import glob
+import hashlib
+import json
+import os
+from Tools.adder_layout import adder_builder, adder_size
+
+# packages and modules whose source is part of the key
+_SOURCE_PACKAGES = ('Basic_Gates', 'BQFA', 'QCRA', 'QMDA')
+_SOURCE_MODULES = (os.path.join('Tools', 'adder_layout.py'),)
+_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# key : (body, layout), the circuits loaded in this process
+_loaded = {}
+
+def cache_directory():
+    '''
+    The directory of the cache.
+    '''
+    return os.environ.get('QUANTUM_ADDER_CACHE',
+                          os.path.join(os.path.expanduser('~'), '.cache', 'quantum_adder'))
+
+@functools.lru_cache(maxsize=None)
+def _source_digest():
+    digest = hashlib.sha256()
+    paths = [path for package in _SOURCE_PACKAGES
+             for path in sorted(glob.glob(os.path.join(_ROOT, package, '*.py')))]
+    paths += [os.path.join(_ROOT, module) for module in _SOURCE_MODULES]
+    for path in paths:
+        digest.update(os.path.relpath(path, _ROOT).encode())
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def transpile_key(name, n, basis_gates=None, coupling_map=None, optimization_level=1):
+    '''
+    This is used to get the key of a transpiled adder in the cache.
+    output:
+        key         :       hexadecimal SHA-256 digest
+    '''
+    import qiskit
+    from Tools.toffoli_policy import policy_implementation
+    content = {
+        'adder': name,
+        'n': n,
+        'basis_gates': sorted(basis_gates) if basis_gates else None,
+        'coupling_map': sorted(map(list, coupling_map)) if coupling_map else None,
+        'optimization_level': optimization_level,
+        'toffoli_policy': policy_implementation(),
+        'qiskit': qiskit.__version__,
+        'source': _source_digest(),
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+def _target(backend, basis_gates, coupling_map):
+    # the basis gates and the coupling map of the backend, unless given
+    if backend is not None:
+        configuration = backend.configuration()
+        if basis_gates is None:
+            basis_gates = configuration.basis_gates
+        if coupling_map is None:
+            coupling_map = configuration.coupling_map
+    return basis_gates, coupling_map
+
+def _initial_layout(circ, transpiled):
+    # physical qubit of every qubit of circ
+    layout = getattr(transpiled, '_layout', None)
+    if layout is None:
+        return list(range(circ.num_qubits))
+    virtual_bits = getattr(layout, 'initial_layout', layout).get_virtual_bits()
+    return [virtual_bits[qubit] for qubit in circ.qubits]
+
+def cached_transpile(name, n, backend=None, basis_gates=None, coupling_map=None,
+                     optimization_level=1, cache_dir=None):
+    '''
+    This is used to get the transpiled body of an adder, i.e., the adder and
+        its measurements without the input preparation. It is transpiled and
+        stored on the first call, and loaded from the cache afterwards.
+    input:
+        name                :       name of the adder, e.g., 'CRA_in_Google'
+        n                   :       length of input data
+        backend             :       backend whose basis gates and coupling
+                                        map are used, e.g., QasmSimulator()
+        basis_gates,
+        coupling_map        :       target, which overrides the backend
+        optimization_level  :       optimisation level of transpile
+        cache_dir           :       directory of the cache
+    output:
+        body                :       transpiled circuit
+        layout              :       list whose i-th element is the physical
+                                        qubit of q[i]
+
+    **Example:**
+
+    body, layout = cached_transpile('CRA_in_Google', 4, backend)
+    circ = attach_input(body, layout, data_string)
+
+    circ is the same circuit as the one transpiled by the __main__ driver.
+    '''
+    from qiskit import QuantumCircuit, transpile, qpy
+    basis_gates, coupling_map = _target(backend, basis_gates, coupling_map)
+    key = transpile_key(name, n, basis_gates, coupling_map, optimization_level)
+    if key in _loaded:
+        return _loaded[key]
+    cache_dir = cache_dir or cache_directory()
+    path = os.path.join(cache_dir, key)
+    if os.path.exists(path+'.qpy') and os.path.exists(path+'.json'):
+        with open(path+'.qpy', 'rb') as f:
+            body = qpy.load(f)[0]
+        with open(path+'.json') as f:
+            layout = json.load(f)['layout']
+    else:
+        circ = QuantumCircuit(*adder_size(name, n))
+        circ = adder_builder(name)(circ, circ.qubits, circ.clbits, n)
+        body = transpile(circ, basis_gates=basis_gates, coupling_map=coupling_map,
+                         optimization_level=optimization_level)
+        layout = _initial_layout(circ, body)
+        os.makedirs(cache_dir, exist_ok=True)
+        # the files are written under a temporary name and renamed, so a
+        # concurrent or interrupted run never reads a partial file
+        temporary = '%s.%d.tmp' % (path, os.getpid())
+        with open(temporary, 'wb') as f:
+            qpy.dump(body, f)
+        os.replace(temporary, path+'.qpy')
+        with open(temporary, 'w') as f:
+            json.dump({'adder': name, 'n': n, 'basis_gates': basis_gates,
+                       'optimization_level': optimization_level, 'layout': layout}, f)
+        os.replace(temporary, path+'.json')
+    _loaded[key] = (body, layout)
+    return body, layout
+
+def attach_input(body, layout, input_bit, basis_gates=None):
+    '''
+    This is used to prepare the input in front of a transpiled body.
+    input:
+        body        :       transpiled circuit
+        layout      :       physical qubit of every qubit, see cached_transpile
+        input_bit   :       input state of the qubits, the i-th character
+                                is the state of q[i]
+        basis_gates :       basis gates of the target, the X gates are
+                                transpiled if X is not one of them
+    output:
+        circ        :       circuit which prepares the input and runs the body
+    '''
+    prep = body.copy_empty_like()
+    for i in range(len(input_bit)):
+        if input_bit[i]=='1':
+            prep.x(layout[i])
+    if basis_gates is not None and 'x' not in basis_gates:
+        from qiskit import transpile
+        prep = transpile(prep, basis_gates=basis_gates, optimization_level=0)
+    return prep.compose(body)
+
+if __name__ == "__main__":
+    import random
+    import tempfile
+    import time
+    from qiskit import QuantumCircuit, transpile
+    from qiskit.providers.aer import QasmSimulator
+    from Basic_Gates.init_state import bit2gate
+    from Tools.adder_layout import data_string, expected_sum, decode_counts
+    backend = QasmSimulator()
+    name = 'CRA_in_Google'
+    n = 16
+    pairs = [(random.getrandbits(n), random.getrandbits(n), random.getrandbits(1)) for _ in range(20)]
+    num_qubits, num_clbits = adder_size(name, n)
+
+    start = time.perf_counter()
+    circs = []
+    for A, B, carry in pairs:
+        circ = QuantumCircuit(num_qubits, num_clbits)
+        circ = bit2gate(circ, circ.qubits, data_string(name, n, A, B, carry))
+        circ = adder_builder(name)(circ, circ.qubits, circ.clbits, n)
+        circs.append(transpile(circ, backend))
+    print("build and transpile %d circuits: %.3f s" % (len(pairs), time.perf_counter()-start))
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        cached_transpile(name, n, backend, cache_dir=cache_dir)
+        print("first run, transpiled and stored: %.3f s" % (time.perf_counter()-start))
+        _loaded.clear()
+        start = time.perf_counter()
+        circs = []
+        for A, B, carry in pairs:
+            body, layout = cached_transpile(name, n, backend, cache_dir=cache_dir)
+            circs.append(attach_input(body, layout, data_string(name, n, A, B, carry)))
+        print("load from the cache and attach %d inputs: %.3f s" % (len(pairs), time.perf_counter()-start))
+    result_sim = backend.run(circs, shots=1).result()
+    correct = all(decode_counts(name, n, result_sim.get_counts(k))==expected_sum(name, n, *pairs[k])
+                  for k in range(len(pairs)))
+    print("all sums correct: %s" % correct)
@@ -0,0 +1,255 @@
+'''
+Exhaustive verification of the basic gates, the binary quantum full adders
+    (BQFA) and the adders. Each basic gate is checked on every basis input
+    against the equations in the **Math** section of its docstring, each
+    BQFA against the sum and carry of a full adder, and each CRA/QMDA against
+    the sum given in Tools.adder_layout for every input up to a given n.
+
+The checks are split into tasks which are run in a process pool. The result
+    of every finished task is appended to a checkpoint file, so that an
+    interrupted verification is resumed by running it again with the same
+    checkpoint file.
+'''
+import sys
+import importlib
+import itertools
+import json
+import multiprocessing
+import os
+from Basic_Gates.init_state import bit2gate
+from Simulator.Reversible_simulator import Reversible_simulator
+from Simulator.Sparse_simulator import Sparse_simulator, sparse_add
+from Tools.adder_layout import ADDERS, adder_layout, expected_sum
+
+def _maj(a, b, c):
+    return (a&b) ^ (a&c) ^ (b&c)
+
+def _full_adder(num_qubits, inputs, constants, q_sum, q_carry):
+    # expected outputs of a BQFA, the other qubits are garbage
+    def spec(*bits):
+        outputs = [None]*num_qubits
+        a, b, c = [bits[i] for i in inputs]
+        outputs[q_sum] = a ^ b ^ c
+        outputs[q_carry] = _maj(a, b, c)
+        return outputs
+    return spec, constants
+
+# name : (module, function, number of qubits, expected outputs, constant inputs)
+GATES = {
+    'MAG'               : ('Basic_Gates.MAG_gate', 'MAG', 3,
+                            lambda A, B, C: (C^A, C^B, ((C^A)&(C^B))^C), {}),
+    'NG_gate'           : ('Basic_Gates.NG_gate', 'NG_gate', 4,
+                            lambda A, B, C, D: (A, B^D, (A&C)^D, ((1-A)&(B^D))^(1-C)), {}),
+    'Peres_gate'        : ('Basic_Gates.Peres_gate', 'Peres_gate', 3,
+                            lambda A, B, C: (A, A^B, (A&B)^C), {}),
+    'Toffoli_gate'      : ('Basic_Gates.Toffoli_gate', 'Toffoli_gate', 3,
+                            lambda A, B, C: (A, B, (A&B)^C), {}),
+    'Toffoli_Tdepth4'   : ('Basic_Gates.Toffoli_Tdepth4', 'Toffoli_Tdepth4', 3,
+                            lambda A, B, C: (A, B, (A&B)^C), {}),
+    'MAG (Cuccaro)'     : ('BQFA.BQFA_in_Cuccaro', 'MAG', 3,
+                            lambda q_0, q_1, q_2: (q_2^q_0, q_2^q_1, _maj(q_0, q_1, q_2)), {}),
+    'Carry_First_BQFA'  : ('BQFA.BQFA_Carry_First', 'Carry_First_BQFA', 4)
+                            + _full_adder(4, (0,1,2), {3:0}, 0, 3),
+    'Sum_First_BQFA'    : ('BQFA.BQFA_Sum_First', 'Sum_First_BQFA', 4)
+                            + _full_adder(4, (0,1,2), {3:0}, 3, 2),
+    'BQFA_in_Biswas'    : ('BQFA.BQFA_in_Biswas', 'BQFA_in_Biswas', 4)
+                            + _full_adder(4, (0,1,2), {3:0}, 2, 3),
+    'BQFA_in_Cuccaro'   : ('BQFA.BQFA_in_Cuccaro', 'BQFA_in_Cuccaro', 4)
+                            + _full_adder(4, (0,1,2), {3:0}, 1, 3),
+    'BQFA_in_Google'    : ('BQFA.BQFA_in_Google', 'BQFA_in_Google', 4)
+                            + _full_adder(4, (0,1,2), {3:0}, 1, 3),
+    'BQFA_in_Islam'     : ('BQFA.BQFA_in_Islam', 'BQFA_in_Islam', 4)
+                            + _full_adder(4, (0,1,2), {3:0}, 2, 3),
+    'BQFA_in_Mazumder'  : ('BQFA.BQFA_in_Mazumder', 'BQFA_in_Mazumder', 7)
+                            + _full_adder(7, (0,2,3), {1:1, 4:0, 5:0, 6:1}, 1, 4),
+    'BQFA_in_Sohel'     : ('BQFA.BQFA_in_Sohel', 'BQFA_in_Sohel', 5)
+                            + _full_adder(5, (0,1,2), {3:0, 4:0}, 3, 4),
+}
+
+def _gate_output(gate, num_qubits, input_bit):
+    '''
+    The output basis state of a gate, or None if the output is not a basis state.
+    '''
+    sim = Reversible_simulator(num_qubits)
+    sim = bit2gate(sim, sim.q, input_bit)
+    try:
+        gate(sim, *sim.q)
+        return sim.get_bits()
+    except AttributeError:
+        # the gate is not a permutation, so it is simulated with its amplitudes
+        sim = Sparse_simulator(num_qubits)
+        sim = bit2gate(sim, sim.q, input_bit)
+        gate(sim, *sim.q)
+        amplitudes = sim.get_amplitudes()
+        if len(amplitudes)!=1:
+            return None
+        return list(amplitudes)[0]
+
+def check_gate(name):
+    '''
+    This is used to check a gate or BQFA on all basis inputs.
+    input:
+        name        :       key of GATES
+    output:
+        result      :       dictionary with the number of checked inputs,
+                                the number of failures and a failing input
+    '''
+    module, function, num_qubits, spec, constants = GATES[name]
+    gate = getattr(importlib.import_module(module), function)
+    variables = [i for i in range(num_qubits) if i not in constants]
+    result = {'checked': 0, 'failures': 0, 'example': None}
+    for values in itertools.product((0,1), repeat=len(variables)):
+        bits = [0]*num_qubits
+        for i, value in constants.items():
+            bits[i] = value
+        for i, value in zip(variables, values):
+            bits[i] = value
+        input_bit = ''.join(str(bit) for bit in bits)
+        output = _gate_output(gate, num_qubits, input_bit)
+        expected = spec(*bits)
+        result['checked'] += 1
+        if output is None or any(e is not None and int(output[i])!=e for i, e in enumerate(expected)):
+            result['failures'] += 1
+            if result['example'] is None:
+                result['example'] = {'input': input_bit, 'output': output,
+                                     'expected': ''.join('x' if e is None else str(e) for e in expected)}
+    return result
+
+def _operand_widths(name, n):
+    layout = adder_layout(name, n)
+    return len(layout['A']), len(layout['B']), len(layout['carry'])
+
+def check_adder(name, n, A_start, A_stop):
+    '''
+    This is used to check an adder on all inputs whose A is in
+        range(A_start, A_stop).
+    input:
+        name        :       name of the adder
+        n           :       length of input data
+        A_start     :       first A
+        A_stop      :       last A + 1
+    output:
+        result      :       dictionary with the number of checked inputs,
+                                the number of failures and a failing input
+    '''
+    width_A, width_B, width_carry = _operand_widths(name, n)
+    inputs = list(itertools.product(range(A_start, A_stop), range(2**width_B), range(2**width_carry)))
+    try:
+        import numpy as np
+        from Simulator.Bit_sliced_simulator import bit_sliced_add
+        grid = np.array(inputs, dtype=np.uint64)
+        results = bit_sliced_add(name, n, grid[:,0], grid[:,1], grid[:,2]).tolist()
+    except AttributeError:
+        results = sparse_add(name, n, inputs)
+    result = {'checked': 0, 'failures': 0, 'example': None}
+    for (A, B, carry), output in zip(inputs, results):
+        expected = expected_sum(name, n, A, B, carry)
+        result['checked'] += 1
+        if output!=expected:
+            result['failures'] += 1
+            if result['example'] is None:
+                result['example'] = {'A': A, 'B': B, 'carry': carry, 'output': output, 'expected': expected}
+    return result
+
+def verification_tasks(max_n, adders=None, gates=None, chunk_size=2**14):
+    '''
+    This is used to split the verification into tasks.
+    input:
+        max_n       :       the adders are checked for n = 1, ..., max_n
+        adders      :       names of the adders, all adders if None
+        gates       :       names of the gates, all gates if None
+        chunk_size  :       maximum number of adder inputs in a task
+    output:
+        tasks       :       list of tasks, ('gate', name) or
+                                ('adder', name, n, A_start, A_stop)
+    '''
+    tasks = [('gate', name) for name in (GATES if gates is None else gates)]
+    for name in (ADDERS if adders is None else adders):
+        for n in range(1, max_n+1):
+            width_A, width_B, width_carry = _operand_widths(name, n)
+            step = max(1, chunk_size >> (width_B+width_carry))
+            for A_start in range(0, 2**width_A, step):
+                tasks.append(('adder', name, n, A_start, min(A_start+step, 2**width_A)))
+    return tasks
+
+def run_task(task):
+    '''
+    This is used to run a task of verification_tasks.
+    '''
+    if task[0]=='gate':
+        result = check_gate(task[1])
+    else:
+        result = check_adder(*task[1:])
+    result['task'] = list(task)
+    return result
+
+def verify(max_n=3, adders=None, gates=None, processes=None, checkpoint=None):
+    '''
+    This is used to verify the gates and adders in a process pool.
+    input:
+        max_n       :       the adders are checked for n = 1, ..., max_n
+        adders      :       names of the adders, all adders if None
+        gates       :       names of the gates, all gates if None
+        processes   :       number of processes, os.cpu_count() if None
+        checkpoint  :       file to which the finished tasks are appended.
+                                The tasks found in this file are not run again.
+    output:
+        results     :       results of all tasks, including the ones loaded
+                                from the checkpoint
+
+    **Example:**
+
+    results = verify(max_n=4, checkpoint='verify.jsonl')
+    failed = [result for result in results if result['failures']]
+    '''
+    results = []
+    if checkpoint is not None and os.path.exists(checkpoint):
+        with open(checkpoint) as f:
+            results = [json.loads(line) for line in f if line.strip()]
+    finished = set(tuple(result['task']) for result in results)
+    tasks = [task for task in verification_tasks(max_n, adders, gates) if task not in finished]
+    if tasks:
+        f = open(checkpoint, 'a') if checkpoint is not None else None
+        with multiprocessing.Pool(processes) as pool:
+            for result in pool.imap_unordered(run_task, tasks):
+                results.append(result)
+                if f is not None:
+                    f.write(json.dumps(result)+'\n')
+                    f.flush()
+        if f is not None:
+            f.close()
+    return results
+
+def summarize(results):
+    '''
+    This is used to merge the results of the tasks per gate and per adder.
+    output:
+        summary     :       dictionary from gate name or (adder name, n)
+                                to [checked, failures, example]
+    '''
+    summary = {}
+    for result in results:
+        task = result['task']
+        key = task[1] if task[0]=='gate' else '%s n=%d' % (task[1], task[2])
+        entry = summary.setdefault(key, [0, 0, None])
+        entry[0] += result['checked']
+        entry[1] += result['failures']
+        if entry[2] is None:
+            entry[2] = result['example']
+    return summary
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Exhaustive verification of the gates and adders")
+    parser.add_argument('--max-n', type=int, default=2, help="adders are checked for n = 1, ..., max-n")
+    parser.add_argument('--adders', nargs='*', default=None, help="names of the adders, default all")
+    parser.add_argument('--gates', nargs='*', default=None, help="names of the gates, default all")
+    parser.add_argument('--processes', type=int, default=None, help="size of the process pool")
+    parser.add_argument('--checkpoint', default=None, help="checkpoint file for resuming")
+    args = parser.parse_args()
+    results = verify(args.max_n, args.adders, args.gates, args.processes, args.checkpoint)
+    summary = summarize(results)
+    for key in sorted(summary):
+        checked, failures, example = summary[key]
+        print("%-40s %8d checked %8d failed %s" % (key, checked, failures, '' if example is None else example))
+    sys.exit(1 if any(entry[1] for entry in summary.values()) else 0)